@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # https://docs.djangoproject.com/en/5.0/topics/signals/#connecting-receiver-functions
+        # Signal receivers defined outside models.py are connected by importing their module
+        from . import cache_invalidation, photos, search  # noqa: F401
+        from .auth import permission_cache, user_cache  # noqa: F401
+        from utils import db_router  # noqa: F401
@@ -1,5 +1,7 @@
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth import get_user_model
+from utils.hashing import hash_password, verify_password
+from .permission_cache import get_permissions
 
 class CustomUserBackend(BaseBackend):
     def authenticate(
@@ -17,7 +19,12 @@ class CustomUserBackend(BaseBackend):
             return
         try:
             user = User._default_manager.get_by_natural_key(username)
-            if user.check_password(password):
+            is_correct, must_update = verify_password(password, user.password)
+            if is_correct:
+                if must_update:
+                    # Rehash with the current hasher settings (e.g. more iterations) while the password is known
+                    user.password = hash_password(password)
+                    user.save(update_fields=["password"])
                 return user
 
         except User.DoesNotExist:
@@ -32,3 +39,19 @@ class CustomUserBackend(BaseBackend):
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
             return None
+
+    # Permissions of non-admin users, admins have them all (see User.has_perm)
+    def get_user_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return set(get_permissions(user_obj)[0])
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return set(get_permissions(user_obj)[1])
+
+    def has_module_perms(self, user_obj, app_label: str) -> bool:
+        return any(
+            perm.startswith(f"{app_label}.") for perm in self.get_all_permissions(user_obj)
+        )
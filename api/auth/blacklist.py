@@ -0,0 +1,117 @@
+import threading
+import time
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from utils.bloom import BloomFilter
+from utils.response_cache import bump_generation, get_generations
+
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/blacklist_app.html
+
+"""
+Membership filter in front of simplejwt's BlacklistedToken table. Each process keeps a Bloom filter of
+the JTIs of the blacklisted refresh tokens that have not expired yet. A JTI the filter does not contain
+cannot be blacklisted, so only the rare filter hits (blacklisted tokens and false positives) query the table.
+
+Blacklisting a token bumps the BlacklistedToken generation in the shared cache (see utils/response_cache.py).
+A process whose filter was built for an older generation checks every token against the table until the
+filter is rebuilt, which happens at most once per TOKEN_BLACKLIST_FILTER_INTERVAL seconds.
+The bump only reaches the processes sharing the cache: all processes of the host with the default cache,
+none with CACHE_LOCAL (see CACHES in settings.py). A filter is therefore rebuilt once it is
+TOKEN_BLACKLIST_FILTER_MAX_AGE seconds old even if its generation is current, which bounds how long a
+process that missed the bump still accepts a blacklisted token.
+"""
+
+_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_filter: BloomFilter | None = None
+_filter_generation: int | None = None
+_built_at = 0.0
+_stats = {
+    "checks": 0,
+    "filter_skips": 0,  # Checks answered by the filter alone
+    "database_checks": 0,
+    "false_positives": 0,
+    "rebuilds": 0,
+    "last_rebuild_ms": 0.0,
+    "check_time_ms": 0.0,
+    "max_check_ms": 0.0,
+}
+
+
+def rebuild_filter():
+    global _filter, _filter_generation, _built_at
+    start = time.perf_counter()
+    # Read the generation first: a token blacklisted during the rebuild leaves the filter stale, not wrong
+    generation = get_generations(BlacklistedToken)[0]
+    jtis = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()).values_list(
+        "token__jti", flat=True
+    )
+    # Sized with room for the tokens blacklisted until the next rebuild
+    bloom = BloomFilter(
+        capacity=max(jtis.count() * 2, 1024),
+        error_rate=settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE,
+    )
+    for jti in jtis.iterator(chunk_size=2000):
+        bloom.add(jti)
+    with _lock:
+        _filter, _filter_generation, _built_at = bloom, generation, time.monotonic()
+        _stats["rebuilds"] += 1
+        _stats["last_rebuild_ms"] = (time.perf_counter() - start) * 1000
+
+
+def _get_filter() -> BloomFilter | None:
+    """The filter if it covers every blacklisted token, rebuilt when it is stale and old enough"""
+    generation = get_generations(BlacklistedToken)[0]
+    age = time.monotonic() - _built_at
+    if _filter is not None and _filter_generation == generation and age < settings.TOKEN_BLACKLIST_FILTER_MAX_AGE:
+        return _filter
+    if age < settings.TOKEN_BLACKLIST_FILTER_INTERVAL:
+        return None
+    # One thread rebuilds, the others check the table meanwhile
+    if not _rebuild_lock.acquire(blocking=False):
+        return None
+    try:
+        rebuild_filter()
+    finally:
+        _rebuild_lock.release()
+    return _filter if _filter_generation == generation else None
+
+
+def is_blacklisted(jti: str) -> bool:
+    start = time.perf_counter()
+    bloom = _get_filter()
+    skipped = bloom is not None and not bloom.might_contain(jti)
+    blacklisted = False if skipped else BlacklistedToken.objects.filter(token__jti=jti).exists()
+    duration = (time.perf_counter() - start) * 1000
+    with _lock:
+        _stats["checks"] += 1
+        _stats["check_time_ms"] += duration
+        _stats["max_check_ms"] = max(_stats["max_check_ms"], duration)
+        if skipped:
+            _stats["filter_skips"] += 1
+        else:
+            _stats["database_checks"] += 1
+            if bloom is not None and not blacklisted:
+                _stats["false_positives"] += 1
+    return blacklisted
+
+
+def record_blacklisted(jti: str):
+    with _lock:
+        if _filter is not None:
+            _filter.add(jti)  # Keeps the filter of this process complete until the next rebuild
+    transaction.on_commit(partial(bump_generation, BlacklistedToken))
+
+
+def blacklist_stats() -> dict[str, int | float]:
+    with _lock:
+        stats = dict(_stats)
+        stats["filter_items"] = _filter.count if _filter is not None else 0
+        stats["filter_bytes"] = len(_filter.bits) if _filter is not None else 0
+    stats["avg_check_ms"] = stats.pop("check_time_ms") / stats["checks"] if stats["checks"] else 0.0
+    stats["outstanding_tokens"] = OutstandingToken.objects.count()
+    stats["blacklisted_tokens"] = BlacklistedToken.objects.count()
+    return stats
@@ -1,5 +1,6 @@
 from typing import Tuple, Optional
-from rest_framework import status, request, exceptions
+from django.conf import settings
+from rest_framework import status, request, exceptions, permissions
 from rest_framework_simplejwt.authentication import (
     JWTAuthentication,
     AuthUser,
@@ -7,11 +8,55 @@ from rest_framework_simplejwt.authentication import (
 from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
+from .token_cache import cache_verified_claims, get_verified_claims, is_revoked
+from .tokens import (
+    AUTH_GENERATION_CLAIM,
+    ROLE_CLAIM,
+    ClaimsUser,
+    VerifiedAccessToken,
+    decode_access_token,
+    get_auth_generation,
+)
+from .user_cache import cache_user, get_cached_user
+from ..models import User
 
 class CustomJWTAuthentication(JWTAuthentication):
     def authenticate(
         self, request: request.Request
     ) -> Optional[Tuple[AuthUser, AccessToken]]:
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = self.get_known_user(request, validated_token)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**self.get_user_lookup(validated_token))
+            except self.user_model.DoesNotExist as e:
+                raise exceptions.AuthenticationFailed(
+                    str(e), code=status.HTTP_401_UNAUTHORIZED
+                )
+            self.remember_user(user, validated_token)
+        return (user, validated_token)
+
+    async def aauthenticate(
+        self, request: request.Request
+    ) -> Optional[Tuple[AuthUser, AccessToken]]:
+        # Used by AsyncReadMixin, same as authenticate with the async ORM
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = self.get_known_user(request, validated_token)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**self.get_user_lookup(validated_token))
+            except self.user_model.DoesNotExist as e:
+                raise exceptions.AuthenticationFailed(
+                    str(e), code=status.HTTP_401_UNAUTHORIZED
+                )
+            self.remember_user(user, validated_token)
+        return (user, validated_token)
+
+    def get_request_token(self, request: request.Request) -> Optional[AccessToken]:
         header = self.get_header(request)
         if not header:
             return None
@@ -20,28 +65,55 @@ class CustomJWTAuthentication(JWTAuthentication):
         if raw_token is None:
             return None
 
-        try:
-            validated_token = AccessToken(raw_token, verify=False)
-        except TokenError:
+        payload = get_verified_claims(raw_token)
+        if payload is None:
+            try:
+                payload = decode_access_token(raw_token)
+            except TokenError:
+                raise exceptions.AuthenticationFailed(
+                    "Invalid token", code=status.HTTP_401_UNAUTHORIZED
+                )
+            try:
+                # Expiry, token id and token type
+                VerifiedAccessToken(raw_token, payload).verify()
+            except TokenError:
+                return None
+            cache_verified_claims(raw_token, payload)
+
+        if is_revoked(payload):
             raise exceptions.AuthenticationFailed(
-                "Invalid token", code=status.HTTP_401_UNAUTHORIZED
+                "Token has been revoked", code=status.HTTP_401_UNAUTHORIZED
             )
-        
-        try:
-            validated_token.verify()
-        except:
-            return None
-            
+        return VerifiedAccessToken(raw_token, dict(payload))
+
+    def get_user_lookup(self, validated_token: AccessToken) -> dict:
         user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
         if not user_id:
             raise exceptions.AuthenticationFailed(
                 "Token contained no recognizable user identification",
                 code=status.HTTP_401_UNAUTHORIZED,
             )
-        try:
-            user = self.user_model.objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
-        except self.user_model.DoesNotExist as e:
+        return {jwt_settings.USER_ID_FIELD: user_id}
+
+    def get_known_user(self, request: request.Request, validated_token: AccessToken):
+        """The user without a query: built from the token claims or found in the user cache"""
+        if (
+            settings.AUTH_CLAIMS_ONLY
+            and request.method in permissions.SAFE_METHODS
+            and ROLE_CLAIM in validated_token
+        ):
+            # Read-only requests only need the id and role, at the cost of trusting the role
+            # of the token until it expires (ACCESS_TOKEN_LIFETIME)
+            return ClaimsUser(validated_token)
+        user_id = self.get_user_lookup(validated_token)[jwt_settings.USER_ID_FIELD]
+        return get_cached_user(user_id, validated_token.get(AUTH_GENERATION_CLAIM))
+
+    def remember_user(self, user: User, validated_token: AccessToken):
+        generation = validated_token.get(AUTH_GENERATION_CLAIM)
+        # Tokens issued before tokens carried a generation are accepted until they expire
+        if generation is not None and generation != get_auth_generation(user):
             raise exceptions.AuthenticationFailed(
-                str(e), code=status.HTTP_401_UNAUTHORIZED
+                "Token was issued before a password or role change",
+                code=status.HTTP_401_UNAUTHORIZED,
             )
-        return (user, validated_token)
+        cache_user(user, generation)
@@ -0,0 +1,75 @@
+from functools import partial
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from utils.response_cache import bump_generation, get_generations, track_writes
+from ..models import User
+
+# https://docs.djangoproject.com/en/5.0/topics/auth/customizing/#handling-authorization-in-custom-backends
+# https://docs.djangoproject.com/en/5.0/topics/auth/default/#permission-caching
+
+"""
+Resolved permissions of non-admin users ("app_label.codename" strings from their own permissions and
+their groups'). They are loaded once per user object, i.e. once per request, and shared between requests
+through the Django cache under a key that includes the Permission generation. Any change to a user's groups
+or permissions, or to a group's permissions, bumps that generation (see utils/response_cache.py).
+The bump only reaches the processes sharing the cache: all processes of the host with the default cache,
+none with CACHE_LOCAL (see CACHES in settings.py). Entries expire after AUTH_PERMISSION_CACHE_TTL seconds,
+which bounds how long a process that missed a bump keeps the old permissions, and lets the entries of
+previous generations go.
+"""
+
+
+def _cache_key(user: User) -> str:
+    return f"permissions:{user.pk}:{get_generations(Permission)[0]}"
+
+
+def _load(user: User) -> tuple[frozenset[str], frozenset[str]]:
+    key = _cache_key(user)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def names(permissions) -> frozenset[str]:
+        return frozenset(
+            f"{app_label}.{codename}"
+            for app_label, codename in permissions.values_list("content_type__app_label", "codename")
+        )
+
+    resolved = (
+        names(Permission.objects.filter(user=user)),
+        names(Permission.objects.filter(group__user=user)),
+    )
+    cache.set(key, resolved, settings.AUTH_PERMISSION_CACHE_TTL)
+    return resolved
+
+
+def get_permissions(user: User) -> tuple[frozenset[str], frozenset[str]]:
+    """The user's own and group permissions, memoized on the user object like ModelBackend does"""
+    if not hasattr(user, "_resolved_permissions"):
+        user._resolved_permissions = _load(user)
+    return user._resolved_permissions
+
+
+def invalidate_permissions(sender, using: str, **kwargs):
+    # m2m_changed is sent before and after each change, the other signals have no action
+    if kwargs.get("action", "post_").startswith("post_"):
+        transaction.on_commit(partial(bump_generation, Permission), using=using)
+
+
+for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+    m2m_changed.connect(
+        invalidate_permissions,
+        sender=through,
+        dispatch_uid=f"permission_cache_m2m_{through.__name__}",
+    )
+track_writes(Permission)  # Permissions are read joined with the tables whose writes bump its generation
+for model in (Group, Permission):
+    post_save.connect(
+        invalidate_permissions, sender=model, dispatch_uid=f"permission_cache_post_save_{model.__name__}"
+    )
+    post_delete.connect(
+        invalidate_permissions, sender=model, dispatch_uid=f"permission_cache_post_delete_{model.__name__}"
+    )
@@ -1,6 +1,13 @@
 from rest_framework import permissions, request, status
 from utils.common import USER_ROLES
 
+
+def has_role(request: request.Request, role: USER_ROLES) -> bool:
+    # The role is read from the user loaded (or built from the token claims) by authentication, without
+    # any query. Anonymous users have no role.
+    return getattr(request.user, "role", None) == role.value
+
+
 class IsGuest(permissions.BasePermission):
     code = status.HTTP_403_FORBIDDEN
 
@@ -11,12 +18,12 @@ class IsAdmin(permissions.BasePermission):
     code = status.HTTP_403_FORBIDDEN
 
     def has_permission(self, request: request.Request, view):
-        return bool(request.user and request.user.role == USER_ROLES.ADMIN.value)
+        return has_role(request, USER_ROLES.ADMIN)
 
 
 class isAuthor(permissions.BasePermission):
     code = status.HTTP_403_FORBIDDEN
 
     def has_permission(self, request: request.Request, view):
-        return bool(request.user and request.user.role == USER_ROLES.AUTHOR.value)
+        return has_role(request, USER_ROLES.AUTHOR)
 
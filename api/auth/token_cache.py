@@ -0,0 +1,71 @@
+import hashlib
+import time
+from typing import Any, Optional, cast
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.ttl_cache import TTLCache
+
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html#leeway
+
+"""
+Claims of verified access tokens, cached per process by the SHA-256 digest of the encoded token
+so that a client sending the same token on every request pays for its signature check once.
+Entries expire with the token itself.
+
+Revoked tokens (see revoke_access_token) are looked up on every request in the "auth" cache, which holds
+nothing else so that no other entry can evict them before the tokens expire. A logout reaches the worker
+processes that share that cache: all processes of the host with the default file-based cache, only the
+process that handled it with CACHE_LOCAL (see CACHES in settings.py).
+"""
+
+_tokens = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+)
+
+
+def _digest(raw_token: bytes | str) -> bytes:
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).digest()
+
+
+def _revoked_key(jti: str) -> str:
+    return f"revoked-access:{jti}"
+
+
+def _seconds_left(payload: dict[str, Any]) -> float:
+    leeway = token_backend.get_leeway().total_seconds()
+    return payload["exp"] + leeway - time.time()
+
+
+def get_verified_claims(raw_token: bytes | str) -> Optional[dict[str, Any]]:
+    payload = _tokens.get(_digest(raw_token))
+    if payload is None or _seconds_left(payload) <= 0:
+        return None
+    return payload
+
+
+def cache_verified_claims(raw_token: bytes | str, payload: dict[str, Any]):
+    _tokens.set(_digest(raw_token), payload, ttl=_seconds_left(payload))
+
+
+def is_revoked(payload: dict[str, Any]) -> bool:
+    jti = payload.get(jwt_settings.JTI_CLAIM)
+    return jti is not None and caches["auth"].get(_revoked_key(jti)) is not None
+
+
+def revoke_access_token(token: AccessToken):
+    """Rejects the access token from now on, e.g. on logout. Access tokens are not blacklisted by simplejwt."""
+    seconds_left = _seconds_left(token.payload)
+    if seconds_left > 0:
+        caches["auth"].set(_revoked_key(token[jwt_settings.JTI_CLAIM]), True, timeout=int(seconds_left) + 1)
+    if token.token is not None:
+        _tokens.pop(_digest(cast(bytes | str, token.token)))  # Annotated as Token by simplejwt
+
+
+def token_cache_stats() -> dict[str, int | float]:
+    return _tokens.stats()
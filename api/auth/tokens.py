@@ -0,0 +1,89 @@
+from typing import Any, cast
+import jwt
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.tokens import AccessToken, AuthUser, RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from ..models import User
+from .blacklist import is_blacklisted, record_blacklisted
+
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/customizing_token_claims.html
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/stateless_user_authentication.html
+# https://pyjwt.readthedocs.io/en/stable/api.html#jwt.decode
+
+ROLE_CLAIM = "role"
+AUTH_GENERATION_CLAIM = "auth_generation"
+
+
+def get_auth_generation(user: User) -> str:
+    # Changes whenever the password or the role changes, like Django's session auth hash
+    return salted_hmac(
+        "api.auth.tokens.get_auth_generation", f"{user.password}:{user.role}"
+    ).hexdigest()[:16]
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token (and access token derived from it) that carries the user's role and auth generation.
+    Tokens issued before a password or role change are rejected once the user is read again,
+    and the role lets claims-only authentication skip the user lookup (see jwt_scheme.py).
+    The blacklist is checked through the membership filter of blacklist.py.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[jwt_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        record_blacklisted(self.payload[jwt_settings.JTI_CLAIM])
+        return result
+
+    @classmethod
+    def for_user(cls, user: AuthUser) -> "UserRefreshToken":
+        # Tokens are only issued to the users of the database, whose password and role the claims come from
+        db_user = cast(User, user)
+        token = cast(UserRefreshToken, super().for_user(user))  # Built by cls
+        token[ROLE_CLAIM] = db_user.role
+        token[AUTH_GENERATION_CLAIM] = get_auth_generation(db_user)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """User built from the access token claims only, with the fields the permissions read"""
+
+    @property
+    def role(self) -> str:
+        return self.token[ROLE_CLAIM]
+
+
+def decode_access_token(raw_token: bytes | str) -> dict[str, Any]:
+    """
+    Parses the token and checks its signature, audience and issuer in one pass, raises TokenError.
+    Expiry is left to Token.verify(), which CustomJWTAuthentication treats differently from a bad token.
+    """
+    try:
+        return jwt.decode(
+            raw_token,
+            # simplejwt annotates its encoded tokens as Token, they are bytes or str
+            token_backend.get_verifying_key(raw_token),  # type: ignore[arg-type]
+            algorithms=[token_backend.algorithm],
+            audience=token_backend.audience,
+            issuer=token_backend.issuer,
+            leeway=token_backend.get_leeway(),
+            options={"verify_aud": token_backend.audience is not None, "verify_exp": False},
+        )
+    except jwt.InvalidTokenError:
+        raise TokenError("Token is invalid or expired")
+
+
+class VerifiedAccessToken(AccessToken):
+    """Access token built from a payload that was already decoded and verified"""
+
+    def __init__(self, token: bytes | str, payload: dict[str, Any]):
+        self.token = token  # type: ignore[assignment]  # Annotated as Token by simplejwt, see decode_access_token
+        self.current_time = aware_utcnow()
+        self.payload = payload
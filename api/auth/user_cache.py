@@ -0,0 +1,50 @@
+import copy
+from functools import partial
+from typing import Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from utils.ttl_cache import TTLCache
+from ..models import User
+
+# https://docs.djangoproject.com/en/5.0/ref/signals/#post-save
+
+"""
+Users authenticated by CustomJWTAuthentication, cached per process to save the user query on most
+requests. Entries are keyed by user id and hold the auth generation of the token they were read for:
+a token with another generation (issued after a password or role change) reads the user again.
+Saving or deleting a user drops its entry; writes that skip signals (QuerySet.update) are only picked
+up once the entry expires after AUTH_USER_CACHE_TTL seconds.
+"""
+
+_users = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+def get_cached_user(user_id, generation: Optional[str]) -> Optional[User]:
+    cached = _users.get(user_id)
+    if cached is None or cached[0] != generation:
+        return None
+    # Each request gets its own copy, so that changes made to request.user are not shared
+    return copy.copy(cached[1])
+
+
+def cache_user(user: User, generation: Optional[str]):
+    _users.set(user.pk, (generation, copy.copy(user)))
+
+
+def invalidate_user(user_id):
+    _users.pop(user_id)
+
+
+def user_cache_stats() -> dict[str, int | float]:
+    return _users.stats()
+
+
+def invalidate_user_receiver(sender, instance: User, using: str, **kwargs):
+    invalidate_user(instance.pk)
+    # Again after the commit, in case a request cached the old row in the meantime
+    transaction.on_commit(partial(invalidate_user, instance.pk), using=using)
+
+
+post_save.connect(invalidate_user_receiver, sender=User, dispatch_uid="auth_user_cache_post_save")
+post_delete.connect(invalidate_user_receiver, sender=User, dispatch_uid="auth_user_cache_post_delete")
@@ -0,0 +1,188 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, router, transaction
+from rest_framework.exceptions import ErrorDetail
+from utils.common import USER_ROLES
+from utils.process_pool import get_process_pool
+from utils.response_cache import bump_generation
+from .models import Author, User
+from .serializers import AuthorImportSerializer
+
+# https://docs.python.org/3/library/csv.html#csv.DictReader
+# https://github.com/ndjson/ndjson-spec
+
+"""
+Bulk import of authors (with their users) from CSV or NDJSON, one row per author with the columns
+email, name, password and bio. The input is read as a stream and handled in chunks of rows:
+emails are checked against the users table with one IN query per chunk, passwords are hashed
+in parallel on the worker processes, and users and authors are inserted with bulk_create in one
+transaction per chunk. Invalid rows, including rows that are not valid UTF-8, are reported by their
+row number without failing the others.
+
+Rows are numbered from 1 in input order (the CSV header is not a row). An import that stopped can be
+resumed with start set to the rows it reported as done: committed chunks are never read again. Rows whose
+email already exists are skipped rather than reported as errors, so importing the same file twice is harmless.
+"""
+
+FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+DUPLICATE_EMAIL = "Duplicate email in the same chunk."
+
+
+class ImportResult:
+    def __init__(self, start: int = 0):
+        self.rows = start  # Rows done, i.e. the start of a resumed import
+        self.created = 0
+        self.skipped = 0  # Rows whose email already exists
+        self.errors: dict[int, Any] = {}  # row number -> errors
+
+    def add_error(self, row: int, field: str, message: str):
+        self.errors.setdefault(row, {}).setdefault(field, []).append(
+            ErrorDetail(message, code="invalid")
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "skipped": self.skipped,
+            "errors": {str(row): errors for row, errors in sorted(self.errors.items())},
+        }
+
+
+def _decode_lines(lines: Iterable[bytes], invalid: list[UnicodeDecodeError]) -> Iterator[str]:
+    """
+    Decodes the lines one at a time, so that invalid UTF-8 only spoils its own line: the line is decoded
+    with replacement characters and the error appended to invalid, for read_rows to report it with the row
+    """
+    encoding = "utf-8-sig"  # Drops a byte order mark at the start
+    for line in lines:
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError as exc:
+            invalid.append(exc)
+            yield line.decode(encoding, errors="replace")
+        encoding = "utf-8"
+
+
+def read_rows(lines: Iterable[bytes], format: str) -> Iterator[dict | Any]:
+    """Rows of an input read line by line, e.g. an open file or a request body"""
+    invalid: list[UnicodeDecodeError] = []
+    text = _decode_lines(lines, invalid)
+    # The readers only take the lines of the row they return, so the errors are those of that row
+    rows: Iterable[Any] = csv.DictReader(text) if format == "csv" else (line for line in text if line.strip())
+    for row in rows:
+        if invalid:
+            yield invalid[0]  # Reported as an error of its row
+            invalid.clear()
+        elif format == "csv":
+            yield row
+        else:
+            try:
+                yield json.loads(row)
+            except ValueError as exc:
+                yield exc  # Reported as an error of its row
+
+
+def _validate(chunk: list[tuple[int, Any]], result: ImportResult) -> dict[int, dict]:
+    validated = {}
+    for row, data in chunk:
+        if isinstance(data, UnicodeDecodeError):
+            result.add_error(row, "non_field_errors", f"Invalid UTF-8: {data}")
+            continue
+        if isinstance(data, ValueError):
+            result.add_error(row, "non_field_errors", f"Invalid JSON: {data}")
+            continue
+        serializer = AuthorImportSerializer(data=data)
+        if serializer.is_valid():
+            validated[row] = serializer.validated_data
+        else:
+            result.errors[row] = serializer.errors
+    return validated
+
+
+def _check_emails(validated: dict[int, dict], result: ImportResult, using: Optional[str] = None):
+    existing = set(
+        User.objects.db_manager(using).filter(
+            email__in={data["email"] for data in validated.values()}
+        ).values_list("email", flat=True)
+    )
+    seen = set()
+    for row, data in list(validated.items()):
+        if data["email"] in existing:
+            result.skipped += 1
+        elif data["email"] in seen:
+            result.add_error(row, "email", DUPLICATE_EMAIL)
+        else:
+            seen.add(data["email"])
+            continue
+        del validated[row]
+
+
+def _insert_chunk(validated: dict[int, dict], hashes: dict[int, str], result: ImportResult):
+    users = [
+        User(
+            email=data["email"],
+            name=data["name"],
+            password=hashes[row],
+            role=USER_ROLES.AUTHOR.value,
+        )
+        for row, data in validated.items()
+    ]
+    with transaction.atomic():
+        # Primary keys are set on the objects since SQLite supports RETURNING
+        User.objects.bulk_create(users)
+        Author.objects.bulk_create(
+            [Author(user=user, bio=data["bio"]) for user, data in zip(users, validated.values())]
+        )
+        # bulk_create sends no signals
+        transaction.on_commit(lambda: bump_generation(User, Author))
+    result.created += len(users)
+
+
+def _import_chunk(validated: dict[int, dict], result: ImportResult):
+    passwords = [data["password"] for data in validated.values()]
+    chunksize = max(len(passwords) // (settings.WORKER_PROCESSES * 4), 1)
+    hashes = dict(zip(validated, get_process_pool().map(make_password, passwords, chunksize=chunksize)))
+
+    while validated:
+        try:
+            _insert_chunk(validated, hashes, result)
+            return
+        except IntegrityError:
+            # An email was taken since it was checked, e.g. by a sign-up: the chunk is checked again,
+            # on the primary, and the rest of it inserted
+            remaining = len(validated)
+            _check_emails(validated, result, using=router.db_for_write(User))
+            if len(validated) == remaining:
+                raise
+
+
+def import_authors(
+    rows: Iterable[Any],
+    chunk_size: int,
+    start: int = 0,
+    on_chunk: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Imports the rows after the first start ones. on_chunk is called with the running result
+    once each chunk is committed, e.g. to report progress or save result.rows for a later resume.
+    """
+    result = ImportResult(start)
+    numbered = enumerate(islice(rows, start, None), start=start + 1)
+    while chunk := list(islice(numbered, chunk_size)):
+        validated = _validate(chunk, result)
+        _check_emails(validated, result)
+        if validated:
+            _import_chunk(validated, result)
+        result.rows = chunk[-1][0]
+        if on_chunk:
+            on_chunk(result)
+    return result
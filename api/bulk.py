@@ -0,0 +1,152 @@
+from typing import Any
+from django.db import transaction
+from rest_framework.exceptions import ErrorDetail
+from utils.response_cache import bump_generation
+from .models import Author, Blog, BlogStats, Entry
+from .search import index_entries
+from .serializers import EntryBulkSerializer
+
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#bulk-create
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#bulk-update
+
+"""
+Bulk writes of entries. Items are validated one by one but checked against the database per batch:
+related primary keys with one IN query per relation and entries to update with one in_bulk query.
+Valid items are written with bulk_create/bulk_update in chunks of batch_size inside one transaction,
+while invalid items are reported by their index in the request without failing the others.
+
+bulk_create and bulk_update do not send model signals, so the search index, the blog stats and the
+response cache generation maintained for single entry writes are updated here explicitly.
+"""
+
+EntryThrough = Entry.authors.through
+DOES_NOT_EXIST = 'Invalid pk "{pk_value}" - object does not exist.'
+
+
+class BulkResult:
+    def __init__(self):
+        self.entries: dict[int, Entry] = {}  # index of the item in the request -> written entry
+        self.errors: dict[int, Any] = {}
+
+    def add_error(self, index: int, field: str, message: str):
+        self.errors.setdefault(index, {}).setdefault(field, []).append(
+            ErrorDetail(message, code="invalid")
+        )
+
+
+def _validate(items: list, result: BulkResult, partial: bool) -> dict[int, dict]:
+    validated = {}
+    for index, item in enumerate(items):
+        serializer = EntryBulkSerializer(data=item, partial=partial)
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            result.errors[index] = serializer.errors
+    return validated
+
+
+def _check_relations(validated: dict[int, dict], result: BulkResult):
+    blog_ids = {data["blog"] for data in validated.values() if "blog" in data}
+    author_ids = {pk for data in validated.values() for pk in data.get("authors", ())}
+    existing_blogs = set(Blog.objects.filter(id__in=blog_ids).values_list("id", flat=True))
+    existing_authors = set(
+        Author.objects.filter(id__in=author_ids).values_list("id", flat=True)
+    )
+
+    for index, data in list(validated.items()):
+        if "blog" in data and data["blog"] not in existing_blogs:
+            result.add_error(index, "blog", DOES_NOT_EXIST.format(pk_value=data["blog"]))
+        for pk in data.get("authors", ()):
+            if pk not in existing_authors:
+                result.add_error(index, "authors", DOES_NOT_EXIST.format(pk_value=pk))
+        if index in result.errors:
+            del validated[index]
+
+
+def _set_authors(entries: dict[int, Entry], validated: dict[int, dict], batch_size: int):
+    changed = {index: data["authors"] for index, data in validated.items() if "authors" in data}
+    EntryThrough.objects.filter(entry_id__in=[entries[i].pk for i in changed]).delete()
+    EntryThrough.objects.bulk_create(
+        [
+            EntryThrough(entry_id=entries[index].pk, author_id=author_id)
+            for index, author_ids in changed.items()
+            for author_id in dict.fromkeys(author_ids)  # drop duplicates, keep the order
+        ],
+        batch_size=batch_size,
+    )
+
+
+def bulk_create_entries(items: list, batch_size: int) -> BulkResult:
+    result = BulkResult()
+    validated = _validate(items, result, partial=False)
+    _check_relations(validated, result)
+
+    entries = {}
+    for index, data in validated.items():
+        fields = {key: value for key, value in data.items() if key not in ("id", "authors")}
+        fields["blog_id"] = fields.pop("blog")
+        entries[index] = Entry(**fields)
+
+    with transaction.atomic():
+        # Primary keys are set on the objects since SQLite supports RETURNING
+        Entry.objects.bulk_create(entries.values(), batch_size=batch_size)
+        _set_authors(entries, validated, batch_size)
+        index_entries(entries.values())
+        BlogStats.objects.record_entry_changes(
+            after=[BlogStats.objects.snapshot(entry) for entry in entries.values()]
+        )
+        transaction.on_commit(lambda: bump_generation(Entry, BlogStats))
+
+    result.entries = entries
+    return result
+
+
+def bulk_update_entries(items: list, batch_size: int) -> BulkResult:
+    result = BulkResult()
+    validated = _validate(items, result, partial=True)
+
+    seen = set()
+    for index, data in list(validated.items()):
+        if "id" not in data:
+            result.add_error(index, "id", "This field is required.")
+        elif data["id"] in seen:
+            result.add_error(index, "id", "Duplicate entry in the same batch.")
+        else:
+            seen.add(data["id"])
+            continue
+        del validated[index]
+    _check_relations(validated, result)
+
+    with transaction.atomic():
+        existing = Entry.objects.select_for_update().in_bulk(
+            [data["id"] for data in validated.values()]
+        )
+        entries, before, fields = {}, [], {"mod_date"}
+        for index, data in validated.items():
+            entry = existing.get(data["id"])
+            if entry is None:
+                result.add_error(index, "id", DOES_NOT_EXIST.format(pk_value=data["id"]))
+                continue
+
+            before.append(BlogStats.objects.snapshot(entry))
+            for key, value in data.items():
+                if key in ("id", "authors"):
+                    continue
+                setattr(entry, "blog_id" if key == "blog" else key, value)
+                fields.add(key)
+            # auto_now is only applied by save(), not by bulk_update
+            Entry._meta.get_field("mod_date").pre_save(entry, add=False)
+            entries[index] = entry
+
+        validated = {index: validated[index] for index in entries}
+        Entry.objects.bulk_update(entries.values(), sorted(fields), batch_size=batch_size)
+        _set_authors(entries, validated, batch_size)
+        index_entries(entries.values())
+        BlogStats.objects.record_entry_changes(
+            before=before,
+            after=[BlogStats.objects.snapshot(entry) for entry in entries.values()],
+        )
+        transaction.on_commit(lambda: bump_generation(Entry, BlogStats))
+
+    result.entries = entries
+    return result
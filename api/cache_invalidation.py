@@ -0,0 +1,50 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from utils.response_cache import bump_generation, track_writes
+from .models import Author, Blog, BlogStats, Entry, User
+
+# https://docs.djangoproject.com/en/5.0/ref/signals/#m2m-changed
+# https://docs.djangoproject.com/en/5.0/topics/db/transactions/#performing-actions-after-commit
+
+"""
+Bumps the response cache generation of a model whenever one of its rows is written.
+The bump runs after the transaction commits, so a response rebuilt in the meantime from the old rows
+cannot be cached under the new generation. Writes that skip signals (bulk_create, bulk_update,
+QuerySet.update) call bump_generation themselves.
+"""
+
+CACHED_MODELS = (Blog, BlogStats, Entry, Author, User)
+# Lets their reads go to the replicas (see utils/db_router.py)
+track_writes(*CACHED_MODELS)
+track_writes(Entry.authors.through, generation_of=Entry)
+
+
+def invalidate_model(sender, using: str, **kwargs):
+    transaction.on_commit(partial(bump_generation, sender), using=using)
+
+
+for cached_model in CACHED_MODELS:
+    post_save.connect(
+        invalidate_model,
+        sender=cached_model,
+        dispatch_uid=f"response_cache_post_save_{cached_model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_model,
+        sender=cached_model,
+        dispatch_uid=f"response_cache_post_delete_{cached_model.__name__}",
+    )
+
+
+def invalidate_entry_authors(sender, instance, action: str, using: str, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        # Both sides of the relation are reported as Entry changes since only entries nest their authors
+        transaction.on_commit(partial(bump_generation, Entry), using=using)
+
+
+m2m_changed.connect(
+    invalidate_entry_authors,
+    sender=Entry.authors.through,
+    dispatch_uid="response_cache_entry_authors",
+)
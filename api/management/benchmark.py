@@ -0,0 +1,80 @@
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from django.db import transaction
+from ..models import Author, Blog, BlogStats, Entry, User
+
+"""
+Helpers shared by the bench_* management commands. Benchmarks seed their data inside a transaction
+that is rolled back at the end, so they can run against a development database without leaving rows behind.
+"""
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back() -> Iterator[None]:
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def seed_entries(count: int, authors_per_entry: int = 2) -> None:
+    """Blogs, authors (with users) and entries with their author links and blog stats"""
+    blogs = Blog.objects.bulk_create(
+        [Blog(name=f"Blog {i}", tagline="Benchmark blog " * 4) for i in range(count // 100 + 1)]
+    )
+    users = User.objects.bulk_create(
+        [
+            # "!" is an unusable password hash, hashing real passwords would dominate the seeding
+            User(name=f"Author {i}", email=f"bench-{i}@example.com", role="author", password="!")
+            for i in range(count // 20 + 1)
+        ],
+        batch_size=1000,
+    )
+    authors = Author.objects.bulk_create(
+        [Author(user=user, bio="Writes benchmark entries. " * 4) for user in users], batch_size=1000
+    )
+    entries = Entry.objects.bulk_create(
+        [
+            Entry(
+                blog=blogs[i % len(blogs)],
+                headline=f"Benchmark entry {i}",
+                body_text="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20,
+                number_of_comments=i % 50,
+                rating=i % 11,
+            )
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    Entry.authors.through.objects.bulk_create(
+        [
+            Entry.authors.through(entry_id=entry.id, author_id=authors[(i + j) % len(authors)].id)
+            for i, entry in enumerate(entries)
+            for j in range(authors_per_entry)
+        ],
+        batch_size=1000,
+    )
+    BlogStats.objects.bulk_create(
+        [BlogStats(**row) for row in BlogStats.objects.compute()],
+        update_conflicts=True,
+        unique_fields=["blog"],
+        update_fields=["entry_count", "rating_total", "comment_total"],
+    )
+
+
+def timeit(function: Callable[[], object], repeat: int) -> float:
+    """Median duration of the calls in seconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
@@ -0,0 +1,201 @@
+import asyncio
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import AccessToken
+from ..benchmark import seed_entries
+from ...models import Author, Blog, Entry, User
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+# https://asgi.readthedocs.io/en/latest/specs/www.html#http
+
+"""
+Each mode runs in its own process since ASYNC_VIEWS is read when the URLs are loaded. The process
+seeds an in-memory test database and sends the requests straight to Django's WSGI or ASGI handler,
+so the numbers compare the request handling of each stack without a server or network in between.
+"""
+
+MODES = {
+    # mode: value of ASYNC_VIEWS
+    "wsgi": "False",
+    "asgi-sync": "False",
+    "asgi-async": "True",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the read endpoints under WSGI (threads), ASGI with the sync views "
+        "and ASGI with the async views at the given concurrency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per mode")
+        parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight at once")
+        parser.add_argument("--rows", type=int, default=2000, help="Number of entries to seed")
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query, to stand in for a database server",
+        )
+        parser.add_argument("--mode", choices=MODES, help="Run a single mode in this process")
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            return self.run_mode(options)
+
+        self.stdout.write(
+            f"{options['requests']} requests, concurrency {options['concurrency']}, "
+            f"db latency {options['db_latency']} ms"
+        )
+        for mode, async_views in MODES.items():
+            env = {
+                **os.environ,
+                "ASYNC_VIEWS": async_views,
+                "DISABLE_DEBUG": "True",  # DEBUG keeps every query in memory
+                "RESPONSE_CACHE_TIMEOUT": "0",  # Measure the views, not the cache
+            }
+            command = [sys.executable, sys.argv[0], "bench_async", "--mode", mode]
+            for option in ("requests", "concurrency", "rows", "db_latency"):
+                command += [f"--{option.replace('_', '-')}", str(options[option])]
+            result = subprocess.run(command, env=env, capture_output=True, text=True)
+            if result.returncode:
+                raise CommandError(f"{mode} failed:\n{result.stderr}")
+            self.stdout.write(result.stdout, ending="")
+
+    def run_mode(self, options):
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed_entries(options["rows"])
+            user = User.objects.create(
+                name="Bench", email="bench@example.com", role="admin", password="!"
+            )
+            token = str(AccessToken.for_user(user))
+            paths = [
+                "/api/entries/?page_size=20",
+                f"/api/entries/{Entry.objects.values_list('pk', flat=True).first()}/",
+                "/api/blogs/?page_size=20",
+                f"/api/blogs/{Blog.objects.values_list('pk', flat=True).first()}/",
+                "/api/authors/?page_size=20",
+                f"/api/authors/{Author.objects.values_list('pk', flat=True).first()}/",
+            ]
+            requests = [paths[i % len(paths)] for i in range(options["requests"])]
+
+            if options["db_latency"]:
+                delay = options["db_latency"] / 1000
+
+                def slow_query(execute, sql, params, many, context):
+                    time.sleep(delay)
+                    return execute(sql, params, many, context)
+
+                # Every thread has its own connection
+                connection.execute_wrappers.append(slow_query)
+                connection_created.connect(
+                    lambda connection, **kwargs: connection.execute_wrappers.append(slow_query),
+                    weak=False,
+                )
+
+            if options["mode"] == "wsgi":
+                durations, elapsed = self.run_wsgi(requests, token, options["concurrency"])
+            else:
+                durations, elapsed = asyncio.run(
+                    self.run_asgi(requests, token, options["concurrency"])
+                )
+        finally:
+            connection.creation.destroy_test_db(verbosity=0)
+
+        durations.sort()
+        self.stdout.write(
+            f"{options['mode']:<11} {len(durations) / elapsed:8.0f} req/s   "
+            f"p50 {statistics.median(durations) * 1000:7.1f} ms   "
+            f"p99 {durations[int(len(durations) * 0.99) - 1] * 1000:7.1f} ms"
+        )
+
+    def run_wsgi(self, requests: list[str], token: str, concurrency: int):
+        handler = WSGIHandler()
+
+        def send(url: str) -> float:
+            path, _, query = url.partition("?")
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": "localhost",
+                "SERVER_PORT": "80",
+                "HTTP_HOST": "localhost",
+                "HTTP_AUTHORIZATION": f"Bearer {token}",
+                "HTTP_ACCEPT": "application/json",
+                "wsgi.url_scheme": "http",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": sys.stderr,
+            }
+            statuses = []
+            start = time.perf_counter()
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            b"".join(response)
+            response.close()
+            if not statuses[0].startswith("200"):
+                raise CommandError(f"GET {url} returned {statuses[0]}")
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            start = time.perf_counter()
+            durations = list(executor.map(send, requests))
+            return durations, time.perf_counter() - start
+
+    async def run_asgi(self, requests: list[str], token: str, concurrency: int):
+        handler = ASGIHandler()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(url: str) -> float:
+            path, _, query = url.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "query_string": query.encode(),
+                "headers": [
+                    (b"host", b"localhost"),
+                    (b"authorization", f"Bearer {token}".encode()),
+                    (b"accept", b"application/json"),
+                ],
+                "server": ("localhost", 80),
+            }
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await asyncio.Future()  # The client never disconnects
+
+            messages = []
+
+            async def send_message(message):
+                messages.append(message)
+
+            async with semaphore:
+                start = time.perf_counter()
+                await handler(scope, receive, send_message)
+                duration = time.perf_counter() - start
+            if messages[0]["status"] != 200:
+                raise CommandError(f"GET {url} returned {messages[0]['status']}")
+            return duration
+
+        start = time.perf_counter()
+        durations = await asyncio.gather(*(send(url) for url in requests))
+        return list(durations), time.perf_counter() - start
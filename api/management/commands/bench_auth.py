@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from ..benchmark import rolled_back, timeit
+from ...auth import token_cache, user_cache
+from ...auth.jwt_scheme import CustomJWTAuthentication
+from ...auth.tokens import UserRefreshToken
+from ...models import User
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+
+class Command(BaseCommand):
+    help = "Measures the authentication overhead per request with and without the token and user caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=2000, help="Requests authenticated per run")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+
+    def handle(self, *args, **options):
+        calls = options["calls"]
+        with rolled_back():
+            user = User.objects.create(
+                name="Bench", email="bench@example.com", role="admin", password="!"
+            )
+            raw_token = str(UserRefreshToken.for_user(user).access_token)
+            request = Request(
+                APIRequestFactory().get("/api/entries/", HTTP_AUTHORIZATION=f"Bearer {raw_token}")
+            )
+            authentication = CustomJWTAuthentication()
+
+            def previous():
+                # The former authenticate(): decode without the signature check, verify the claims
+                # and read the user on every request
+                for _ in range(calls):
+                    token = AccessToken(raw_token.encode(), verify=False)
+                    token.verify()
+                    User.objects.get(**{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]})
+
+            def current():
+                for _ in range(calls):
+                    authentication.authenticate(request)
+
+            # Clearing the caches before each call measures the signature check and user query
+            def cold():
+                for _ in range(calls):
+                    token_cache._tokens.clear()
+                    user_cache._users.clear()
+                    authentication.authenticate(request)
+
+            cases = [
+                ("before (no signature check)", previous),
+                ("single pass, no caches", cold),
+                ("single pass + caches", current),
+            ]
+            with override_settings(AUTH_CLAIMS_ONLY=False):
+                for label, function in cases:
+                    duration = timeit(function, options["repeat"])
+                    self.stdout.write(f"{label:<30} {duration / calls * 1e6:8.1f} µs/request")
+            with override_settings(AUTH_CLAIMS_ONLY=True):
+                duration = timeit(current, options["repeat"])
+                self.stdout.write(f"{'claims only + token cache':<30} {duration / calls * 1e6:8.1f} µs/request")
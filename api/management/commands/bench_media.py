@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+from utils.media import serve_media
+from ..benchmark import timeit
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+"""
+A WSGI worker is busy from the call of the view until the last byte of the response is written to the client.
+Each case calls the view and consumes the response the way the server would, sleeping for every chunk as long
+as a client at --client-mbps takes to receive it, and reports that time per request: the worker occupancy.
+With X-Accel-Redirect or X-Sendfile the body is sent by the front proxy, so the worker only runs the view.
+"""
+
+
+class Command(BaseCommand):
+    help = "Measures how long a worker is occupied per media request, before and after utils/media.py"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=float, default=5, help="File size in MiB")
+        parser.add_argument(
+            "--client-mbps",
+            type=float,
+            default=100,
+            help="Download speed of the simulated client in Mbit/s, 0 to only measure the worker's own work",
+        )
+        parser.add_argument("--requests", type=int, default=20, help="Requests per run")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+
+    def handle(self, *args, **options):
+        seconds_per_byte = 8 / (options["client_mbps"] * 1e6) if options["client_mbps"] else 0
+        calls = options["requests"]
+        factory = RequestFactory()
+
+        def consume(response):
+            chunks = response.streaming_content if response.streaming else [response.content]
+            for chunk in chunks:
+                if seconds_per_byte:
+                    time.sleep(len(chunk) * seconds_per_byte)
+            response.close()
+            return response
+
+        with tempfile.TemporaryDirectory() as media_root:
+            name = "photos/ab/cd/abcd.jpg"
+            os.makedirs(os.path.join(media_root, os.path.dirname(name)))
+            with open(os.path.join(media_root, name), "wb") as file:
+                file.write(os.urandom(int(options["size"] * 1024 * 1024)))
+
+            with override_settings(MEDIA_ROOT=media_root):
+                etag = serve_media(factory.head(f"/media/{name}"), name)["ETag"]
+
+            def before(request):
+                return serve(request, name, document_root=media_root)
+
+            def after(request):
+                return serve_media(request, name)
+
+            cases = [
+                ("static.serve (before)", before, "python", {}),
+                ("serve_media python", after, "python", {}),
+                ("serve_media 256 KiB range", after, "python", {"Range": "bytes=0-262143"}),
+                ("serve_media revalidation", after, "python", {"If-None-Match": etag}),
+                ("serve_media x-accel-redirect", after, "x-accel-redirect", {}),
+                ("serve_media x-sendfile", after, "x-sendfile", {}),
+            ]
+            self.stdout.write(
+                f"{options['size']} MiB file, client at {options['client_mbps']} Mbit/s, worker time per request"
+            )
+            for label, view, mode, headers in cases:
+                request = factory.get(f"/media/{name}", headers=headers)
+                with override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE=mode):
+                    status = consume(view(request)).status_code
+
+                    def run():
+                        for _ in range(calls):
+                            consume(view(request))
+
+                    duration = timeit(run, options["repeat"]) / calls
+                self.stdout.write(
+                    f"{label:<30} {status}  {duration * 1000:9.2f} ms   {1 / duration:9.1f} requests/s per worker"
+                )
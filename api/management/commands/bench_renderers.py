@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from utils.common import success_response
+from utils.compiled_serializer import compile_serializer
+from utils.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from ..benchmark import rolled_back, seed_entries, timeit
+from ...models import Entry
+from ...serializers import EntrySerializer
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the available response renderers on the serialized entry list: "
+        "DRF's stdlib JSON renderer, orjson and MessagePack"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of entries to render")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            seed_entries(options["rows"])
+            compiled = compile_serializer(EntrySerializer)
+            data = success_response(
+                message="Entries successfully fetched.",
+                data=compiled.to_representation_many(compiled.values(Entry.objects.all())),
+            )
+
+        backends = [("json (stdlib)", JSONRenderer())]
+        if orjson:
+            backends.append(("orjson", FastJSONRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING("orjson is not installed, FastJSONRenderer uses json"))
+        if msgpack:
+            backends.append(("msgpack", MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING("msgpack is not installed"))
+
+        reference = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != reference:
+            raise CommandError("FastJSONRenderer renders different JSON than JSONRenderer")
+
+        baseline = None
+        for label, renderer in backends:
+            duration = timeit(lambda: renderer.render(data), options["repeat"])
+            baseline = baseline or duration
+            self.stdout.write(
+                f"{label:<15} {duration * 1000:8.1f} ms   {len(renderer.render(data)) / 1024:8.0f} KiB   "
+                f"{baseline / duration:5.1f}x"
+            )
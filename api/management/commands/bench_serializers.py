@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from utils.compiled_serializer import SerializerNotCompilable, compile_serializer
+from utils.query_plan import parse_field_tree
+from ..benchmark import rolled_back, seed_entries, timeit
+from ...models import Author, Entry
+from ...serializers import AuthorSerializer, EntrySerializer
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+CASES = [
+    # (label, model, serializer, ?fields=, ?expand=)
+    ("entries", Entry, EntrySerializer, None, None),
+    ("entries ?expand=", Entry, EntrySerializer, None, ""),
+    ("entries ?fields=headline,blog.name,authors", Entry, EntrySerializer, "headline,blog.name,authors", "blog"),
+    ("authors", Author, AuthorSerializer, None, None),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the compiled read serializers with the DRF serializers they are compiled from: "
+        "checks that both render the same JSON and reports the time per 10k rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of entries to seed")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        renderer = JSONRenderer()
+        with rolled_back():
+            seed_entries(rows)
+            for label, model, serializer_class, fields, expand in CASES:
+                sparse = {
+                    "fields": parse_field_tree(fields) if fields is not None else None,
+                    "expand": parse_field_tree(expand) if expand is not None else None,
+                }
+                try:
+                    compiled = compile_serializer(serializer_class, **sparse)
+                except SerializerNotCompilable as e:
+                    raise CommandError(f"{label}: {e}")
+
+                def reference():
+                    queryset = serializer_class.setup_eager_loading(model.objects.all(), **sparse)
+                    return serializer_class(queryset, many=True, **sparse).data
+
+                def fast():
+                    return compiled.to_representation_many(compiled.values(model.objects.all()))
+
+                # The extra ordering columns of compiled rows are not part of the output
+                if renderer.render(reference()) != renderer.render(fast()):
+                    raise CommandError(f"{label}: the compiled serializer renders different JSON")
+
+                count = model.objects.count()
+                per_10k = 10000 / count
+                reference_time = timeit(reference, repeat) * per_10k
+                fast_time = timeit(fast, repeat) * per_10k
+                self.stdout.write(
+                    f"{label:<45} reference {reference_time * 1000:8.1f} ms/10k rows   "
+                    f"compiled {fast_time * 1000:8.1f} ms/10k rows   "
+                    f"{reference_time / fast_time:5.1f}x"
+                )
+        self.stdout.write(self.style.SUCCESS("Compiled output matches the serializers"))
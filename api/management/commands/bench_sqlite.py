@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, transaction
+from ..benchmark import seed_entries
+from ...models import Author, Blog, Entry
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+# https://docs.djangoproject.com/en/5.0/ref/databases/#database-is-locked-errors
+
+"""
+Each profile runs in its own process since SQLITE_PROFILE is read with the settings. The process migrates
+a database file in a temporary directory and starts the workers, again as processes running this command:
+writers create and delete entries the way EntryViewSet.create and destroy do (entry, authors and blog stats
+in one transaction) while readers list entries, like the worker processes of a server. Every operation ends
+like a request does, with close_old_connections(), so CONN_MAX_AGE applies as it would in a server.
+Lock errors of readers are counted with the writers'. The workers are synchronous, so the numbers are those
+of a WSGI server: under ASGI (ASYNC_VIEWS) connections are not kept, see the settings.
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the write throughput and the rate of 'database is locked' errors of the "
+        "default and production SQLite profiles under concurrent writers and readers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Processes creating and deleting entries")
+        parser.add_argument("--readers", type=int, default=4, help="Processes listing entries")
+        parser.add_argument("--writes", type=int, default=200, help="Write requests per writer")
+        parser.add_argument("--profile", choices=["default", "production"], help="Run a single profile in this process")
+        # Set by the profile process for its workers
+        parser.add_argument("--worker", help=argparse.SUPPRESS)
+        parser.add_argument("--database", help=argparse.SUPPRESS)
+        parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+        parser.add_argument("--stop-file", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["worker"]:
+            return self.run_worker(options)
+        if options["profile"]:
+            return self.run_profile(options)
+
+        self.stdout.write(
+            f"{options['writers']} writers x {options['writes']} writes, {options['readers']} readers, "
+            "measured as WSGI worker processes"
+        )
+        for profile in ("default", "production"):
+            command = [sys.executable, sys.argv[0], "bench_sqlite", "--profile", profile]
+            for option in ("writers", "readers", "writes"):
+                command += [f"--{option}", str(options[option])]
+            env = {**os.environ, "SQLITE_PROFILE": profile, "DISABLE_DEBUG": "True"}
+            env.pop("CONN_MAX_AGE", None)  # Use the profile's default
+            env.pop("ASYNC_VIEWS", None)
+            result = subprocess.run(command, env=env, capture_output=True, text=True)
+            if result.returncode:
+                raise CommandError(f"{profile} failed:\n{result.stderr}")
+            self.stdout.write(result.stdout, ending="")
+
+    def run_profile(self, options):
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                seed_entries(100)
+                blog_ids = list(Blog.objects.values_list("pk", flat=True))
+                author_ids = list(Author.objects.values_list("pk", flat=True))
+                connection.close()
+                results = self.run_workers(options, connection.settings_dict["NAME"], blog_ids, author_ids)
+            finally:
+                connection.creation.destroy_test_db(
+                    connection.settings_dict["NAME"], verbosity=0
+                )
+
+        written, locked, reads, elapsed = results
+        attempts = written + locked
+        self.stdout.write(
+            f"{options['profile']:<11} {written / elapsed:8.0f} writes/s   "
+            f"locked {locked:5d} ({locked / attempts:6.1%})   {reads / elapsed:8.0f} reads/s   "
+            f"CONN_MAX_AGE {connection.settings_dict['CONN_MAX_AGE']}"
+        )
+
+    def run_workers(self, options, database: str, blog_ids: list[int], author_ids: list[int]):
+        start_at = time.time() + 5  # Leaves the workers time to set Django up
+        stop_file = database + ".stop"
+        command = [sys.executable, sys.argv[0], "bench_sqlite", "--profile", options["profile"]]
+        command += ["--database", database, "--start-at", str(start_at), "--writes", str(options["writes"])]
+        writers = [
+            subprocess.Popen(command + ["--worker", f"writer:{number}"], stdout=subprocess.PIPE, text=True)
+            for number in range(options["writers"])
+        ]
+        readers = [
+            subprocess.Popen(command + ["--worker", "reader", "--stop-file", stop_file], stdout=subprocess.PIPE, text=True)
+            for _ in range(options["readers"])
+        ]
+        results = [json.loads(process.communicate()[0]) for process in writers]
+        open(stop_file, "w").close()
+        elapsed = max(result["finished_at"] for result in results) - start_at
+        results += [json.loads(process.communicate()[0]) for process in readers]
+        if any(process.returncode for process in writers + readers):
+            raise CommandError("A worker failed")
+
+        totals = {"written": 0, "locked": 0, "reads": 0}
+        for result in results:
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        return totals["written"], totals["locked"], totals["reads"], elapsed
+
+    def run_worker(self, options):
+        connection.settings_dict["NAME"] = options["database"]
+        blog_ids = list(Blog.objects.values_list("pk", flat=True))
+        author_ids = list(Author.objects.values_list("pk", flat=True))
+        close_old_connections()
+        time.sleep(max(options["start_at"] - time.time(), 0))
+
+        result = {"written": 0, "locked": 0, "reads": 0}
+        role, _, number = options["worker"].partition(":")
+        if role == "writer":
+            number = int(number)
+            created = []
+            for i in range(options["writes"]):
+                try:
+                    if i % 3 == 2:
+                        # Every third request deletes an entry like EntryViewSet.destroy: the deletion reads
+                        # the related rows before it writes, in the same transaction
+                        entry = Entry.objects.get(pk=created.pop(0))
+                        with transaction.atomic():
+                            entry.delete()
+                    else:
+                        with transaction.atomic():
+                            entry = Entry.objects.create(
+                                blog_id=blog_ids[(number + i) % len(blog_ids)],
+                                headline=f"Writer {number} entry {i}",
+                                body_text="Benchmark entry",
+                            )
+                            entry.authors.set(author_ids[i % len(author_ids) :][:2])
+                        created.append(entry.pk)
+                    result["written"] += 1
+                except OperationalError as exc:
+                    if "locked" not in str(exc):
+                        raise
+                    result["locked"] += 1
+                close_old_connections()  # The end of a request
+        else:
+            while not os.path.exists(options["stop_file"]):
+                try:
+                    list(Entry.objects.order_by("-id").values("id", "headline")[:20])
+                    result["reads"] += 1
+                except OperationalError as exc:
+                    if "locked" not in str(exc):
+                        raise
+                    result["locked"] += 1
+                close_old_connections()
+        connection.close()
+        result["finished_at"] = time.time()
+        self.stdout.write(json.dumps(result))
@@ -0,0 +1,69 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ...author_import import ImportResult, import_authors, read_rows
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports authors from a CSV (header: email,name,password,bio) or NDJSON file. "
+        "With --checkpoint, an interrupted import continues after the last committed chunk when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="CSV or NDJSON file")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Input format, by default taken from the file extension (.csv or .ndjson/.jsonl)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.AUTHOR_IMPORT_CHUNK_SIZE,
+            help="Rows written per transaction",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            help="File recording the rows done after each chunk, read on start to resume",
+        )
+        parser.add_argument("--start", type=int, default=0, help="Number of rows to skip")
+
+    def handle(self, *args, **options):
+        path: Path = options["path"]
+        format = options["format"] or {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(
+            path.suffix.lower()
+        )
+        if format is None:
+            raise CommandError("Cannot tell the format from the file extension, pass --format")
+
+        checkpoint: Path | None = options["checkpoint"]
+        start = options["start"]
+        if checkpoint and checkpoint.exists():
+            start = int(checkpoint.read_text() or 0)
+            self.stdout.write(f"Resuming after row {start}")
+
+        def on_chunk(result: ImportResult):
+            if checkpoint:
+                checkpoint.write_text(str(result.rows))
+            self.stdout.write(
+                f"{result.rows} rows: {result.created} created, {result.skipped} skipped, "
+                f"{len(result.errors)} invalid"
+            )
+
+        with path.open("rb") as lines:
+            result = import_authors(
+                read_rows(lines, format), options["chunk_size"], start=start, on_chunk=on_chunk
+            )
+
+        for row, errors in sorted(result.errors.items()):
+            self.stdout.write(self.style.WARNING(f"Row {row}: {errors}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} authors, skipped {result.skipped} existing emails, "
+                f"{len(result.errors)} invalid rows."
+            )
+        )
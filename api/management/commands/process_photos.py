@@ -0,0 +1,31 @@
+from concurrent.futures import wait
+from django.core.management.base import BaseCommand
+from ...models import User
+from ...photos import process_photos
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing resized copies of every user photo, hashing photos stored before "
+        "photo_hash existed. Existing copies are kept, so it can be run again at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Users read per query")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(photo="").exclude(photo__isnull=True).only("photo", "photo_hash")
+        futures = process_photos(users.iterator(chunk_size=options["batch_size"]))
+        done, _ = wait(futures)
+
+        created = failed = 0
+        for future in done:
+            if future.exception() is not None:
+                failed += 1
+            else:
+                created += len(future.result())
+        self.stdout.write(f"Processed {len(futures)} photos, wrote {created} derivatives")
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} photos failed, see the log"))
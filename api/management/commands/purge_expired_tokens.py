@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/blacklist_app.html
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding and blacklisted refresh tokens in chunks, a short transaction per chunk. "
+        "Unlike flushexpiredtokens it does not load every expired row at once. Meant to run periodically (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Tokens deleted per transaction")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between chunks, to leave the database to other writers",
+        )
+
+    def handle(self, *args, **options):
+        now = aware_utcnow()
+        # Tokens are created in id order with the same lifetime, so expired rows come first by id
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by("id")
+        last_id = 0
+        outstanding = blacklisted = 0
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id).values_list("id", flat=True)[: options["chunk_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            with transaction.atomic():
+                # The blacklisted rows first, so that deleting the outstanding ones has nothing to cascade
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {outstanding} outstanding and {blacklisted} blacklisted expired tokens."
+            )
+        )
@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from ...search import rebuild_index, search_available
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index of entries from the entry table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index on",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if not search_available(using):
+            raise CommandError("Full-text search requires an SQLite database with FTS5")
+
+        start = time.perf_counter()
+        with transaction.atomic(using=using):
+            count = rebuild_index(using=using)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {count} entries in {time.perf_counter() - start:.2f}s"
+            )
+        )
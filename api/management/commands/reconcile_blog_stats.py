@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from utils.response_cache import bump_generation
+from ...models import Blog, BlogStats
+
+FIELDS = ("entry_count", "rating_total", "comment_total")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the per-blog stats table from the entry table and reports rows that drifted "
+        "from the incrementally maintained values"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drift, do not rewrite the table",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = {
+                row.pop("blog_id"): row for row in BlogStats.objects.compute()
+            }
+            zero = dict.fromkeys(FIELDS, 0)
+            stored = {
+                row.pop("blog_id"): row
+                for row in BlogStats.objects.select_for_update().values("blog_id", *FIELDS)
+            }
+
+            drift = 0
+            for blog_id in Blog.objects.values_list("id", flat=True).iterator():
+                want = expected.get(blog_id, zero)
+                have = stored.get(blog_id)
+                if have != want:
+                    drift += 1
+                    self.stdout.write(f"Blog {blog_id}: stored {have}, expected {want}")
+
+            if drift and not options["dry_run"]:
+                BlogStats.objects.all().delete()
+                BlogStats.objects.bulk_create(
+                    [
+                        BlogStats(blog_id=blog_id, **expected.get(blog_id, zero))
+                        for blog_id in Blog.objects.values_list("id", flat=True).iterator()
+                    ],
+                    batch_size=1000,
+                )
+                transaction.on_commit(lambda: bump_generation(BlogStats))
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Blog stats are consistent"))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{drift} blogs drifted"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt blog stats, {drift} blogs had drifted"))
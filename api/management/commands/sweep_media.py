@@ -0,0 +1,100 @@
+import posixpath
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+from django.core.files.storage import Storage, default_storage
+from django.core.management.base import BaseCommand
+from django.db import router
+from utils.deferred_delete import delete_files
+from utils.sqlite_backend.base import immediate_atomic
+from ...models import StoredFile, User
+from ...photos import derivative_names
+from ...storage import ContentAddressedStorage
+
+# https://docs.djangoproject.com/en/5.0/ref/files/storage/#django.core.files.storage.Storage.listdir
+
+
+def walk(storage: Storage, path: str = "") -> Iterator[str]:
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes files in the media storage that no user photo or photo derivative refers to, "
+        "e.g. left over from a failed deletion or a crash, and corrects the reference counts of the "
+        "photo storage. Meant to run periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Seconds a file must be unmodified before it is deleted, so uploads whose row "
+            "is not committed yet are kept",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only list the files")
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=options["min_age"])
+        try:
+            candidates = [name for name in walk(storage) if storage.get_modified_time(name) < cutoff]
+        except FileNotFoundError:  # Nothing was uploaded yet
+            candidates = []
+
+        using = router.db_for_write(StoredFile)
+        # The references are read, and the counts and files they decide about written, with the write lock
+        # held throughout: no upload or deletion can commit in between and be counted wrongly
+        with immediate_atomic(using):
+            referenced = set()
+            photo_references = Counter()
+            users = User.objects.using(using).exclude(photo="").values_list("photo", "photo_hash")
+            for name, digest in users.iterator():
+                if name:
+                    referenced.add(name)
+                    photo_references[name] += 1
+                if digest:
+                    referenced.update(
+                        name for names in derivative_names(digest).values() for name in names.values()
+                    )
+
+            orphans = [name for name in candidates if name not in referenced]
+            for name in orphans:
+                self.stdout.write(name, style_func=self.style.WARNING if options["dry_run"] else None)
+            if options["dry_run"]:
+                self.stdout.write(f"{len(orphans)} unreferenced files")
+            else:
+                # Files without references are removed directly, not through the photo storage's delete()
+                deleted = delete_files(storage, orphans)
+                self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced files"))
+            self.reconcile_references(photo_references, using, options["dry_run"])
+
+    def reconcile_references(self, references: Counter, using: str, dry_run: bool):
+        photo_storage = User._meta.get_field("photo").storage
+        if not isinstance(photo_storage, ContentAddressedStorage):
+            return
+        # Names of photos stored before the storage counted references have no row and are left alone.
+        # Rows at 0 belong to deletions that committed, their file is removed by the storage's delete()
+        prefix = f"{photo_storage.prefix}/"
+        stored = dict(StoredFile.objects.using(using).values_list("name", "refcount"))
+        counted = stored.keys() | {name for name in references if name.startswith(prefix)}
+        wrong = {
+            name: references[name]
+            for name in counted
+            if stored.get(name) != references[name]
+        }
+        for name, refcount in wrong.items():
+            self.stdout.write(f"{name}: {stored.get(name)} references counted, {refcount} found")
+        if wrong and not dry_run:
+            StoredFile.objects.using(using).filter(
+                name__in=[name for name, count in wrong.items() if not count]
+            ).delete()
+            for name, refcount in wrong.items():
+                if refcount:
+                    StoredFile.objects.using(using).update_or_create(name=name, defaults={"refcount": refcount})
+        self.stdout.write(f"{len(wrong)} reference counts {'to correct' if dry_run else 'corrected'}")
@@ -0,0 +1,66 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+# https://docs.python.org/3/library/sqlite3.html#sqlite3.Connection.backup
+# https://www.sqlite.org/backup.html
+
+"""
+Stand-in for replication when the replicas are local SQLite files: copies the primary into every replica
+with SQLite's online backup API, which reads a consistent snapshot of the primary while it keeps taking
+writes, and lets connections already open on a replica see the new content. With --interval it keeps
+copying, so the replicas trail the primary by up to the interval plus the time of a copy, which must
+stay below DATABASE_REPLICA_LAG. Real replicas are kept up to date by the database server instead.
+"""
+
+
+class Command(BaseCommand):
+    help = "Copies the primary SQLite database to the SQLite replicas, once or every --interval seconds"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0, help="Seconds between copies, 0 to copy once"
+        )
+        parser.add_argument(
+            "--database",
+            action="append",
+            choices=settings.DATABASE_REPLICAS,
+            help="Replica to copy to, all of them by default. Can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        replicas = options["database"] or settings.DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError("There are no replicas, set DATABASE_REPLICA_COUNT")
+        for alias in [DEFAULT_DB_ALIAS, *replicas]:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"{alias} is not a SQLite database, use the replication of its server")
+        if options["interval"] and options["interval"] >= settings.DATABASE_REPLICA_LAG:
+            self.stderr.write(
+                f"An interval of {options['interval']} seconds lets the replicas fall further behind than "
+                f"DATABASE_REPLICA_LAG ({settings.DATABASE_REPLICA_LAG} seconds)"
+            )
+
+        while True:
+            for alias in replicas:
+                start = time.perf_counter()
+                self.copy(connections[DEFAULT_DB_ALIAS].settings_dict["NAME"], connections[alias].settings_dict["NAME"])
+                self.stdout.write(f"{alias}: copied in {(time.perf_counter() - start) * 1000:.1f} ms")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def copy(self, primary: str, replica: str):
+        source = sqlite3.connect(primary)
+        try:
+            # Waits for the readers of the replica instead of failing while they hold it
+            target = sqlite3.connect(replica, timeout=30)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
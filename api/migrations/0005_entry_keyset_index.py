@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_user_groups_user_last_login_user_user_permissions'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='entry',
+            options={'ordering': ['pub_date', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['pub_date', 'id'], name='entry_pub_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_entry_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['mod_date', 'id'], name='entry_mod_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['rating', 'id'], name='entry_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['blog', 'pub_date', 'id'], name='entry_blog_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['blog', 'number_of_comments'], name='entry_blog_comments_idx'),
+        ),
+        # The automatically created entry_authors through table cannot declare indexes in Meta.
+        # (author_id, entry_id) serves ?authors= without visiting the table rows.
+        migrations.RunSQL(
+            sql="CREATE INDEX entry_authors_author_entry_idx ON api_entry_authors (author_id, entry_id)",
+            reverse_sql="DROP INDEX entry_authors_author_entry_idx",
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-18 14:07
+
+from django.db import migrations
+
+
+def create_entry_fts(apps, schema_editor):
+    # FTS5 virtual tables only exist on SQLite
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE api_entry_fts USING fts5(headline, body_text, tokenize='porter unicode61')"
+    )
+    schema_editor.execute(
+        "INSERT INTO api_entry_fts (rowid, headline, body_text) SELECT id, headline, body_text FROM api_entry"
+    )
+
+
+def drop_entry_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS api_entry_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_entry_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_entry_fts, drop_entry_fts),
+    ]
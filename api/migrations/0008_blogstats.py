@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-18 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_blog_stats(apps, schema_editor):
+    Blog = apps.get_model("api", "Blog")
+    BlogStats = apps.get_model("api", "BlogStats")
+    blogs = Blog.objects.annotate(
+        entry_count=Count("entry"),
+        rating_total=Coalesce(Sum("entry__rating"), 0),
+        comment_total=Coalesce(Sum("entry__number_of_comments"), 0),
+    ).values("id", "entry_count", "rating_total", "comment_total")
+    BlogStats.objects.bulk_create(
+        [
+            BlogStats(
+                blog_id=blog["id"],
+                entry_count=blog["entry_count"],
+                rating_total=blog["rating_total"],
+                comment_total=blog["comment_total"],
+            )
+            for blog in blogs
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_entry_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogStats',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.blog')),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.IntegerField(default=0)),
+                ('comment_total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_blog_stats, migrations.RunPython.noop),
+    ]
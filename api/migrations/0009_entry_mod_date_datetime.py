@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+def dates_to_datetimes(apps, schema_editor):
+    # SQLite keeps the stored "YYYY-MM-DD" text as is, other backends cast the column.
+    # Existing rows become midnight UTC of their modification day.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "UPDATE api_entry SET mod_date = mod_date || ' 00:00:00' WHERE length(mod_date) = 10"
+    )
+
+
+def datetimes_to_dates(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("UPDATE api_entry SET mod_date = substr(mod_date, 1, 10)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_blogstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entry',
+            name='mod_date',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(dates_to_datetimes, datetimes_to_dates),
+    ]
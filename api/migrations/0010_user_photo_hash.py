@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_entry_mod_date_datetime'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='photo_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-18 14:58
+
+import api.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_user_photo_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.photo_storage, upload_to='', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'png', 'jpeg', 'webp'])], verbose_name='profile photo'),
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+from collections import defaultdict
+from functools import partial
+from typing import Iterable
+from django.db import models, router, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.core.validators import (
     MaxValueValidator,
@@ -6,10 +11,11 @@ from django.core.validators import (
     FileExtensionValidator,
 )
 from django.dispatch import receiver
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from .auth.manager import CustomUserManager
+from .storage import delete_reference, photo_storage
 from utils.common import USER_ROLES
-from utils.handle_file import checkFileExists
+from utils.response_cache import bump_generation
 
 # Create your models here.
 """
@@ -36,10 +42,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         "profile photo",
         blank=True,
         null=True,
+        storage=photo_storage,  # Stored by content hash, see api/storage.py
         validators=[
             FileExtensionValidator(allowed_extensions=["jpg", "png", "jpeg", "webp"])
         ],
     )  # by default retrieves file from media root
+    # SHA-256 of the photo, names its resized copies (see api/photos.py)
+    photo_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
     role = models.CharField(
         max_length=50,
         choices=[(role.value, role.name.capitalize()) for role in USER_ROLES],
@@ -70,10 +79,25 @@ class User(AbstractBaseUser, PermissionsMixin):
     def is_superuser(self):
         return self.role == USER_ROLES.ADMIN.value
 
+    def save(self, *args, **kwargs):
+        # The photo's reference is counted in the same transaction as the row referring to it (see api/storage.py)
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(User, instance=self)):
+            super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.pk}-{self.email}"
 
 
+class StoredFile(models.Model):
+    """Number of references to a file of a ContentAddressedStorage (see api/storage.py)"""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
 class Author(models.Model):
     user = models.OneToOneField(
         User,
@@ -96,7 +120,7 @@ class Entry(models.Model):
     headline = models.CharField(max_length=255)
     body_text = models.TextField()
     pub_date = models.DateField("date published", auto_now_add=True)
-    mod_date = models.DateField(auto_now=True)
+    mod_date = models.DateTimeField(auto_now=True)  # Datetime precision for Last-Modified
     authors = models.ManyToManyField(to=Author)
     number_of_comments = models.IntegerField(default=0)
     rating = models.IntegerField(
@@ -108,13 +132,178 @@ class Entry(models.Model):
     )
 
     class Meta:
-        ordering = ["pub_date"]
+        ordering = ["pub_date", "id"]  # id keeps the order stable for keyset pagination
+        # Indexes backing keyset pagination and the filters/orderings accepted by EntryViewSet
+        indexes = [
+            models.Index(fields=["pub_date", "id"], name="entry_pub_date_id_idx"),
+            models.Index(fields=["mod_date", "id"], name="entry_mod_date_id_idx"),
+            models.Index(fields=["rating", "id"], name="entry_rating_id_idx"),
+            models.Index(fields=["blog", "pub_date", "id"], name="entry_blog_pub_date_idx"),
+            models.Index(
+                fields=["blog", "number_of_comments"], name="entry_blog_comments_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        entry = super().from_db(db, field_names, values)
+        if not entry.get_deferred_fields() & {"blog_id", "rating", "number_of_comments"}:
+            # The values BlogStats counted for the entry, see post_save_entry_stats
+            entry._stats_counted = BlogStats.objects.snapshot(entry)
+        return entry
+
+
+class BlogStatsManager(models.Manager):
+    @staticmethod
+    def snapshot(entry: Entry) -> tuple[int, int, int]:
+        """Values of an entry counted by the stats, taken before it is changed or deleted"""
+        return (entry.blog_id, entry.rating, entry.number_of_comments)
+
+    def record_entry_changes(
+        self,
+        before: Iterable[tuple[int, int, int]] = (),
+        after: Iterable[tuple[int, int, int]] = (),
+    ):
+        """
+        Applies the difference between the snapshots of entries before and after a write.
+        Created entries only have an after snapshot and deleted entries only a before one.
+        Must run in the same transaction as the entry write.
+        """
+        deltas: defaultdict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+        for sign, snapshots in ((-1, before), (1, after)):
+            for blog_id, rating, comments in snapshots:
+                delta = deltas[blog_id]
+                delta[0] += sign
+                delta[1] += sign * rating
+                delta[2] += sign * comments
+
+        changed = False
+        for blog_id, (entries, rating, comments) in deltas.items():
+            if entries or rating or comments:
+                self.apply_delta(blog_id, entries, rating, comments)
+                changed = True
+        if changed:
+            # QuerySet.update sends no signals, see api/cache_invalidation.py
+            transaction.on_commit(partial(bump_generation, BlogStats))
+
+    def apply_delta(self, blog_id: int, entries: int, rating: int, comments: int):
+        updated = self.filter(blog_id=blog_id).update(
+            entry_count=F("entry_count") + entries,
+            rating_total=F("rating_total") + rating,
+            comment_total=F("comment_total") + comments,
+        )
+        if not updated:
+            # No row yet for a blog created before the table existed: count it from scratch
+            self.recompute(blog_id)
+
+    def compute(self) -> models.QuerySet:
+        # One GROUP BY over entries, used when (re)building rows instead of applying deltas
+        return (
+            Entry.objects.order_by()
+            .values("blog_id")
+            .annotate(
+                entry_count=Count("id"),
+                rating_total=Coalesce(Sum("rating"), 0),
+                comment_total=Coalesce(Sum("number_of_comments"), 0),
+            )
+        )
+
+    def recompute(self, blog_id: int) -> "BlogStats":
+        values = self.compute().filter(blog_id=blog_id).order_by("blog_id").first() or {}
+        values.pop("blog_id", None)
+        return self.update_or_create(blog_id=blog_id, defaults=values)[0]
+
+
+class BlogStats(models.Model):
+    """
+    Per-blog entry aggregates stored as a summary table, so reading them does not run a GROUP BY over entries.
+    Created with its blog and kept up to date by the Entry signals below, so writes through the API, the admin
+    or the ORM are all counted. Writes that skip signals (bulk_create, bulk_update, QuerySet.update) call
+    BlogStats.objects.record_entry_changes themselves. Rebuilt from scratch by the reconcile_blog_stats
+    management command.
+    """
+
+    blog = models.OneToOneField(
+        Blog, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    entry_count = models.PositiveIntegerField(default=0)
+    rating_total = models.IntegerField(default=0)
+    comment_total = models.IntegerField(default=0)
+
+    objects: BlogStatsManager = BlogStatsManager()
+
+    @property
+    def average_rating(self) -> float | None:
+        return self.rating_total / self.entry_count if self.entry_count else None
+
+    def __str__(self):
+        return f"{self.pk}-{self.entry_count} entries"
 
 
 # https://docs.djangoproject.com/en/5.0/topics/signals/
 # https://docs.djangoproject.com/en/5.0/ref/signals/
+@receiver(post_save, sender=Blog)
+def post_save_blog_stats(sender, instance: Blog, created: bool, raw: bool, **kwargs):
+    if created and not raw:  # Fixtures bring their own stats rows
+        BlogStats.objects.create(blog=instance)
+
+
+def _load_counted(entry: Entry, using: str) -> tuple[int, int, int] | None:
+    # For entries not loaded with their counted values (deferred, or built with a primary key)
+    return (
+        Entry._base_manager.using(using)
+        .filter(pk=entry.pk)
+        .values_list("blog_id", "rating", "number_of_comments")
+        .first()
+    )
+
+
+def _deleted_with_blog(origin) -> bool:
+    # The stats row of a deleted blog is deleted by the same cascade
+    return isinstance(origin, Blog) or (isinstance(origin, models.QuerySet) and origin.model is Blog)
+
+
+@receiver(pre_save, sender=Entry)
+def pre_save_entry_stats(sender, instance: Entry, raw: bool, using: str, **kwargs):
+    if raw or instance.pk is None or hasattr(instance, "_stats_counted"):
+        return
+    # Read them before they change
+    instance._stats_counted = _load_counted(instance, using)
+
+
+@receiver(post_save, sender=Entry)
+def post_save_entry_stats(sender, instance: Entry, created: bool, raw: bool, **kwargs):
+    """Runs in the transaction of the save, if any"""
+    if raw:
+        return
+    counted = None if created else getattr(instance, "_stats_counted", None)
+    instance._stats_counted = BlogStats.objects.snapshot(instance)
+    BlogStats.objects.record_entry_changes(
+        before=[counted] if counted else [], after=[instance._stats_counted]
+    )
+
+
+@receiver(pre_delete, sender=Entry)
+def pre_delete_entry_stats(sender, instance: Entry, origin, using: str, **kwargs):
+    if _deleted_with_blog(origin) or hasattr(instance, "_stats_counted"):
+        return
+    # Deferred values can no longer be loaded once the row is gone
+    instance._stats_counted = _load_counted(instance, using)
+
+
+@receiver(post_delete, sender=Entry)
+def post_delete_entry_stats(sender, instance: Entry, origin, **kwargs):
+    counted = getattr(instance, "_stats_counted", None)
+    if counted and not _deleted_with_blog(origin):
+        BlogStats.objects.record_entry_changes(before=[counted])
+
+
 @receiver(post_delete, sender=User)
-def post_delete_user_photo(sender, instance: User, *args, **kwargs):
-    """Delete file field when model instance or queryset is deleted"""
-    if instance.photo and checkFileExists(instance.photo.path):
-        instance.photo.delete()
\ No newline at end of file
+def post_delete_user_photo(sender, instance: User, using: str, *args, **kwargs):
+    """
+    Delete file field when model instance or queryset is deleted.
+    The reference is dropped with the row, and the file only deleted once the deletion commits, in one batch
+    for all deleted users (see utils/deferred_delete.py)
+    """
+    if instance.photo:
+        delete_reference(instance.photo.storage, instance.photo.name, using)
\ No newline at end of file
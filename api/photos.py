@@ -0,0 +1,143 @@
+import hashlib
+import logging
+from concurrent.futures import Future
+from functools import partial
+from typing import IO, Iterable
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from utils.images import FORMATS, render_derivatives
+from utils.process_pool import get_process_pool
+from utils.response_cache import bump_generation
+from .models import User
+
+# https://docs.djangoproject.com/en/5.0/ref/signals/#pre-save
+# https://docs.djangoproject.com/en/5.0/topics/db/transactions/#performing-actions-after-commit
+
+"""
+Resized copies (derivatives) of User.photo in the sizes and formats of PHOTO_DERIVATIVE_SIZES and
+PHOTO_DERIVATIVE_FORMATS, so clients do not download the original to render a small avatar.
+
+The photo's SHA-256 is stored in User.photo_hash when a new photo is saved, and derivatives are named
+after it: derivatives/<hash[:2]>/<hash>/<size>.<ext>. Generating them again for the same content is
+a no-op, and users with the same photo share them. The images are rendered on the worker processes
+once the transaction commits, so the upload request does not wait for Pillow. Their URLs are known
+from the hash alone and are returned right away (UserSerializer.photo_derivatives); until the worker
+is done they are missing and clients fall back to the photo itself.
+"""
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(file: IO[bytes]) -> str:
+    """SHA-256 of a file read in chunks, leaving the file at its start"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    while chunk := file.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def derivative_specs() -> list[tuple[int, str]]:
+    return [
+        (size, format)
+        for size in settings.PHOTO_DERIVATIVE_SIZES
+        for format in settings.PHOTO_DERIVATIVE_FORMATS
+    ]
+
+
+def derivative_name(digest: str, size: int, format: str) -> str:
+    return f"derivatives/{digest[:2]}/{digest}/{size}.{FORMATS[format][1]}"
+
+
+def derivative_names(digest: str) -> dict[str, dict[str, str]]:
+    """Storage names of the derivatives of a photo by size and format, e.g. names["64"]["webp"]"""
+    names: dict[str, dict[str, str]] = {}
+    for size, format in derivative_specs():
+        names.setdefault(str(size), {})[format] = derivative_name(digest, size, format)
+    return names
+
+
+def generate_derivatives(name: str, digest: str) -> list[str]:
+    """
+    Writes the derivatives of the stored photo that do not exist yet and returns their names.
+    Runs on the worker processes and only uses the storage, not the database.
+    """
+    missing = [
+        (size, format)
+        for size, format in derivative_specs()
+        if not default_storage.exists(derivative_name(digest, size, format))
+    ]
+    if not missing:
+        return []
+    with User._meta.get_field("photo").storage.open(name, "rb") as source:
+        derivatives = render_derivatives(source, missing, settings.PHOTO_DERIVATIVE_QUALITY)
+    return [
+        default_storage.save(derivative_name(digest, size, format), ContentFile(content))
+        for (size, format), content in derivatives.items()
+    ]
+
+
+def _log_failure(name: str, future: Future):
+    if future.exception() is not None:
+        logger.error(
+            "Generating the derivatives of %s failed", name, exc_info=future.exception()
+        )
+
+
+def schedule_derivatives(name: str, digest: str) -> Future:
+    future = get_process_pool().submit(generate_derivatives, name, digest)
+    future.add_done_callback(partial(_log_failure, name))
+    return future
+
+
+def process_photos(users: Iterable[User]) -> list[Future]:
+    """
+    Hashes the photos of the given users that have no hash yet and schedules their derivatives.
+    Used by the process_photos command for photos stored before derivatives existed.
+    """
+    missing_hash = []
+    futures = []
+    for user in users:
+        if not user.photo:
+            continue
+        if not user.photo_hash:
+            with user.photo.storage.open(user.photo.name, "rb") as file:
+                user.photo_hash = file_digest(file)
+            missing_hash.append(user)
+        futures.append(schedule_derivatives(user.photo.name, user.photo_hash))
+    if missing_hash:
+        # Written without save() so that the post_save receiver does not schedule them again
+        User.objects.bulk_update(missing_hash, ["photo_hash"], batch_size=500)
+        bump_generation(User)  # Cached responses lack the derivative URLs
+    return futures
+
+
+@receiver(pre_save, sender=User)
+def hash_new_photo(sender, instance: User, **kwargs):
+    """
+    Hashes a photo that is about to be stored. FieldFile._committed is False for a newly assigned
+    file until the field saves it, which happens after this signal.
+    """
+    photo = instance.photo
+    if photo and not photo._committed:
+        instance.photo_hash = photo.file.sha256 = file_digest(photo.file)  # Reused by the storage
+        instance._photo_changed = True
+    elif not photo:
+        instance.photo_hash = ""
+
+
+@receiver(post_save, sender=User)
+def derive_new_photo(sender, instance: User, using: str, **kwargs):
+    if getattr(instance, "_photo_changed", False):
+        instance._photo_changed = False
+        # After commit: the photo must not be processed for a write that is rolled back
+        transaction.on_commit(
+            partial(schedule_derivatives, instance.photo.name, instance.photo_hash), using=using
+        )
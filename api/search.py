@@ -0,0 +1,119 @@
+from typing import Iterable, NamedTuple
+from django.db import connections, router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework import exceptions, status
+from .models import Entry
+
+# https://www.sqlite.org/fts5.html
+# https://docs.djangoproject.com/en/5.0/topics/db/sql/#executing-custom-sql-directly
+
+"""
+Full-text index over Entry.headline and Entry.body_text kept in an SQLite FTS5 virtual table.
+The table is created by migration 0007 and uses the entry id as its rowid.
+It is kept in sync by the signal receivers below, in the same transaction as the entry write.
+Bulk writes that skip signals have to call index_entries/remove_entries themselves.
+"""
+
+FTS_TABLE = "api_entry_fts"
+HIGHLIGHT = ("<mark>", "</mark>")
+
+
+class SearchUnavailable(exceptions.APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "Full-text search requires an SQLite database with FTS5."
+    default_code = "search_unavailable"
+
+
+class SearchHit(NamedTuple):
+    id: int
+    score: float
+    snippet: str
+
+
+def search_available(using: str = "default") -> bool:
+    return connections[using].vendor == "sqlite"
+
+
+def build_match_query(query: str) -> str:
+    # Quote every term so user input is never parsed as FTS5 query syntax (AND, NEAR, column filters...).
+    # A trailing * on a term is kept as a prefix search.
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if term:
+            terms.append('"{}"'.format(term.replace('"', '""')) + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_entries(query: str, limit: int) -> list[SearchHit]:
+    """
+    Returns the limit best matches first, ranked by BM25 with headline matches weighted higher.
+    Raises SearchUnavailable on databases without the index.
+    """
+    using = router.db_for_read(Entry)
+    if not search_available(using):
+        raise SearchUnavailable()
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT rowid, -bm25({FTS_TABLE}, 2.0, 1.0) AS score,
+                snippet({FTS_TABLE}, -1, %s, %s, '…', 16)
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            [*HIGHLIGHT, match, limit],
+        )
+        return [SearchHit(*row) for row in cursor.fetchall()]
+
+
+def index_entries(entries: Iterable[Entry], using: str = "default"):
+    rows = [(entry.pk, entry.headline, entry.body_text) for entry in entries]
+    if not rows or not search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [row[:1] for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, headline, body_text) VALUES (%s, %s, %s)", rows
+        )
+
+
+def remove_entries(ids: Iterable[int], using: str = "default"):
+    params = [(pk,) for pk in ids]
+    if not params or not search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", params)
+
+
+def rebuild_index(using: str = "default") -> int:
+    """Repopulates the whole index from the entry table with set-based SQL and returns the row count"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, headline, body_text) "
+            f"SELECT id, headline, body_text FROM {Entry._meta.db_table}"
+        )
+        count = cursor.rowcount
+        # Merge the index b-trees written by the bulk insert into one
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return count
+
+
+@receiver(post_save, sender=Entry)
+def post_save_index_entry(sender, instance: Entry, using: str, *args, **kwargs):
+    """Keep the full-text index in sync with created or updated entries"""
+    index_entries([instance], using=using)
+
+
+@receiver(post_delete, sender=Entry)
+def post_delete_unindex_entry(sender, instance: Entry, using: str, *args, **kwargs):
+    """Remove deleted entries, including ones deleted by a cascade or a queryset delete"""
+    remove_entries([instance.pk], using=using)
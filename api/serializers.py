@@ -1,44 +1,90 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
 from .models import *
+from .photos import derivative_names
+from .storage import delete_reference
 from rest_framework import serializers
-from django.contrib.auth.hashers import make_password
-from utils.handle_file import change_filename
+from utils.hashing import hash_password
+from utils.query_plan import QueryPlanMixin
 
 # https://www.django-rest-framework.org/api-guide/serializers/
 # https://www.django-rest-framework.org/api-guide/fields/
 # https://www.django-rest-framework.org/api-guide/relations/
 
-class BlogSerializer(serializers.ModelSerializer):
+class BlogStatsSerializer(QueryPlanMixin, serializers.ModelSerializer):
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BlogStats
+        exclude = ["blog"]
+
+
+class BlogSerializer(QueryPlanMixin, serializers.ModelSerializer):
     """
     Object-level custom validation: https://www.django-rest-framework.org/api-guide/serializers/#object-level-validation
     Field-level custom validation: https://www.django-rest-framework.org/api-guide/serializers/#field-level-validation
     """
 
+    stats = BlogStatsSerializer(read_only=True, allow_null=True)
+
     class Meta:
         model = Blog
         fields = "__all__"
+        select_related = {"stats": BlogStatsSerializer}
 
 
-class UserSerializer(serializers.ModelSerializer):
-    def create(self, validated_data: dict):
-        validated_data["password"] = make_password(validated_data["password"])
-        if validated_data.get("photo"):
-            validated_data["photo"].name = change_filename(validated_data["photo"])
+class PhotoDerivativesField(serializers.Field):
+    """
+    URLs of the resized copies of the photo by size and format, e.g. {"64": {"webp": ..., "jpeg": ...}},
+    built from User.photo_hash (see api/photos.py). Absolute when the request is in the context, like FileField.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        kwargs.setdefault("source", "photo_hash")
+        super().__init__(**kwargs)
+
+    def to_representation(self, digest: str):
+        if not digest:
+            return None
+        request = self.context.get("request")
+        return {
+            size: {
+                format: request.build_absolute_uri(default_storage.url(name))
+                if request is not None
+                else default_storage.url(name)
+                for format, name in names.items()
+            }
+            for size, names in derivative_names(digest).items()
+        }
+
+
+class UserSerializer(QueryPlanMixin, serializers.ModelSerializer):
+    photo_derivatives = PhotoDerivativesField()
 
+    def create(self, validated_data: dict):
+        validated_data["password"] = hash_password(validated_data["password"])
+        # The photo is stored under the hash of its content, see api/storage.py
         return super().create(validated_data)
 
     def update(self, instance: User, validated_data: dict):
         if "password" in validated_data:
-            validated_data["password"] = make_password(validated_data["password"])
+            validated_data["password"] = hash_password(validated_data["password"])
 
+        replaced_photo = None
         if validated_data.get("photo"):
-            if instance.photo: instance.photo.delete()
-            validated_data["photo"].name = change_filename(validated_data["photo"])
+            replaced_photo = instance.photo.name if instance.photo else None
 
-        return super().update(instance, validated_data)
+        with transaction.atomic(using=instance._state.db):
+            instance = super().update(instance, validated_data)
+            if replaced_photo:
+                # Deleted once the update commits: the row keeps pointing at the old file if it rolls back
+                delete_reference(instance.photo.storage, replaced_photo, instance._state.db)
+        return instance
 
     class Meta:
         model = User
-        exclude = ['last_login', 'user_permissions', 'groups']
+        exclude = ['last_login', 'user_permissions', 'groups', 'photo_hash']
         extra_kwargs = {"password": {"write_only": True}}
 
 
@@ -69,7 +115,7 @@ class UserInputSerializer(UserSerializer):
         return super().update(instance, validated_data)
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(QueryPlanMixin, serializers.ModelSerializer):
     """
     The depth Meta options allows you to return all the fields of its relational field as a nested object
     instead of just getting their primary key values. However, serializers should be used for relational fields instead
@@ -91,23 +137,48 @@ class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = "__all__"
+        select_related = {"user": UserSerializer}
         
 class AuthorInputSerializer(AuthorSerializer):
     user = UserInputSerializer()
 
-class EntrySerializer(serializers.ModelSerializer):
-    def to_representation(self, obj: Entry):
-        # To get relational fields as nested objects only during read operation
-        res = super().to_representation(obj)
-        res["blog"] = BlogSerializer(obj.blog).data
-        res["authors"] = AuthorSerializer(obj.authors, many=True).data
-        return res
+class EntrySerializer(QueryPlanMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Entry
+        fields = "__all__"
+        # blog and authors are written as primary keys and read as nested objects (see QueryPlanMixin.to_representation)
+        select_related = {"blog": BlogSerializer}
+        prefetch_related = {"authors": AuthorSerializer}
+
+
+class EntryBulkSerializer(serializers.ModelSerializer):
+    """
+    Validates a single item of a bulk entry write (see api/bulk.py).
+    Related objects are taken as plain primary keys so that their existence can be checked
+    for the whole batch with one IN query instead of one query per item and relation.
+    """
+
+    id = serializers.IntegerField(required=False)  # Required to identify the entry in updates
+    blog = serializers.IntegerField(min_value=1)
+    authors = serializers.ListField(child=serializers.IntegerField(min_value=1))
 
     class Meta:
         model = Entry
         fields = "__all__"
 
 
+class AuthorImportSerializer(serializers.Serializer):
+    """
+    Validates a single row of an author import (see api/author_import.py).
+    Email uniqueness is checked for a whole chunk of rows with one IN query.
+    """
+
+    email = serializers.EmailField(max_length=254)
+    name = serializers.CharField(max_length=255)
+    password = serializers.CharField(trim_whitespace=False)
+    bio = serializers.CharField(required=False, allow_blank=True, default="")
+
+
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField(
         label="Email",
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import router, transaction
+from django.db.models import F
+from utils.deferred_delete import delete_on_commit
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-file-storage/
+# https://docs.djangoproject.com/en/5.0/ref/settings/#std-setting-STORAGES
+
+"""
+Content-addressed file storage: a file is stored under the SHA-256 of its content, in a directory
+sharded by the first bytes of the hash (<prefix>/ab/cd/abcd...<ext>), whatever name it was uploaded with.
+Storing the same content again only adds a reference to the existing file, and deleting a name only
+removes the file with its last reference. The reference counts are kept in the StoredFile table,
+updated in the same transaction as the rows referring to the files: release() drops a reference
+along with the row, and delete() removes the file after the commit if that was the last one.
+Names never change content, so they can be cached forever.
+"""
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, prefix: str = "", **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix.strip("/")
+
+    def content_name(self, digest: str, extension: str) -> str:
+        return "/".join(filter(None, [self.prefix, digest[:2], digest[2:4], digest + extension]))
+
+    def get_available_name(self, name, max_length=None):
+        # The name is chosen by _save from the content, the uploaded name only gives the extension
+        return name
+
+    def _write_temporary(self, content: File) -> tuple[str, str]:
+        """Copies the content to a temporary file next to the stored ones, hashing it on the way"""
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temporary_path = tempfile.mkstemp(prefix=".upload-", dir=directory)
+        with os.fdopen(fd, "wb") as temporary:
+            for chunk in content.chunks(CHUNK_SIZE):
+                digest.update(chunk)
+                temporary.write(chunk)
+        return temporary_path, digest.hexdigest()
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        extension = os.path.splitext(name)[1].lower()
+        # The hash may be known already (see api/photos.py), then content that is stored is not copied again
+        digest = getattr(content, "sha256", None)
+        temporary_path = None
+        try:
+            if digest is None:
+                temporary_path, digest = self._write_temporary(content)
+            name = self.content_name(digest, extension)
+            with transaction.atomic(using=router.db_for_write(StoredFile)):
+                # The reference is counted first: the row lock orders this save against a delete of the same name
+                if not StoredFile.objects.filter(name=name).update(refcount=F("refcount") + 1):
+                    StoredFile.objects.create(name=name, refcount=1)
+                if not self.exists(name):
+                    if temporary_path is None:
+                        temporary_path, _ = self._write_temporary(content)
+                    path = self.path(name)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temporary_path, path)
+                    temporary_path = None
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+        finally:
+            if temporary_path is not None:
+                os.remove(temporary_path)
+        return name
+
+    def release(self, name: str, using: str):
+        """Removes a reference to the file in the current transaction. The row is kept at 0 until delete()"""
+        from .models import StoredFile
+
+        StoredFile.objects.using(using).filter(name=name, refcount__gt=0).update(refcount=F("refcount") - 1)
+
+    def delete(self, name):
+        """Deletes the file if release() removed its last reference, and nothing was stored under the name since"""
+        from .models import StoredFile
+
+        with transaction.atomic(using=router.db_for_write(StoredFile)):
+            # The DELETE takes the write lock before anything is read, so a save of the same content
+            # waits for the file to be gone instead of counting a reference to it in between
+            if not StoredFile.objects.filter(name=name, refcount=0).delete()[0]:
+                # Files stored before the reference counts existed have no row and a single reference
+                if StoredFile.objects.filter(name=name).exists():
+                    return
+            super().delete(name)
+
+
+def delete_reference(storage, name: str, using: str):
+    """
+    Drops the reference of a deleted or replaced row to the file, in the transaction of that row, and
+    deletes the file once it commits (see utils/deferred_delete.py)
+    """
+    if isinstance(storage, ContentAddressedStorage):
+        storage.release(name, using)
+    delete_on_commit(storage, name, using=using)
+
+
+def photo_storage():
+    # A callable, so that migrations refer to the storage instead of serializing it
+    return storages["photos"]
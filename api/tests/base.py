@@ -0,0 +1,96 @@
+import atexit
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from ..auth import blacklist, token_cache, user_cache
+from ..models import Author, Blog, Entry, User
+
+
+class ImmediateExecutor:
+    """Stands in for the thread and process pools: runs each task right away in the test's thread"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        return map(fn, *iterables)
+
+
+# The default cache directory is shared with any server running from the same directory, the tests use one
+# of their own. Still file-based like the default cache: ReplicaRoutingMiddleware refuses process-local caches
+TEST_CACHE_DIR = tempfile.mkdtemp(prefix="test-cache-")
+atexit.register(shutil.rmtree, TEST_CACHE_DIR, ignore_errors=True)
+TEST_CACHES = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(TEST_CACHE_DIR, alias),
+    }
+    for alias in ("default", "auth")
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class APITestCase(TestCase):
+    """Blogs, authors and entries shared by the API tests, and clients authenticated as their users"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email="admin@example.com", password="secret123", name="Admin", role="admin"
+        )
+        cls.blogs = [Blog.objects.create(name=f"Blog {i}", tagline="Tagline") for i in range(3)]
+        cls.users = [
+            User.objects.create_user(
+                email=f"author{i}@example.com", password="secret123", name=f"Author {i}", role="author"
+            )
+            for i in range(3)
+        ]
+        cls.authors = [Author.objects.create(user=user, bio="Bio") for user in cls.users]
+        cls.entries = [cls.create_entry(i) for i in range(6)]
+
+    @classmethod
+    def create_entry(cls, i: int) -> Entry:
+        entry = Entry.objects.create(
+            blog=cls.blogs[i % len(cls.blogs)],
+            headline=f"Headline {i}",
+            body_text=f"Body text {i}",
+            rating=i % 5,
+            number_of_comments=i,
+        )
+        entry.authors.set(cls.authors[: i % len(cls.authors) + 1])
+        return entry
+
+    def setUp(self):
+        # The caches live in the test process and would carry responses and tokens across tests
+        for alias in ("default", "auth"):
+            caches[alias].clear()
+        user_cache._users.clear()
+        token_cache._tokens.clear()
+        blacklist._filter = blacklist._filter_generation = None
+        blacklist._built_at = 0.0
+
+    def client_for(self, user: User | None = None) -> APIClient:
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        return client
+
+    def login(self) -> dict:
+        """Access and refresh tokens of the admin, from the login endpoint"""
+        response = APIClient().post(
+            "/api/login/", {"email": "admin@example.com", "password": "secret123"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["result"]
+
+    def bearer(self, token: str) -> APIClient:
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
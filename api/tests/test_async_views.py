@@ -0,0 +1,88 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from ..views.author import AuthorDetail, AuthorList
+from ..views.blog import BlogList
+from ..views.entry import EntryViewSet
+from .base import APITestCase
+
+
+async def read(response) -> bytes:
+    if hasattr(response, "render"):
+        response.render()
+    if response.streaming:
+        return b"".join([chunk async for chunk in response.streaming_content])
+    return response.content
+
+
+@override_settings(ASYNC_VIEWS=True, RESPONSE_CACHE_TIMEOUT=0)
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = f"Bearer {AccessToken.for_user(self.admin)}"
+
+    async def get(self, view, path: str, headers: dict | None = None, **kwargs):
+        request = AsyncRequestFactory().get(path, headers={"Authorization": self.token, **(headers or {})})
+        response = await view(request, **kwargs)
+        return response, await read(response)
+
+    async def compare(self, view_class, initkwargs: dict, path: str, **kwargs) -> dict:
+        """Checks that the async handler answers like the sync one, and returns the response body"""
+        view = view_class.as_view(**initkwargs)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        response, body = await self.get(view, path, **kwargs)
+
+        with override_settings(ASYNC_VIEWS=False):
+            sync_view = view_class.as_view(**initkwargs)
+
+        def get_sync():
+            sync_response = sync_view(APIRequestFactory().get(path, HTTP_AUTHORIZATION=self.token), **kwargs)
+            if sync_response.streaming:
+                return sync_response.status_code, b"".join(sync_response.streaming_content)
+            return sync_response.status_code, sync_response.render().content
+
+        status_code, content = await sync_to_async(get_sync)()
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(json.loads(body), json.loads(content))
+        return json.loads(body)
+
+    async def test_lists_match_the_sync_handlers(self):
+        for path in ("/api/entries/?page_size=3", "/api/entries/?expand=authors", "/api/entries/?stream=true"):
+            with self.subTest(path=path):
+                await self.compare(EntryViewSet, {"actions": {"get": "list"}}, path)
+        await self.compare(BlogList, {}, "/api/blogs/")
+        await self.compare(AuthorList, {}, "/api/authors/?stream=1")
+
+    async def test_details_match_the_sync_handlers(self):
+        entry = self.entries[3]
+        body = await self.compare(EntryViewSet, {"actions": {"get": "retrieve"}}, "/", entryId=entry.pk)
+        self.assertEqual(body["result"]["id"], entry.pk)
+        await self.compare(EntryViewSet, {"actions": {"get": "retrieve"}}, "/", entryId=999999)
+        await self.compare(AuthorDetail, {}, "/", authorId=self.authors[0].pk)
+
+    async def test_conditional_and_cached_responses(self):
+        view = EntryViewSet.as_view({"get": "list"})
+        response, _ = await self.get(view, "/api/entries/")
+        response, _ = await self.get(view, "/api/entries/", {"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        with override_settings(RESPONSE_CACHE_TIMEOUT=60):
+            miss, body = await self.get(view, "/api/entries/")
+            hit, cached = await self.get(view, "/api/entries/")
+        self.assertEqual((miss["X-Cache"], hit["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(cached, body)
+
+    async def test_writes_and_authentication(self):
+        # POST has no async handler and runs the sync dispatch in a thread
+        view = BlogList.as_view()
+        request = AsyncRequestFactory().post(
+            "/api/blogs/", {"name": "Async", "tagline": "Tagline"}, content_type="application/json",
+            headers={"Authorization": self.token},
+        )
+        self.assertEqual((await view(request)).status_code, 201)
+
+        view = EntryViewSet.as_view({"get": "list"})
+        response, _ = await self.get(view, "/api/entries/", {"Authorization": "Bearer forged"})
+        self.assertEqual(response.status_code, 401)
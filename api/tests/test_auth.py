@@ -0,0 +1,19 @@
+from .base import APITestCase
+
+
+class TokenRevocationTests(APITestCase):
+    def test_logout_revokes_the_access_token(self):
+        tokens = self.login()
+        client = self.bearer(tokens["access_token"])
+        self.assertEqual(client.get("/api/metrics/").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/logout/", {"refresh_token": tokens["refresh_token"]}, format="json")
+        self.assertEqual(response.status_code, 204, response.content)
+        self.assertEqual(client.get("/api/metrics/").status_code, 401)
+
+    def test_forged_and_refresh_tokens_are_rejected(self):
+        tokens = self.login()
+        forged = tokens["access_token"][:-4] + ("AAAA" if not tokens["access_token"].endswith("AAAA") else "BBBB")
+        self.assertEqual(self.bearer(forged).get("/api/metrics/").status_code, 401)
+        self.assertIn(self.bearer(tokens["refresh_token"]).get("/api/metrics/").status_code, (401, 403))
+
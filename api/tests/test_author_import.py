@@ -0,0 +1,72 @@
+from unittest import mock
+from django.test import override_settings
+from .. import author_import
+from ..models import Author, User
+from .base import APITestCase, ImmediateExecutor
+
+CSV = (
+    b"email,name,password,bio\n"
+    b"new1@example.com,New 1,secret123,Bio\n"
+    b"author0@example.com,Existing,secret123,\n"  # Skipped
+    b"not-an-email,Invalid,secret123,\n"
+    b"new1@example.com,Duplicate,secret123,\n"
+    b"new2@example.com,New \xff,secret123,\n"  # Invalid UTF-8
+    b"new3@example.com,New 3,secret123,\n"
+)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], AUTHOR_IMPORT_CHUNK_SIZE=10
+)
+class AuthorImportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.object(author_import, "get_process_pool", return_value=ImmediateExecutor()))
+
+    def post(self, body: bytes, content_type: str, start: int = 0) -> dict:
+        response = self.client_for(self.admin).generic(
+            "POST", f"/api/authors/import/?start={start}", body, content_type=content_type
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["result"]
+
+    def test_csv_import_reports_skipped_and_invalid_rows(self):
+        result = self.post(CSV, "text/csv")
+        self.assertEqual((result["rows"], result["created"], result["skipped"]), (6, 2, 1))
+        self.assertEqual(set(result["errors"]), {"3", "4", "5"})
+        self.assertIn("Invalid UTF-8", result["errors"]["5"]["non_field_errors"][0])
+        self.assertEqual(User.objects.get(email="new1@example.com").name, "New 1")
+        self.assertTrue(Author.objects.filter(user__email="new3@example.com").exists())
+        self.assertFalse(User.objects.filter(email="new2@example.com").exists())
+
+    def test_ndjson_import_resumes_after_start(self):
+        body = (
+            b'{"email": "new1@example.com", "name": "New 1", "password": "secret123"}\n'
+            b"{not json\n"
+            b"\n"
+            b'{"email": "new2@example.com", "name": "New 2", "password": "secret123"}\n'
+        )
+        result = self.post(body, "application/x-ndjson", start=1)
+        self.assertEqual((result["rows"], result["created"]), (3, 1))
+        self.assertIn("Invalid JSON", result["errors"]["2"]["non_field_errors"][0])
+        self.assertFalse(User.objects.filter(email="new1@example.com").exists())
+        self.assertTrue(User.objects.filter(email="new2@example.com").exists())
+
+    def test_email_taken_after_the_check_is_skipped(self):
+        check_emails = author_import._check_emails
+
+        def sign_up_after_check(validated, result, using=None):
+            check_emails(validated, result, using)
+            if using is None:
+                User.objects.create_user(
+                    email="new1@example.com", password="secret123", name="Sign-up", role="author"
+                )
+
+        with mock.patch.object(author_import, "_check_emails", side_effect=sign_up_after_check):
+            result = self.post(
+                b"email,name,password\nnew1@example.com,New 1,secret123\nnew2@example.com,New 2,secret123\n",
+                "text/csv",
+            )
+        self.assertEqual((result["created"], result["skipped"]), (1, 1))
+        self.assertEqual(User.objects.get(email="new1@example.com").name, "Sign-up")
+        self.assertTrue(User.objects.filter(email="new2@example.com").exists())
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from ..auth import blacklist
+from ..auth.tokens import UserRefreshToken
+from .base import APITestCase
+
+
+class RefreshTokenBlacklistTests(APITestCase):
+    def test_logout_blacklists_the_refresh_token(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bearer(tokens["access_token"]).post(
+                "/api/logout/", {"refresh_token": tokens["refresh_token"]}, format="json"
+            )
+        response = APIClient().post("/api/token-renew/", {"refresh_token": tokens["refresh_token"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("blacklisted", response.json()["message"])
+
+    def test_renewed_refresh_token_cannot_be_reused(self):
+        tokens = self.login()
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            renewed = client.post("/api/token-renew/", {"refresh_token": tokens["refresh_token"]}, format="json")
+        self.assertEqual(renewed.status_code, 200, renewed.content)
+        reused = client.post("/api/token-renew/", {"refresh_token": tokens["refresh_token"]}, format="json")
+        self.assertEqual(reused.status_code, 400)
+        # The new pair works
+        UserRefreshToken(renewed.json()["result"]["refresh_token"])
+        self.assertEqual(self.bearer(renewed.json()["result"]["access_token"]).get("/api/metrics/").status_code, 200)
+
+    def test_purge_deletes_expired_tokens_only(self):
+        expired, current = (UserRefreshToken.for_user(self.admin) for _ in range(2))
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=aware_utcnow() - timedelta(seconds=1))
+        for token in (expired, current):
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token["jti"]))
+        output = StringIO()
+        call_command("purge_expired_tokens", "--chunk-size", "1", stdout=output)
+        self.assertIn("Deleted 1 outstanding and 1 blacklisted", output.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [current["jti"]])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+class BlacklistFilterTests(APITestCase):
+    def test_old_filter_is_rebuilt_without_a_bump(self):
+        jti = UserRefreshToken.for_user(self.admin)["jti"]
+        blacklist.rebuild_filter()
+        # Blacklisted without bumping the generation, as seen by a process that does not share the cache
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        self.assertFalse(blacklist.is_blacklisted(jti))
+        with override_settings(TOKEN_BLACKLIST_FILTER_MAX_AGE=0, TOKEN_BLACKLIST_FILTER_INTERVAL=0):
+            self.assertTrue(blacklist.is_blacklisted(jti))
@@ -0,0 +1,72 @@
+from ..models import Blog, BlogStats, Entry
+from .base import APITestCase
+
+
+class BlogStatsTests(APITestCase):
+    def assertStatsCounted(self):
+        expected = {row.pop("blog_id"): row for row in BlogStats.objects.compute()}
+        for stats in BlogStats.objects.all():
+            with self.subTest(blog=stats.blog_id):
+                self.assertEqual(
+                    {
+                        "entry_count": stats.entry_count,
+                        "rating_total": stats.rating_total,
+                        "comment_total": stats.comment_total,
+                    },
+                    expected.get(stats.blog_id, {"entry_count": 0, "rating_total": 0, "comment_total": 0}),
+                )
+
+    def get_stats(self, blog: Blog) -> tuple[dict, dict]:
+        client = self.client_for(self.admin)
+        endpoint = client.get(f"/api/blogs/{blog.pk}/stats/")
+        nested = client.get(f"/api/blogs/{blog.pk}/")
+        self.assertEqual(endpoint.status_code, 200, endpoint.content)
+        return endpoint.json()["result"], nested.json()["result"]["stats"]
+
+    def test_orm_writes_update_the_stats(self):
+        self.assertEqual(BlogStats.objects.count(), len(self.blogs))
+        entry = Entry.objects.get(pk=self.entries[0].pk)
+        entry.rating, entry.number_of_comments = 9, 40
+        entry.save()
+        moved = Entry.objects.only("headline").get(pk=self.entries[1].pk)  # Counted values deferred
+        moved.blog = self.blogs[2]
+        moved.save()
+        Entry.objects.get(pk=self.entries[2].pk).delete()
+        Entry.objects.filter(pk=self.entries[3].pk).delete()
+        self.assertStatsCounted()
+
+    def test_deleting_deferred_entries(self):
+        Entry.objects.only("headline").get(pk=self.entries[0].pk).delete()
+        Entry.objects.filter(pk=self.entries[1].pk).only("id").delete()
+        self.assertStatsCounted()
+
+    def test_api_writes_are_counted_once(self):
+        client = self.client_for(self.admin)
+        response = client.post(
+            "/api/entries/",
+            {"blog": self.blogs[0].pk, "headline": "New", "body_text": "Body", "rating": 3, "authors": [self.authors[0].pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        client.patch(f"/api/entries/{self.entries[0].pk}/", {"rating": 7, "blog": self.blogs[1].pk}, format="json")
+        client.delete(f"/api/entries/{self.entries[1].pk}/")
+        self.assertStatsCounted()
+
+    def test_deleting_a_blog_deletes_its_stats(self):
+        self.blogs[0].delete()
+        self.assertFalse(BlogStats.objects.filter(blog_id=self.blogs[0].pk).exists())
+        self.assertStatsCounted()
+
+    def test_endpoint_and_nested_stats_agree(self):
+        blog = Blog.objects.create(name="Created with the ORM", tagline="Tagline")
+        Entry.objects.create(blog=blog, headline="Headline", body_text="Body", rating=4, number_of_comments=2)
+        endpoint, nested = self.get_stats(blog)
+        self.assertEqual(endpoint["entry_count"], 1)
+        self.assertEqual(endpoint, nested)
+
+    def test_missing_row_is_recomputed(self):
+        blog = self.blogs[0]
+        BlogStats.objects.filter(blog=blog).delete()
+        endpoint, nested = self.get_stats(blog)
+        self.assertEqual(endpoint["entry_count"], Entry.objects.filter(blog=blog).count())
+        self.assertEqual(endpoint, nested)
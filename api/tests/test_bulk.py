@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import BlogStats, Entry
+from ..search import search_entries
+from .base import APITestCase
+
+
+class BulkEntryTests(APITestCase):
+    def items(self, count: int, **fields) -> list[dict]:
+        return [
+            {
+                "blog": self.blogs[0].pk,
+                "authors": [self.authors[0].pk, self.authors[1].pk],
+                "headline": f"Bulk {i}",
+                "body_text": "Written in bulk",
+                "rating": 4,
+                **fields,
+            }
+            for i in range(count)
+        ]
+
+    def write(self, method: str, items: list, **params):
+        client = self.client_for(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            query = "&".join(f"{key}={value}" for key, value in params.items())
+            return getattr(client, method)(f"/api/entries/bulk/?{query}", items, format="json")
+
+    def test_create_reports_invalid_items_by_index(self):
+        stats = BlogStats.objects.get(blog=self.blogs[0])
+        items = self.items(3)
+        items[1]["blog"] = 999999
+        items[2]["authors"] = [999999]
+        items.append({"headline": "No blog"})
+        response = self.write("post", items)
+        self.assertEqual(response.status_code, 201, response.content)
+        result = response.json()["result"]
+        self.assertEqual([entry["index"] for entry in result["entries"]], [0])
+        self.assertEqual(set(result["errors"]), {"1", "2", "3"})
+        self.assertIn("blog", result["errors"]["1"])
+        self.assertIn("authors", result["errors"]["2"])
+
+        entry = Entry.objects.get(pk=result["entries"][0]["id"])
+        self.assertEqual(list(entry.authors.order_by("id")), self.authors[:2])
+        self.assertIn(entry.pk, [hit.id for hit in search_entries("bulk", limit=10)])
+        stats.refresh_from_db()
+        self.assertEqual(stats.entry_count, 3)
+        self.assertEqual(stats.rating_total, 3 + 4)
+
+    def test_only_invalid_items_is_unprocessable(self):
+        self.assertEqual(self.write("post", [{"headline": "No blog"}]).status_code, 422)
+        self.assertEqual(self.write("post", {"headline": "Not a list"}).status_code, 422)
+
+    def test_queries_do_not_grow_with_the_items(self):
+        counts = []
+        self.write("post", self.items(1))  # Caches the user and permissions of the client
+        for count in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.write("post", self.items(count), batch_size=100).status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_update_changes_fields_and_authors(self):
+        first, second = self.entries[:2]
+        response = self.write(
+            "patch",
+            [
+                {"id": first.pk, "rating": 1, "authors": [self.authors[2].pk]},
+                {"id": second.pk, "blog": self.blogs[2].pk},
+                {"id": second.pk, "rating": 3},  # Duplicate
+                {"rating": 3},  # No id
+                {"id": 999999, "rating": 3},
+            ],
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        result = response.json()["result"]
+        self.assertEqual([entry["id"] for entry in result["entries"]], [first.pk, second.pk])
+        self.assertEqual(set(result["errors"]), {"2", "3", "4"})
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.rating, 1)
+        self.assertEqual(list(first.authors.all()), [self.authors[2]])
+        self.assertEqual(second.blog, self.blogs[2])
+        self.assertEqual(BlogStats.objects.get(blog=self.blogs[2]).entry_count, 3)
@@ -0,0 +1,45 @@
+from unittest import mock
+from django.test import override_settings
+from utils import compiled_serializer
+from ..models import BlogStats
+from ..serializers import EntrySerializer
+from .base import APITestCase
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class CompiledSerializerTests(APITestCase):
+    def fetch(self, url: str, compiled: bool) -> bytes:
+        with override_settings(COMPILED_SERIALIZERS=compiled):
+            response = self.client_for(self.admin).get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.content
+
+    def test_renders_the_same_bytes_as_the_serializer(self):
+        BlogStats.objects.filter(blog=self.blogs[2]).delete()  # A missing nested object renders as null
+        for url in (
+            "/api/entries/",
+            "/api/entries/?expand=",
+            "/api/entries/?fields=headline,blog.name,authors&expand=blog",
+            "/api/entries/?fields=id,authors.user.email&expand=authors.user",
+            "/api/entries/?ordering=-rating&page_size=3",
+            "/api/authors/",
+            "/api/authors/?fields=bio",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.fetch(url, compiled=True), self.fetch(url, compiled=False))
+
+    def test_compiled_once_per_fieldset(self):
+        compiled_serializer._compile_cached.cache_clear()
+        first = compiled_serializer.get_compiled_serializer(EntrySerializer, {"headline": {}})
+        self.assertIsNotNone(first)
+        self.assertIs(compiled_serializer.get_compiled_serializer(EntrySerializer, {"headline": {}}), first)
+        self.assertIsNot(compiled_serializer.get_compiled_serializer(EntrySerializer), first)
+
+    def test_uncompilable_serializer_falls_back(self):
+        compiled_serializer._compile_cached.cache_clear()
+        self.addCleanup(compiled_serializer._compile_cached.cache_clear)
+        expected = self.fetch("/api/entries/", compiled=False)
+        with mock.patch.object(
+            compiled_serializer, "compile_serializer", side_effect=compiled_serializer.SerializerNotCompilable
+        ):
+            self.assertEqual(self.fetch("/api/entries/", compiled=True), expected)
@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from utils.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, RoutingState, _state
+from utils.response_cache import bump_generation
+from ..models import Blog, Entry, StoredFile
+from .base import TEST_CACHES
+
+REPLICAS = ["replica1", "replica2"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, CACHES=TEST_CACHES)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def route(self, model) -> str:
+        token = _state.set(RoutingState(pinned=False))
+        try:
+            return PrimaryReplicaRouter().db_for_read(model)
+        finally:
+            _state.reset(token)
+
+    def test_models_written_long_enough_ago_are_read_from_the_replicas(self):
+        with override_settings(DATABASE_REPLICA_LAG=0):
+            self.assertIn(self.route(Blog), REPLICAS)
+            # Written with the entries, whose generation they share
+            self.assertIn(self.route(Entry.authors.through), REPLICAS)
+
+    def test_recent_writes_are_read_from_the_primary(self):
+        bump_generation(Entry)
+        with override_settings(DATABASE_REPLICA_LAG=60):
+            self.assertEqual(self.route(Entry), "default")
+            self.assertEqual(self.route(Entry.authors.through), "default")
+
+    def test_untracked_models_are_read_from_the_primary(self):
+        # Nothing bumps a generation when StoredFile rows are written
+        with override_settings(DATABASE_REPLICA_LAG=0):
+            self.assertEqual(self.route(StoredFile), "default")
+
+    def test_replicas_need_a_shared_cache(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local), self.assertRaises(ImproperlyConfigured):
+            ReplicaRoutingMiddleware(lambda request: None)
@@ -0,0 +1,38 @@
+from ..models import Entry
+from .base import APITestCase
+
+
+class IndexedFilterTests(APITestCase):
+    def ids(self, query: str) -> list[int]:
+        response = self.client_for(self.admin).get(f"/api/entries/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [entry["id"] for entry in response.json()["result"]]
+
+    def test_filters_and_ordering(self):
+        self.assertEqual(
+            self.ids("rating__gte=2&ordering=-rating"),
+            list(Entry.objects.filter(rating__gte=2).order_by("-rating", "id").values_list("id", flat=True)),
+        )
+        self.assertEqual(
+            self.ids(f"blog={self.blogs[1].pk}&number_of_comments__gte=2"),
+            list(Entry.objects.filter(blog=self.blogs[1], number_of_comments__gte=2).values_list("id", flat=True)),
+        )
+        self.assertEqual(
+            sorted(self.ids(f"authors={self.authors[2].pk}")),
+            sorted(self.authors[2].entry_set.values_list("id", flat=True)),
+        )
+
+    def test_unindexed_combinations_are_rejected(self):
+        client = self.client_for(self.admin)
+        # number_of_comments only leads an index after blog
+        response = client.get("/api/entries/?number_of_comments__gte=2")
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("full table scan", str(response.json()))
+        self.assertEqual(client.get("/api/entries/?ordering=number_of_comments").status_code, 422)
+
+    def test_invalid_values_and_fields_are_rejected(self):
+        client = self.client_for(self.admin)
+        self.assertEqual(client.get("/api/entries/?rating__gte=high").status_code, 422)
+        self.assertEqual(client.get("/api/entries/?ordering=body_text").status_code, 422)
+        # Parameters that are not whitelisted are ignored
+        self.assertEqual(len(self.ids("headline=Headline 0")), len(self.entries))
@@ -0,0 +1,40 @@
+import threading
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from rest_framework.test import APIClient
+from utils import hashing
+from ..models import User
+from .base import APITestCase, ImmediateExecutor
+
+
+class PasswordHashingTests(APITestCase):
+    def post_login(self, password: str = "secret123"):
+        return APIClient().post("/api/login/", {"email": "admin@example.com", "password": password}, format="json")
+
+    def test_full_pool_answers_503_with_retry_after(self):
+        # No free slot: every worker is busy and the queue is full
+        with mock.patch.object(hashing, "_pool", (ImmediateExecutor(), threading.BoundedSemaphore(1))):
+            hashing._pool[1].acquire()
+            response = self.post_login()
+        self.assertEqual(response.status_code, 503, response.content)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertGreaterEqual(hashing.hashing_stats()["rejected"], 1)
+
+    def test_login_checks_the_password_on_the_pool(self):
+        completed = hashing.hashing_stats()["completed"]
+        self.assertEqual(self.post_login().status_code, 200)
+        self.assertEqual(self.post_login("wrong").status_code, 401)
+        self.assertEqual(hashing.hashing_stats()["completed"], completed + 2)
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        hashers = [
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.UnsaltedMD5PasswordHasher",
+        ]
+        with self.settings(PASSWORD_HASHERS=hashers):
+            User.objects.filter(pk=self.admin.pk).update(
+                password=make_password("secret123", hasher="unsalted_md5")
+            )
+            self.assertEqual(self.post_login().status_code, 200)
+        self.admin.refresh_from_db()
+        self.assertTrue(self.admin.password.startswith("pbkdf2_sha256$"))
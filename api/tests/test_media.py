@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from utils.media import RangeNotSatisfiable, parse_range
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=900-5000", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-5000", 1000), (0, 999))
+
+    def test_ignored_ranges(self):
+        for header in ("items=0-1", "bytes=0-1,5-6", "bytes=abc", "bytes=5-1", "bytes=x-"):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable_ranges(self):
+        for header in ("bytes=1000-", "bytes=2000-3000", "bytes=-0"):
+            with self.subTest(header=header), self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 1000)
+        for header in ("bytes=0-", "bytes=0-10", "bytes=-1"):
+            with self.subTest(header=header, size=0), self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 0)
+
+
+class ServeMediaTests(SimpleTestCase):
+    name = "photos/ab/cd/abcd.png"
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE="python"))
+        self.data = bytes(range(256)) * 40
+        os.makedirs(os.path.join(media_root, "photos/ab/cd"))
+        with open(os.path.join(media_root, self.name), "wb") as file:
+            file.write(self.data)
+
+    def get(self, **headers):
+        return self.client.get(f"/media/{self.name}", headers=headers)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(self.get(**{"If-None-Match": response["ETag"]}).status_code, 304)
+
+    def test_range(self):
+        response = self.get(Range="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[10:20])
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "10")
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_if_range_mismatch_sends_the_whole_file(self):
+        response = self.get(Range="bytes=10-19", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_and_unsafe_paths(self):
+        self.assertEqual(self.client.get("/media/photos/missing.png").status_code, 404)
+        self.assertEqual(self.client.get("/media/../settings.py").status_code, 404)
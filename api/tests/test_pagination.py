@@ -0,0 +1,60 @@
+import base64
+import json
+from ..models import Author, Blog, Entry
+from .base import APITestCase
+
+
+def encode_cursor(cursor) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+class KeysetPaginationTests(APITestCase):
+    def walk(self, url: str, link: str = "next") -> tuple[list[int], list[dict]]:
+        client = self.client_for(self.admin)
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            page = response.json()
+            pages.append(page)
+            ids += [row["id"] for row in page["result"]]
+            url = page["pagination"][link]
+        return ids, pages
+
+    def test_walks_every_row_once(self):
+        ids, pages = self.walk("/api/entries/?page_size=4")
+        self.assertEqual(ids, list(Entry.objects.order_by("pub_date", "id").values_list("id", flat=True)))
+        self.assertEqual(len(pages), 2)
+        self.assertIsNone(pages[0]["pagination"]["previous"])
+
+        ids, _ = self.walk("/api/blogs/?page_size=2")
+        self.assertEqual(ids, list(Blog.objects.order_by("id").values_list("id", flat=True)))
+        ids, _ = self.walk("/api/authors/?page_size=2")
+        self.assertEqual(ids, list(Author.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_previous_link_walks_back(self):
+        for i in range(6, 10):
+            self.create_entry(i)
+        ids, pages = self.walk("/api/entries/?page_size=3")
+        back, _ = self.walk(pages[-1]["pagination"]["previous"], link="previous")
+        # Pages come newest first when walking back, rows within a page keep their order
+        self.assertEqual(sorted(back), sorted(ids[:9]))
+        self.assertEqual(back[:3], ids[6:9])
+
+    def test_malformed_cursors_are_not_found(self):
+        client = self.client_for(self.admin)
+        for cursor in (
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            encode_cursor([1, 2]),
+            encode_cursor({"r": 1}),
+            encode_cursor({"p": [1]}),
+            encode_cursor({"p": "1,2"}),
+            # Values that do not parse as the ordering fields
+            encode_cursor({"p": [{"a": 1}, 1]}),
+            encode_cursor({"p": ["notadate", 1]}),
+            encode_cursor({"p": ["2024-01-01", "one"]}),
+            encode_cursor({"p": [None, 1]}),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(client.get("/api/entries/", {"cursor": cursor}).status_code, 404)
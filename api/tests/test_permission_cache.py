@@ -0,0 +1,45 @@
+from django.contrib.auth.models import Group, Permission
+from ..models import User
+from .base import APITestCase
+
+
+class PermissionCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.change_entry = Permission.objects.get(codename="change_entry")
+        cls.delete_entry = Permission.objects.get(codename="delete_entry")
+        cls.editors = Group.objects.create(name="Editors")
+        cls.editors.permissions.add(cls.change_entry)
+        cls.users[0].groups.add(cls.editors)
+        cls.users[0].user_permissions.add(cls.delete_entry)
+
+    def fresh(self, user: User) -> User:
+        # A new user object per request, as authentication returns
+        return User.objects.get(pk=user.pk)
+
+    def test_permissions_are_resolved_once_and_shared(self):
+        user = self.fresh(self.users[0])
+        with self.assertNumQueries(2):
+            self.assertTrue(user.has_perm("api.change_entry"))
+            self.assertTrue(user.has_perm("api.delete_entry"))
+            self.assertFalse(user.has_perm("api.add_entry"))
+        user = self.fresh(self.users[0])
+        with self.assertNumQueries(0):
+            self.assertEqual(user.get_all_permissions(), {"api.change_entry", "api.delete_entry"})
+            self.assertTrue(user.has_module_perms("api"))
+
+    def test_changes_bump_the_cached_permissions(self):
+        self.assertFalse(self.fresh(self.users[1]).has_perm("api.change_entry"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[1].groups.add(self.editors)
+        self.assertTrue(self.fresh(self.users[1]).has_perm("api.change_entry"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.editors.permissions.remove(self.change_entry)
+        self.assertFalse(self.fresh(self.users[1]).has_perm("api.change_entry"))
+
+    def test_admins_have_every_permission_without_queries(self):
+        admin = self.fresh(self.admin)
+        with self.assertNumQueries(0):
+            self.assertTrue(admin.has_perm("api.delete_blog"))
+            self.assertTrue(admin.has_module_perms("api"))
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from unittest import mock
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import override_settings
+from utils import deferred_delete
+from .. import photos
+from ..models import User
+from ..serializers import UserSerializer
+from .base import APITestCase, ImmediateExecutor
+from .test_storage import png
+
+
+@override_settings(PHOTO_DERIVATIVE_SIZES=[16, 64], PHOTO_DERIVATIVE_FORMATS=["webp", "jpeg"])
+class PhotoDerivativeTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.enterContext(mock.patch.object(deferred_delete, "_executor", ImmediateExecutor()))
+        # Derivatives are rendered right away instead of on the worker processes
+        self.enterContext(mock.patch.object(photos, "get_process_pool", return_value=ImmediateExecutor()))
+
+    def create_user(self, email: str, size: int = 100) -> User:
+        return User.objects.create_user(
+            email=email,
+            password="secret123",
+            name="Photo",
+            role="author",
+            photo=SimpleUploadedFile("photo.png", png(size), content_type="image/png"),
+        )
+
+    def test_derivatives_are_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self.create_user("photo@example.com")
+            self.assertFalse(default_storage.exists(photos.derivative_name(user.photo_hash, 16, "webp")))
+        names = photos.derivative_names(user.photo_hash)
+        for size, formats in names.items():
+            for format, name in formats.items():
+                with default_storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(max(image.size), int(size), name)
+                    self.assertEqual(image.format, format.upper())
+
+        derivatives = UserSerializer(user).data["photo_derivatives"]
+        self.assertEqual(derivatives["64"]["webp"], default_storage.url(names["64"]["webp"]))
+
+    def test_shared_photo_is_rendered_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.create_user("first@example.com")
+        with mock.patch.object(photos, "render_derivatives", wraps=photos.render_derivatives) as render:
+            with self.captureOnCommitCallbacks(execute=True):
+                second = self.create_user("second@example.com")
+        self.assertEqual(first.photo_hash, second.photo_hash)
+        render.assert_not_called()
+
+    def test_rolled_back_upload_is_not_processed(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.create_user("photo@example.com")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+
+    def test_user_without_photo_has_no_derivatives(self):
+        self.assertIsNone(UserSerializer(self.users[0]).data["photo_derivatives"])
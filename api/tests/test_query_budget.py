@@ -0,0 +1,45 @@
+from unittest import mock
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from utils.query_plan import QueryBudgetExceeded
+from ..views.entry import EntryViewSet
+from .base import APITestCase
+
+
+@override_settings(QUERY_BUDGET_ASSERT=True, RESPONSE_CACHE_TIMEOUT=0)
+class QueryBudgetTests(APITestCase):
+    def count_queries(self, client, url: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        client = self.client_for(self.admin)
+        client.get("/api/entries/")  # Caches the authenticated user
+        few = self.count_queries(client, "/api/entries/")
+        for i in range(6, 30):
+            self.create_entry(i)
+        many = self.count_queries(client, "/api/entries/")
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, EntryViewSet.query_budget["list"])
+
+    def test_reads_stay_within_budget(self):
+        client = self.client_for(self.admin)
+        for url in (
+            "/api/entries/",
+            f"/api/entries/{self.entries[0].pk}/",
+            "/api/entries/?expand=blog&fields=headline,blog.name",
+            "/api/authors/",
+            f"/api/authors/{self.authors[0].pk}/",
+            "/api/blogs/",
+            f"/api/blogs/{self.blogs[0].pk}/",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
+
+    def test_exceeding_the_budget_fails(self):
+        with mock.patch.object(EntryViewSet, "query_budget", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client_for(self.admin).get("/api/entries/")
@@ -0,0 +1,47 @@
+import datetime
+import io
+import json
+import unittest
+from decimal import Decimal
+from unittest import mock
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from utils import renderers
+from .base import APITestCase
+
+
+@unittest.skipUnless(renderers.msgpack, "msgpack is not installed")
+class MessagePackTests(APITestCase):
+    def test_msgpack_is_negotiated_from_accept(self):
+        client = self.client_for(self.users[0])
+        response = client.get("/api/entries/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        as_json = client.get("/api/entries/", HTTP_ACCEPT="application/json").json()
+        self.assertEqual(renderers.msgpack.unpackb(response.content), as_json)
+
+    def test_unavailable_renderer_is_not_offered(self):
+        with mock.patch.object(renderers.MessagePackRenderer, "available", False):
+            response = self.client_for(self.users[0]).get("/api/entries/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response.status_code, 406)
+
+    def test_invalid_body_is_a_parse_error(self):
+        parser = renderers.MessagePackParser()
+        self.assertEqual(parser.parse(io.BytesIO(renderers.msgpack.packb({"a": [1, 2]}))), {"a": [1, 2]})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b"\xc1"))
+
+
+class FastJSONRendererTests(unittest.TestCase):
+    def test_output_parses_like_the_stdlib_renderer(self):
+        data = {
+            "float": 1e-6,
+            "date": datetime.date(2026, 10, 18),
+            "datetime": datetime.datetime(2026, 10, 18, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "decimal": Decimal("1.50"),
+            "text": "caf\u00e9 \u2028",  # U+2028 is escaped like JSONRenderer does
+            1: None,
+        }
+        fast = renderers.FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertNotIn("\u2028".encode(), fast)
@@ -0,0 +1,70 @@
+from django.test import override_settings
+from .base import APITestCase
+
+
+class ResponseCacheTests(APITestCase):
+    def test_hit_after_miss(self):
+        client = self.client_for(self.users[0])
+        first = client.get("/api/entries/")
+        second = client.get("/api/entries/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(client.get("/api/entries/?rating=3")["X-Cache"], "MISS")
+
+    def test_writes_invalidate(self):
+        client = self.client_for(self.admin)
+        entry = self.entries[0]
+        client.get("/api/entries/")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(f"/api/entries/{entry.pk}/", {"headline": "Changed"}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        response = client.get("/api/entries/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["result"][0]["headline"], "Changed")
+
+    def test_nested_writes_invalidate(self):
+        client = self.client_for(self.admin)
+        url = f"/api/entries/{self.entries[0].pk}/"
+        client.get(url)
+        self.assertEqual(client.get(url)["X-Cache"], "HIT")
+        user = self.users[0]
+        user.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        response = client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["result"]["authors"][0]["user"]["name"], "Renamed")
+
+    def test_list_etag_changes_with_authors(self):
+        client = self.client_for(self.admin)
+        etag = client.get("/api/entries/")["ETag"]
+        self.assertEqual(client.get("/api/entries/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Changes neither the number of entries nor their modification time
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entries[0].authors.set(self.authors[1:])
+        response = client.get("/api/entries/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_etag_changes_with_authors(self):
+        client = self.client_for(self.admin)
+        url = f"/api/entries/{self.entries[0].pk}/"
+        etag = client.get(url)["ETag"]
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entries[0].authors.set(self.authors[1:])
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["result"]["authors"]), len(self.authors) - 1)
+
+    def test_errors_are_not_cached(self):
+        client = self.client_for(self.admin)
+        client.get("/api/entries/999999/")
+        self.assertNotIn("X-Cache", client.get("/api/entries/999999/"))
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        client = self.client_for(self.admin)
+        client.get("/api/blogs/")
+        self.assertNotIn("X-Cache", client.get("/api/blogs/"))
@@ -0,0 +1,54 @@
+from unittest import mock
+from .. import search
+from ..models import Entry
+from .base import APITestCase
+
+
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.headline_match = Entry.objects.create(
+            blog=cls.blogs[0], headline="Sourdough baking", body_text="Flour and water"
+        )
+        cls.body_match = Entry.objects.create(
+            blog=cls.blogs[1], headline="Weekend", body_text="Some sourdough and a long walk"
+        )
+
+    def search(self, query: str, **params):
+        return self.client_for(self.users[0]).get("/api/entries/search/", {"q": query, **params})
+
+    def test_matches_are_ranked_with_snippets(self):
+        response = self.search("sourdough")
+        self.assertEqual(response.status_code, 200, response.content)
+        results = response.json()["result"]
+        self.assertEqual([entry["id"] for entry in results], [self.headline_match.pk, self.body_match.pk])
+        self.assertIn("<mark>Sourdough</mark>", results[0]["search"]["snippet"])
+
+    def test_prefix_terms_and_query_syntax(self):
+        response = self.search("sourd*")
+        self.assertEqual(len(response.json()["result"]), 2)
+        # FTS5 operators are searched as words, not parsed
+        response = self.search('sourdough OR "walk')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["result"], [])
+
+    def test_index_follows_writes(self):
+        self.headline_match.headline = "Rye baking"
+        self.headline_match.body_text = "Flour"
+        self.headline_match.save()
+        self.body_match.delete()
+        self.assertEqual(self.search("sourdough").json()["result"], [])
+        self.assertEqual([entry["id"] for entry in self.search("rye").json()["result"]], [self.headline_match.pk])
+
+    def test_page_size_limits_the_matches(self):
+        response = self.search("sourdough", page_size=1)
+        self.assertEqual([entry["id"] for entry in response.json()["result"]], [self.headline_match.pk])
+
+    def test_missing_query_is_rejected(self):
+        self.assertEqual(self.search("").status_code, 422)
+
+    def test_unavailable_search_is_not_implemented(self):
+        with mock.patch.object(search, "search_available", return_value=False):
+            response = self.search("sourdough")
+        self.assertEqual(response.status_code, 501, response.content)
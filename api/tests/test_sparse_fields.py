@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .base import APITestCase
+
+
+class SparseFieldsetTests(APITestCase):
+    def get(self, query: str) -> tuple[list[dict], str]:
+        client = self.client_for(self.admin)
+        client.get("/api/entries/")  # Caches the authenticated user
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f"/api/entries/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["result"], " ".join(query["sql"] for query in queries)
+
+    def test_fields_restrict_the_output_and_the_columns(self):
+        entries, sql = self.get("fields=id,headline")
+        self.assertEqual({tuple(entry) for entry in entries}, {("id", "headline")})
+        self.assertNotIn("body_text", sql)
+        self.assertNotIn("api_blog", sql)
+
+    def test_relations_that_are_not_expanded_are_primary_keys(self):
+        entries, sql = self.get("expand=")
+        entry = next(entry for entry in entries if entry["id"] == self.entries[2].pk)
+        self.assertEqual(entry["blog"], self.blogs[2].pk)
+        self.assertEqual(sorted(entry["authors"]), [author.pk for author in self.authors])
+        # The authors are prefetched as ids only, neither blogs nor users are read
+        self.assertNotIn('"api_blog"', sql)
+        self.assertNotIn('"api_user"', sql)
+
+    def test_nested_fields_and_expansion(self):
+        entries, _ = self.get("fields=headline,blog.name,authors&expand=blog,authors.user")
+        entry = next(entry for entry in entries if entry["headline"] == "Headline 1")
+        self.assertEqual(entry["blog"], {"name": self.blogs[1].name})
+        self.assertEqual(entry["authors"][0]["user"]["email"], self.users[0].email)
+
+        entries, _ = self.get("expand=authors")
+        # authors.user is not expanded
+        self.assertEqual(entries[0]["authors"][0]["user"], self.users[0].pk)
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.test import SimpleTestCase, override_settings
+from utils.sqlite_backend.base import DatabaseWrapper, immediate_atomic
+
+PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000}
+
+
+@override_settings(SQLITE_PRAGMAS=PRAGMAS)
+class SQLiteBackendTests(SimpleTestCase):
+    def connect(self, transaction_mode: str) -> DatabaseWrapper:
+        """A connection to a database file of its own, registered as the "sqlite" alias"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_dict = {
+            **connections["default"].settings_dict,
+            "NAME": os.path.join(directory, "db.sqlite3"),
+            "OPTIONS": {"transaction_mode": transaction_mode},
+        }
+        connection = DatabaseWrapper(settings_dict, alias="sqlite")
+        connections["sqlite"] = connection
+        self.addCleanup(connections.__delitem__, "sqlite")
+        self.addCleanup(connection.close)
+        self.statements: list[str] = []
+        self.enterContext(connection.execute_wrapper(self.record))
+        return connection
+
+    def record(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def pragma(self, connection: DatabaseWrapper, name: str):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_set_on_new_connections(self):
+        connection = self.connect("IMMEDIATE")
+        self.assertEqual(self.pragma(connection, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(connection, "busy_timeout"), 5000)
+        self.assertEqual(self.pragma(connection, "synchronous"), 1)  # NORMAL
+
+    def test_atomic_begins_with_the_transaction_mode(self):
+        self.connect("IMMEDIATE")
+        with transaction.atomic(using="sqlite"):
+            pass
+        self.assertIn("BEGIN IMMEDIATE", self.statements)
+
+    def test_immediate_atomic_under_deferred_mode(self):
+        connection = self.connect("deferred")
+        with immediate_atomic("sqlite"):
+            pass
+        with transaction.atomic(using="sqlite"):
+            pass
+        begins = [sql for sql in self.statements if sql.startswith("BEGIN")]
+        self.assertEqual(begins, ["BEGIN IMMEDIATE", "BEGIN DEFERRED"])
+        self.assertEqual(connection.transaction_mode, "DEFERRED")
+
+    def test_unknown_transaction_mode_is_rejected(self):
+        connection = self.connect("EVENTUALLY")
+        with self.assertRaises(ImproperlyConfigured):
+            connection.ensure_connection()
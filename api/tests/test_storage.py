@@ -0,0 +1,121 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from utils import deferred_delete
+from ..models import StoredFile, User
+from .base import APITestCase, ImmediateExecutor
+
+
+def png(size: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (200, 10, 10)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        # Deletions run right away instead of on the cleanup thread
+        self.enterContext(mock.patch.object(deferred_delete, "_executor", ImmediateExecutor()))
+
+    def create_user(self, email: str, photo: bytes, name: str = "photo.png") -> User:
+        return User.objects.create_user(
+            email=email,
+            password="secret123",
+            name="Photo",
+            role="author",
+            photo=SimpleUploadedFile(name, photo, content_type="image/png"),
+        )
+
+    def test_shared_photo_is_stored_once(self):
+        first = self.create_user("first@example.com", png(30), "one.png")
+        second = self.create_user("second@example.com", png(30), "two.PNG")
+        self.assertEqual(first.photo.name, second.photo.name)
+        digest = first.photo_hash
+        self.assertEqual(first.photo.name, f"photos/{digest[:2]}/{digest[2:4]}/{digest}.png")
+        self.assertEqual(StoredFile.objects.get(name=first.photo.name).refcount, 2)
+
+    def test_file_is_deleted_with_its_last_reference(self):
+        first = self.create_user("first@example.com", png(30))
+        second = self.create_user("second@example.com", png(30))
+        path = first.photo.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(StoredFile.objects.get(name=second.photo.name).refcount, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_rolled_back_delete_keeps_the_file(self):
+        user = self.create_user("first@example.com", png(30))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    user.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(os.path.exists(user.photo.path))
+        self.assertEqual(StoredFile.objects.get(name=user.photo.name).refcount, 1)
+
+    def test_reference_is_dropped_with_the_row(self):
+        first = self.create_user("first@example.com", png(30))
+        second = self.create_user("second@example.com", png(30))
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.delete()
+            second.delete()
+        self.assertEqual(StoredFile.objects.get(name=first.photo.name).refcount, 0)
+        # A sweep while the deletion of the file is still queued leaves the count alone
+        call_command("sweep_media", "--min-age", "3600", stdout=io.StringIO())
+        self.assertEqual(StoredFile.objects.get(name=first.photo.name).refcount, 0)
+        for callback in callbacks:
+            callback()
+        self.assertFalse(os.path.exists(first.photo.path))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_sweep_corrects_reference_counts(self):
+        user = self.create_user("first@example.com", png(30))
+        StoredFile.objects.filter(name=user.photo.name).update(refcount=5)
+        StoredFile.objects.create(name="photos/aa/bb/missing.png", refcount=1)
+        output = io.StringIO()
+        call_command("sweep_media", "--min-age", "3600", stdout=output)
+        self.assertIn("2 reference counts corrected", output.getvalue())
+        self.assertEqual(StoredFile.objects.get(name=user.photo.name).refcount, 1)
+        self.assertFalse(StoredFile.objects.filter(name="photos/aa/bb/missing.png").exists())
+        self.assertTrue(os.path.exists(user.photo.path))
+
+
+class DeferredDeleteTests(APITestCase):
+    def test_finished_batches_are_forgotten(self):
+        storage = mock.Mock()
+        self.enterContext(mock.patch.object(deferred_delete, "_executor", ImmediateExecutor()))
+        for i in range(20):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    deferred_delete.delete_on_commit(storage, f"file{i}")
+        self.assertEqual(storage.delete.call_count, 20)
+        self.assertEqual(len(deferred_delete._local.batches), 1)
+
+    def test_names_of_a_new_storage_are_not_added_to_an_old_batch(self):
+        first, second = mock.Mock(), mock.Mock()
+        self.enterContext(mock.patch.object(deferred_delete, "_executor", ImmediateExecutor()))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                deferred_delete.delete_on_commit(first, "first")
+                with mock.patch.object(deferred_delete, "id", create=True, return_value=id(first)):
+                    deferred_delete.delete_on_commit(second, "second")
+        first.delete.assert_called_once_with("first")
+        second.delete.assert_called_once_with("second")
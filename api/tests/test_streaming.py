@@ -0,0 +1,38 @@
+import json
+from django.test import override_settings
+from .base import APITestCase
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class StreamingTests(APITestCase):
+    def paginated(self, url: str) -> list[dict]:
+        client = self.client_for(self.admin)
+        rows = []
+        while url:
+            page = client.get(url).json()
+            rows += page["result"]
+            url = page["pagination"]["next"]
+        return rows
+
+    def streamed(self, url: str) -> dict:
+        response = self.client_for(self.admin).get(url + ("&" if "?" in url else "?") + "stream=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_stream_matches_the_paginated_rows(self):
+        for url in ("/api/entries/", "/api/blogs/", "/api/authors/"):
+            with self.subTest(url=url):
+                body = self.streamed(url)
+                self.assertEqual(body["result"], self.paginated(url + "?page_size=4"))
+                self.assertTrue(body["success"])
+
+    def test_stream_keeps_filters_and_sparse_fields(self):
+        body = self.streamed(f"/api/entries/?blog={self.blogs[0].pk}&fields=id,headline")
+        expected = self.paginated(f"/api/entries/?blog={self.blogs[0].pk}&fields=id,headline")
+        self.assertEqual(body["result"], expected)
+        self.assertEqual({tuple(row) for row in body["result"]}, {("id", "headline")})
+
+    def test_empty_stream_is_valid_json(self):
+        body = self.streamed("/api/entries/?blog=0")
+        self.assertEqual(body["result"], [])
@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from ..auth import user_cache
+from ..auth.tokens import UserRefreshToken
+from .base import APITestCase
+
+
+class UserCacheTests(APITestCase):
+    def user_queries(self, client) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200, response.content)
+        return sum('FROM "api_user"' in query["sql"] for query in queries)
+
+    def test_user_is_read_once(self):
+        client = self.bearer(str(UserRefreshToken.for_user(self.admin).access_token))
+        self.assertEqual(self.user_queries(client), 1)
+        self.assertEqual(self.user_queries(client), 0)
+
+    def test_saving_the_user_drops_the_entry(self):
+        client = self.bearer(str(UserRefreshToken.for_user(self.admin).access_token))
+        self.user_queries(client)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.name = "Renamed"
+            self.admin.save()
+        self.assertIsNone(user_cache._users.get(self.admin.pk))
+        self.assertEqual(self.user_queries(client), 1)
+
+    def test_tokens_issued_before_a_password_change_are_rejected(self):
+        client = self.bearer(str(UserRefreshToken.for_user(self.admin).access_token))
+        self.user_queries(client)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.set_password("changed123")
+            self.admin.save()
+        self.assertEqual(client.get("/api/metrics/").status_code, 401)
+        client = self.bearer(str(UserRefreshToken.for_user(self.admin).access_token))
+        self.assertEqual(client.get("/api/metrics/").status_code, 200)
+
+    @override_settings(AUTH_CLAIMS_ONLY=True)
+    def test_claims_only_reads_skip_the_user(self):
+        client = self.bearer(str(UserRefreshToken.for_user(self.users[0]).access_token))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get("/api/entries/?fields=id,headline").status_code, 200)
+        self.assertFalse(any('FROM "api_user"' in query["sql"] for query in queries))
@@ -19,6 +19,7 @@ from .views.author import *
 from .views.blog import *
 from .views.entry import EntryViewSet
 from .views.auth import *
+from .views.metrics import metrics
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -37,6 +38,7 @@ router.register(r"entries", EntryViewSet, basename="entry")
 
 urlpatterns = [
     path("authors/", AuthorList.as_view(), name="author_list_create"),
+    path("authors/import/", AuthorImport.as_view(), name="author_import"),
     path(
         "authors/<int:authorId>/",
         AuthorDetail.as_view(),
@@ -52,10 +54,16 @@ urlpatterns = [
         BlogDetail.as_view(),
         name="blog_retrieve_update_delete",
     ),
+    path(
+        "blogs/<int:blogId>/stats/",
+        BlogStatsDetail.as_view(),
+        name="blog_stats_retrieve",
+    ),
     path(
         "", include(router.urls)
     ),  # or simply assign/append router.urls to urlpatterns
     path("login/", login),
     path("logout/", logout),
-    path('token-renew/', renew_tokens)
+    path('token-renew/', renew_tokens),
+    path("metrics/", metrics, name="metrics"),
 ]
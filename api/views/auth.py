@@ -6,8 +6,9 @@ from ..models import User
 from ..serializers import LoginSerializer
 from utils.common import success_response, failure_response
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from ..auth import permissions as custom_permissions
+from ..auth.token_cache import revoke_access_token
+from ..auth.tokens import UserRefreshToken
 from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 
@@ -26,7 +27,7 @@ def login(request: request.Request):
     if not user:
         raise exceptions.AuthenticationFailed()
 
-    refresh = RefreshToken.for_user(user)
+    refresh = UserRefreshToken.for_user(user)
     return Response(
         success_response(
             message="Login successful",
@@ -44,8 +45,9 @@ def logout(request: request.Request):
     try:
         refresh_token = request.data.get("refresh_token", "")
         # new token if first arg is None; otherwise decode and validate the encoded token given by the first arg
-        token = RefreshToken(refresh_token)
+        token = UserRefreshToken(refresh_token)
         token.blacklist()
+        revoke_access_token(request.auth)  # Otherwise usable until it expires
 
         return Response(
             success_response(message="Logout successful"),
@@ -61,11 +63,11 @@ def logout(request: request.Request):
 def renew_tokens(request: request.Request):
     try:
         refresh_token = request.data.get("refresh_token")
-        old_token = RefreshToken(refresh_token)
+        old_token = UserRefreshToken(refresh_token)
         user_id = old_token.payload.get(jwt_settings.USER_ID_CLAIM)
         old_token.blacklist()
         user = get_object_or_404(User, **{jwt_settings.USER_ID_FIELD: user_id})
-        new_refresh_token = RefreshToken.for_user(user)
+        new_refresh_token = UserRefreshToken.for_user(user)
 
         return Response(
             success_response(
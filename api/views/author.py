@@ -1,28 +1,104 @@
-from django.shortcuts import get_object_or_404
-from rest_framework import status, request
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.conf import settings
+from rest_framework import exceptions, permissions, status, request
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from ..models import Author
+from rest_framework.settings import api_settings
+from ..auth import permissions as custom_permissions
+from ..author_import import FORMATS, import_authors, read_rows
+from ..models import Author, User
 from ..serializers import AuthorInputSerializer, AuthorSerializer
+from utils.async_views import AsyncReadMixin
 from utils.common import success_response, failure_response, USER_ROLES
+from utils.compiled_serializer import get_compiled_serializer
+from utils.conditional import conditional_response
+from utils.query_plan import QueryBudgetMixin, get_sparse_fieldsets
+from utils.response_cache import cache_response, generation_time, get_generations
+from utils.streaming import stream_success_response, wants_streaming
 
 
-class AuthorList(APIView):
+class AuthorList(AsyncReadMixin, QueryBudgetMixin, APIView):
     model = Author
     # serializer_class = AuthorSerializer
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    query_budget = {"get": 2}
 
     def _get_serializer_class(self, input: bool = False):
         if input:
             return AuthorInputSerializer
         return AuthorSerializer
 
+    @cache_response(Author, User)
     def get(self, request: request.Request, *args, **kwargs):
-        authors = self.model.objects.all()
-        serializer = self._get_serializer_class()(authors, many=True)
+        serializer_class = self._get_serializer_class()
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        authors = serializer_class.setup_eager_loading(
+            self.model.objects.all(), **sparse_fieldsets
+        )
+        if wants_streaming(request):
+            return stream_success_response(
+                authors,
+                serializer_class,
+                "Authors successfully fetched.",
+                serializer_kwargs=sparse_fieldsets,
+            )
+
+        paginator = self.pagination_class()  # APIView has no paginate_queryset unlike GenericAPIView
+        compiled = get_compiled_serializer(serializer_class, **sparse_fieldsets)
+        if compiled:
+            rows = paginator.paginate_queryset(
+                compiled.values(self.model.objects.all()), request, view=self
+            )
+            data = compiled.to_representation_many(rows)
+        else:
+            data = serializer_class(
+                paginator.paginate_queryset(authors, request, view=self),
+                many=True,
+                **sparse_fieldsets,
+            ).data
         return Response(
             success_response(
-                data=serializer.data,
+                data=data,
                 message="Authors successfully fetched.",
+                pagination=paginator.get_pagination(),
+            ),
+        )
+
+    @cache_response(Author, User)
+    async def aget(self, request: request.Request, *args, **kwargs):
+        # get with the async ORM, used under ASGI (see utils/async_views.py)
+        serializer_class = self._get_serializer_class()
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        authors = serializer_class.setup_eager_loading(
+            self.model.objects.all(), **sparse_fieldsets
+        )
+        if wants_streaming(request):
+            return stream_success_response(
+                authors,
+                serializer_class,
+                "Authors successfully fetched.",
+                serializer_kwargs=sparse_fieldsets,
+                asynchronous=True,
+            )
+
+        paginator = self.pagination_class()
+        compiled = get_compiled_serializer(serializer_class, **sparse_fieldsets)
+        if compiled:
+            rows = await paginator.apaginate_queryset(
+                compiled.values(self.model.objects.all()), request, view=self
+            )
+            data = await compiled.ato_representation_many(rows)
+        else:
+            data = serializer_class(
+                await paginator.apaginate_queryset(authors, request, view=self),
+                many=True,
+                **sparse_fieldsets,
+            ).data
+        return Response(
+            success_response(
+                data=data,
+                message="Authors successfully fetched.",
+                pagination=paginator.get_pagination(),
             ),
         )
 
@@ -49,20 +125,50 @@ class AuthorList(APIView):
         )
 
 
-class AuthorDetail(APIView):
-    def _get_object(self, pk: int):
+class AuthorDetail(AsyncReadMixin, QueryBudgetMixin, APIView):
+    query_budget = {"get": 2}
+
+    def _get_object(self, pk: int, **sparse_fieldsets):
         return get_object_or_404(
-            Author, pk=pk
+            AuthorSerializer.setup_eager_loading(Author.objects.all(), **sparse_fieldsets),
+            pk=pk,
         )  # first arg can be either Model, Manager, or QuerySet object
 
+    async def _aget_object(self, pk: int, **sparse_fieldsets):
+        return await aget_object_or_404(
+            AuthorSerializer.setup_eager_loading(Author.objects.all(), **sparse_fieldsets),
+            pk=pk,
+        )
+
     def _get_serializer(self, *args, input=False, **kwargs):
         if input:
             return AuthorInputSerializer(*args, **kwargs)
         return AuthorSerializer(*args, **kwargs)
 
+    def get_detail_validators(self, request, authorId: int):
+        # Authors have no modification time, the generations of Author and User change instead
+        generations = get_generations(Author, User)
+        return generations, generation_time(generations)
+
+    @conditional_response("get_detail_validators")
+    @cache_response(Author, User)
     def get(self, request, authorId: int):
-        author = self._get_object(authorId)
-        serializer = self._get_serializer(author)
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        author = self._get_object(authorId, **sparse_fieldsets)
+        serializer = self._get_serializer(author, **sparse_fieldsets)
+        return Response(
+            success_response(
+                data=serializer.data,
+                message="Author successfully fetched.",
+            ),
+        )
+
+    @conditional_response("get_detail_validators")
+    @cache_response(Author, User)
+    async def aget(self, request, authorId: int):
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        author = await self._aget_object(authorId, **sparse_fieldsets)
+        serializer = self._get_serializer(author, **sparse_fieldsets)
         return Response(
             success_response(
                 data=serializer.data,
@@ -111,3 +217,35 @@ class AuthorDetail(APIView):
             success_response(message="Author successfully deleted."),
             status=status.HTTP_204_NO_CONTENT,
         )
+
+
+class AuthorImport(APIView):
+    """
+    Imports authors from a CSV or NDJSON request body (Content-Type text/csv or application/x-ndjson),
+    see api/author_import.py. ?start=N skips the first N rows, to resume an import that stopped
+    at the "rows" count it returned.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, custom_permissions.IsAdmin]
+
+    def post(self, request: request.Request):
+        format = FORMATS.get(request.content_type.split(";")[0].strip().lower())
+        if format is None:
+            raise exceptions.UnsupportedMediaType(request.content_type)
+        try:
+            start = max(int(request.query_params.get("start", 0)), 0)
+        except ValueError:
+            start = 0
+
+        # The body is read line by line as the rows are imported, not parsed into request.data
+        result = import_authors(
+            read_rows(request.stream or [], format),
+            settings.AUTHOR_IMPORT_CHUNK_SIZE,
+            start=start,
+        )
+        return Response(
+            success_response(
+                data=result.as_dict(),
+                message="Authors successfully imported.",
+            ),
+        )
@@ -1,27 +1,73 @@
+from django.db import transaction
 from rest_framework import status, generics
 from rest_framework.response import Response
-from ..models import Blog
-from ..serializers import BlogSerializer
+from ..models import Blog, BlogStats, Entry
+from ..serializers import BlogSerializer, BlogStatsSerializer
+from utils.async_views import AsyncReadMixin
 from utils.common import success_response
+from utils.conditional import conditional_response
+from utils.query_plan import QueryBudgetMixin, get_sparse_fieldsets
+from utils.response_cache import cache_response, generation_time, get_generations
+from utils.streaming import stream_success_response, wants_streaming
 
-class BlogList(generics.GenericAPIView):
+class BlogList(AsyncReadMixin, QueryBudgetMixin, generics.GenericAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
+    query_budget = {"get": 2}
 
+    def get_queryset(self):
+        return self.serializer_class.setup_eager_loading(
+            super().get_queryset(), **get_sparse_fieldsets(self.request)
+        )
+
+    # Blog stats rows are updated with QuerySet.update, which sends no signals, whenever entries change, hence Entry
+    @cache_response(Blog, BlogStats, Entry)
     def get(self, request):
-        blog_list = self.get_queryset()
-        serializer = self.get_serializer(blog_list, many=True)
+        if wants_streaming(request):
+            return stream_success_response(
+                self.get_queryset(),
+                self.serializer_class,
+                "Blogs successfully fetched.",
+                serializer_kwargs=get_sparse_fieldsets(request),
+            )
+
+        blog_list = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(blog_list, many=True, **get_sparse_fieldsets(request))
         return Response(
             success_response(
                 data=serializer.data,
                 message="Blogs successfully fetched.",
+                pagination=self.paginator.get_pagination(),
+            ),
+        )
+
+    @cache_response(Blog, BlogStats, Entry)
+    async def aget(self, request):
+        # get with the async ORM, used under ASGI (see utils/async_views.py)
+        if wants_streaming(request):
+            return stream_success_response(
+                self.get_queryset(),
+                self.serializer_class,
+                "Blogs successfully fetched.",
+                serializer_kwargs=get_sparse_fieldsets(request),
+                asynchronous=True,
+            )
+
+        blog_list = await self.apaginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(blog_list, many=True, **get_sparse_fieldsets(request))
+        return Response(
+            success_response(
+                data=serializer.data,
+                message="Blogs successfully fetched.",
+                pagination=self.paginator.get_pagination(),
             ),
         )
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()  # Creates the blog stats row, see BlogStats
         return Response(
             success_response(
                 data=serializer.data,
@@ -31,16 +77,41 @@ class BlogList(generics.GenericAPIView):
         )
 
 
-class BlogDetail(generics.GenericAPIView):
+class BlogDetail(AsyncReadMixin, QueryBudgetMixin, generics.GenericAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
     lookup_url_kwarg = "blogId"
+    query_budget = {"get": 2}
     # lookup_field = 'pk'
 
+    def get_queryset(self):
+        return self.serializer_class.setup_eager_loading(
+            super().get_queryset(), **get_sparse_fieldsets(self.request)
+        )
+
+    def get_detail_validators(self, request, *args, **kwargs):
+        # Blogs have no modification time, the generations of the models they are built from change instead
+        generations = get_generations(Blog, BlogStats, Entry)
+        return generations, generation_time(generations)
+
     # kwargs important for getting URL parameter
+    @conditional_response("get_detail_validators")
+    @cache_response(Blog, BlogStats, Entry)
     def get(self, request, *args, **kwargs):
         blog = self.get_object()
-        serializer = self.get_serializer(blog)
+        serializer = self.get_serializer(blog, **get_sparse_fieldsets(request))
+        return Response(
+            success_response(
+                data=serializer.data,
+                message="Blog successfully fetched.",
+            ),
+        )
+
+    @conditional_response("get_detail_validators")
+    @cache_response(Blog, BlogStats, Entry)
+    async def aget(self, request, *args, **kwargs):
+        blog = await self.aget_object()
+        serializer = self.get_serializer(blog, **get_sparse_fieldsets(request))
         return Response(
             success_response(
                 data=serializer.data,
@@ -79,3 +150,26 @@ class BlogDetail(generics.GenericAPIView):
     #             status=status.HTTP_404_NOT_FOUND,
     #         )
     #     return super().handle_exception(exc)
+
+
+class BlogStatsDetail(QueryBudgetMixin, generics.GenericAPIView):
+    queryset = Blog.objects.select_related("stats")
+    serializer_class = BlogStatsSerializer
+    lookup_url_kwarg = "blogId"
+    query_budget = {"get": 2}  # Not counting the recompute of a missing row
+
+    @cache_response(Blog, BlogStats, Entry)
+    def get(self, request, *args, **kwargs):
+        blog: Blog = self.get_object()
+        try:
+            stats = blog.stats
+        except BlogStats.DoesNotExist:
+            # Only when the row was deleted by hand or a fixture lacked it: count it again for every reader
+            stats = BlogStats.objects.recompute(blog.pk)
+        serializer = self.get_serializer(stats)
+        return Response(
+            success_response(
+                data=serializer.data,
+                message="Blog stats successfully fetched.",
+            ),
+        )
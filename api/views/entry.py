@@ -1,14 +1,40 @@
-from rest_framework import viewsets, status
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from rest_framework import viewsets, status, serializers
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from ..models import Entry
+from ..models import Author, Blog, BlogStats, Entry, User
 from ..serializers import EntrySerializer
-from utils.common import success_response
+from ..search import search_entries
+from ..bulk import bulk_create_entries, bulk_update_entries
+from utils.async_views import AsyncReadMixin
+from utils.common import success_response, failure_response
+from utils.compiled_serializer import get_compiled_serializer
+from utils.conditional import conditional_response
+from utils.filters import IndexedFilterBackend
+from utils.query_plan import QueryBudgetMixin, get_sparse_fieldsets
+from utils.response_cache import cache_response, generation_time, get_generations
+from utils.streaming import stream_success_response, wants_streaming
 
 
-class EntryViewSet(viewsets.GenericViewSet):
+class EntryViewSet(AsyncReadMixin, QueryBudgetMixin, viewsets.GenericViewSet):
     queryset = Entry.objects.all()
     serializer_class = EntrySerializer
     lookup_url_kwarg = "entryId"
+    filter_backends = [IndexedFilterBackend]
+    filter_fields = {
+        "blog": ["exact"],
+        "authors": ["exact"],
+        "rating": ["exact", "gte", "lte"],
+        "pub_date": ["gte", "lte"],
+        "mod_date": ["gte", "lte"],
+        "number_of_comments": ["gte", "lte"],
+    }
+    ordering_fields = ["pub_date", "mod_date", "rating", "number_of_comments", "id"]
+    # authentication + entries joined with their blog + authors joined with their user
+    # + the conditional request validators
+    query_budget = {"list": 4, "retrieve": 4, "search": 4}
 
     """
     Below are the request methods to implement. The GenericViewSet class inherits from GenericAPIView.
@@ -16,20 +42,128 @@ class EntryViewSet(viewsets.GenericViewSet):
     all request methods are automatically defined but you can override them 
     """
 
+    # Models whose rows can appear in entry responses, see utils/response_cache.py
+    nested_models = (Blog, BlogStats, Author, User)
+    cached_models = (Entry, *nested_models)
+
+    def get_queryset(self):
+        return self.serializer_class.setup_eager_loading(
+            super().get_queryset(), **get_sparse_fieldsets(self.request)
+        )
+
+    def get_list_validators(self, request):
+        # One aggregate over the filtered rows: an edit raises max(mod_date), a deletion lowers the count
+        aggregate = self.filter_queryset(Entry.objects.all()).aggregate(
+            last_modified=Max("mod_date"), count=Count("id")
+        )
+        # Nested rows carry no modification time, their generations stand in for it. The Entry generation
+        # covers the writes the aggregate misses: a deletion along with a creation, or a change of authors.
+        generations = get_generations(*self.cached_models)
+        last_modified = generation_time(generations)
+        if aggregate["last_modified"]:
+            last_modified = max(last_modified, aggregate["last_modified"])
+        return (aggregate, generations), last_modified
+
+    def get_detail_validators(self, request, entryId: int):
+        mod_date = Entry.objects.filter(pk=entryId).values_list("mod_date", flat=True).first()
+        if mod_date is None:
+            return None  # Let the handler respond with 404
+        # The Entry generation covers the writes that leave mod_date alone, such as a change of authors
+        generations = get_generations(*self.cached_models)
+        return (mod_date, generations), max(mod_date, generation_time(generations))
+
+    @conditional_response("get_list_validators")
+    @cache_response(*cached_models)
     def list(self, request):
-        entries = self.get_queryset()
-        serializer = self.serializer_class(entries, many=True)
+        if wants_streaming(request):
+            return stream_success_response(
+                self.filter_queryset(self.get_queryset()),
+                self.serializer_class,
+                "Entries successfully fetched.",
+                serializer_kwargs=get_sparse_fieldsets(request),
+            )
+
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        compiled = get_compiled_serializer(self.serializer_class, **sparse_fieldsets)
+        if compiled:
+            # Rows are read with values_list, so the query plan of get_queryset does not apply
+            rows = self.paginate_queryset(
+                compiled.values(self.filter_queryset(super().get_queryset()))
+            )
+            data = compiled.to_representation_many(rows)
+        else:
+            entries = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+            data = self.serializer_class(entries, many=True, **sparse_fieldsets).data
         return Response(
             success_response(
-                data=serializer.data,
+                data=data,
                 message="Entries successfully fetched.",
+                pagination=self.paginator.get_pagination(),
+            ),
+        )
+
+    @conditional_response("get_list_validators")
+    @cache_response(*cached_models)
+    async def alist(self, request):
+        # list with the async ORM, used under ASGI (see utils/async_views.py)
+        if wants_streaming(request):
+            return stream_success_response(
+                self.filter_queryset(self.get_queryset()),
+                self.serializer_class,
+                "Entries successfully fetched.",
+                serializer_kwargs=get_sparse_fieldsets(request),
+                asynchronous=True,
+            )
+
+        sparse_fieldsets = get_sparse_fieldsets(request)
+        compiled = get_compiled_serializer(self.serializer_class, **sparse_fieldsets)
+        if compiled:
+            rows = await self.apaginate_queryset(
+                compiled.values(self.filter_queryset(super().get_queryset()))
+            )
+            data = await compiled.ato_representation_many(rows)
+        else:
+            entries = await self.apaginate_queryset(self.filter_queryset(self.get_queryset()))
+            data = self.serializer_class(entries, many=True, **sparse_fieldsets).data
+        return Response(
+            success_response(
+                data=data,
+                message="Entries successfully fetched.",
+                pagination=self.paginator.get_pagination(),
+            ),
+        )
+
+    @action(detail=False, methods=["get"])
+    @cache_response(*cached_models)
+    def search(self, request):
+        # https://www.django-rest-framework.org/api-guide/viewsets/#marking-extra-actions-for-routing
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise serializers.ValidationError({"q": ["This query parameter is required."]})
+
+        hits = search_entries(query, limit=self.paginator.get_page_size(request))
+        entries = self.get_queryset().in_bulk([hit.id for hit in hits])
+        hits = [hit for hit in hits if hit.id in entries]
+        serializer = self.serializer_class(
+            [entries[hit.id] for hit in hits], many=True, **get_sparse_fieldsets(request)
+        )
+
+        results = []
+        for hit, entry in zip(hits, serializer.data):
+            entry["search"] = {"score": hit.score, "snippet": hit.snippet}
+            results.append(entry)
+        return Response(
+            success_response(
+                data=results,
+                message="Entries successfully searched.",
             ),
         )
 
     def create(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()  # Blog stats are updated by the Entry signals, see BlogStats
         return Response(
             success_response(
                 data=serializer.data,
@@ -38,9 +172,75 @@ class EntryViewSet(viewsets.GenericViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=["post", "patch"])
+    def bulk(self, request):
+        """
+        POST creates and PATCH partially updates (each item needs its id) a list of entries.
+        Valid items are written in one transaction while invalid ones are reported by their index.
+        """
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Expected a list of entries."]}
+            )
+        if len(request.data) > settings.BULK_WRITE_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        f"At most {settings.BULK_WRITE_MAX_ITEMS} entries can be written at once."
+                    ]
+                }
+            )
+
+        try:
+            batch_size = int(request.query_params.get("batch_size", settings.BULK_WRITE_BATCH_SIZE))
+        except ValueError:
+            batch_size = settings.BULK_WRITE_BATCH_SIZE
+        batch_size = min(max(batch_size, 1), settings.BULK_WRITE_BATCH_SIZE)
+
+        if request.method == "POST":
+            result = bulk_create_entries(request.data, batch_size=batch_size)
+        else:
+            result = bulk_update_entries(request.data, batch_size=batch_size)
+
+        errors = {str(index): errors for index, errors in sorted(result.errors.items())}
+        if not result.entries and errors:
+            return Response(
+                failure_response(errors=errors, message="The given data was invalid"),
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            success_response(
+                data={
+                    "entries": [
+                        {"index": index, "id": entry.pk}
+                        for index, entry in result.entries.items()
+                    ],
+                    "errors": errors,
+                },
+                message="Entries successfully {}.".format(
+                    "created" if request.method == "POST" else "updated"
+                ),
+            ),
+            status=status.HTTP_201_CREATED if request.method == "POST" else status.HTTP_200_OK,
+        )
+
+    @conditional_response("get_detail_validators")
+    @cache_response(*cached_models)
     def retrieve(self, request, entryId: int):
         entry = self.get_object()
-        serializer = self.serializer_class(entry)
+        serializer = self.serializer_class(entry, **get_sparse_fieldsets(request))
+        return Response(
+            success_response(
+                data=serializer.data,
+                message="Entry successfully fetched.",
+            ),
+        )
+
+    @conditional_response("get_detail_validators")
+    @cache_response(*cached_models)
+    async def aretrieve(self, request, entryId: int):
+        entry = await self.aget_object()
+        serializer = self.serializer_class(entry, **get_sparse_fieldsets(request))
         return Response(
             success_response(
                 data=serializer.data,
@@ -55,7 +255,8 @@ class EntryViewSet(viewsets.GenericViewSet):
         entry = self.get_object()
         serializer = self.serializer_class(entry, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
         return Response(
             success_response(
                 data=serializer.data,
@@ -65,7 +266,8 @@ class EntryViewSet(viewsets.GenericViewSet):
 
     def destroy(self, request, entryId: int):
         entry: Entry = self.get_object()
-        entry.delete()
+        with transaction.atomic():
+            entry.delete()
         return Response(
             success_response(message="Entry successfully deleted."),
             status=status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,32 @@
+from rest_framework import permissions, request
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from ..auth import permissions as custom_permissions
+from ..auth.blacklist import blacklist_stats
+from ..auth.token_cache import token_cache_stats
+from ..auth.user_cache import user_cache_stats
+from utils.common import success_response
+from utils.db_router import db_router_stats
+from utils.deferred_delete import deferred_delete_stats
+from utils.hashing import hashing_stats
+from utils.response_cache import response_cache_stats
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, custom_permissions.IsAdmin])
+def metrics(request: request.Request):
+    # Counters are kept per process, so each worker reports its own numbers
+    return Response(
+        success_response(
+            message="Metrics successfully fetched.",
+            data={
+                "response_cache": response_cache_stats(),
+                "auth_user_cache": user_cache_stats(),
+                "auth_token_cache": token_cache_stats(),
+                "token_blacklist": blacklist_stats(),
+                "password_hashing": hashing_stats(),
+                "media_cleanup": deferred_delete_stats(),
+                "databases": db_router_stats(),
+            },
+        )
+    )
@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_rest_api.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')  # Serve reads with the async views, see utils/async_views.py
 
 application = get_asgi_application()
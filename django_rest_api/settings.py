@@ -52,7 +52,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware", # For serving static files in any deployment environment and handle caching of static assets
+    "utils.middleware.AsyncWhiteNoiseMiddleware", # For serving static files in any deployment environment and handle caching of static assets (whitenoise, async capable)
+    "utils.db_router.ReplicaRoutingMiddleware",  # Reads of GET and HEAD requests from the replicas, if there are any
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -86,13 +87,97 @@ WSGI_APPLICATION = "django_rest_api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# SQLITE_PROFILE "production" tunes SQLite for concurrent requests (see utils/sqlite_backend/base.py):
+# WAL lets reads run while a write is in progress, atomic() blocks take the write lock when they begin
+# (BEGIN IMMEDIATE) and wait up to busy_timeout ms for it, and connections are kept for CONN_MAX_AGE seconds.
+# "default" keeps SQLite's own settings (rollback journal, deferred transactions) and a connection per request.
+# Connections are only kept under WSGI: the async views (ASYNC_VIEWS, turned on by asgi.py) run their queries
+# in threads that outlive the request, where Django never closes them, so under ASGI CONN_MAX_AGE defaults to 0.
+# https://docs.djangoproject.com/en/5.0/ref/databases/#persistent-connections
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_PRODUCTION = SQLITE_PROFILE == "production"
+SQLITE_PRAGMAS = (
+    {
+        "journal_mode": "WAL",  # Persistent: stored in the database file
+        "synchronous": "NORMAL",  # Durable through application crashes, with WAL only a power loss can undo the last commits
+        "busy_timeout": 5000,
+        "cache_size": -20000,  # Negative values are KiB, i.e. 20 MB of page cache per connection
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+    if SQLITE_PRODUCTION
+    else {}
+)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "utils.sqlite_backend",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(
+            os.getenv("CONN_MAX_AGE", 600 if SQLITE_PRODUCTION and os.getenv("ASYNC_VIEWS") != "True" else 0)
+        ),
+        "CONN_HEALTH_CHECKS": SQLITE_PRODUCTION,
+        "OPTIONS": {"transaction_mode": "IMMEDIATE" if SQLITE_PRODUCTION else "DEFERRED"},
     }
 }
 
+# Read replicas "replica1" to "replica<DATABASE_REPLICA_COUNT>" (see utils/db_router.py). Locally they are
+# SQLite files next to the primary, refreshed by the sync_replicas command. Tests read them from the primary.
+# Routing reads to them needs the cache shared by the worker processes, so they cannot be used with CACHE_LOCAL.
+DATABASE_REPLICAS = [f"replica{number}" for number in range(1, int(os.getenv("DATABASE_REPLICA_COUNT", 0)) + 1)]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / f"db.{alias}.sqlite3",
+        "OPTIONS": {},  # Nothing but reads
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["utils.db_router.PrimaryReplicaRouter"]
+# "round-robin" or "least-latency"
+DATABASE_REPLICA_SELECTION = os.getenv("DATABASE_REPLICA_SELECTION", "round-robin")
+# Seconds the replicas may be behind the primary: reads of what was written in that time go to the primary
+DATABASE_REPLICA_LAG = int(os.getenv("DATABASE_REPLICA_LAG", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Writes bump the response cache generations (see utils/response_cache.py) and revoke tokens (see api/auth/)
+# in the cache, which every worker process of a server must see. The default file-based cache under CACHE_DIR
+# is shared by the processes of one host; for several hosts, point CACHES at Memcached or Redis.
+# CACHE_LOCAL=True uses the faster local memory cache instead, which is per process: only for a server
+# running a single process, such as runserver.
+CACHE_LOCAL = os.getenv("CACHE_LOCAL") == "True"
+CACHE_DIR = os.getenv("CACHE_DIR") or str(BASE_DIR / "cache")
+# Revoked access tokens (see api/auth/token_cache.py) are kept apart, so that culling a full response cache
+# cannot drop them before the tokens expire
+AUTH_CACHE_MAX_ENTRIES = 100000
+
+if CACHE_LOCAL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+        "auth": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "auth",
+            "OPTIONS": {"MAX_ENTRIES": AUTH_CACHE_MAX_ENTRIES},
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+        "auth": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(CACHE_DIR, "auth"),
+            "OPTIONS": {"MAX_ENTRIES": AUTH_CACHE_MAX_ENTRIES},
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -149,8 +234,82 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "utils.exception_handler.custom_exception_handler",
     "DEFAULT_AUTHENTICATION_CLASSES": ("api.auth.jwt_scheme.CustomJWTAuthentication",),
+    # https://www.django-rest-framework.org/api-guide/renderers/
+    # orjson and msgpack are optional, see utils/renderers.py
+    "DEFAULT_RENDERER_CLASSES": (
+        "utils.renderers.FastJSONRenderer",
+        "utils.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "utils.renderers.FastJSONParser",
+        "utils.renderers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "utils.renderers.AvailableContentNegotiation",
+    # https://www.django-rest-framework.org/api-guide/pagination/
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
+# Raise an error for any request that runs more queries than its view's query_budget (see utils/query_plan.py).
+# Useful in development and tests to catch N+1 regressions.
+QUERY_BUDGET_ASSERT = os.getenv("QUERY_BUDGET_ASSERT") == "True"
+
+# Number of rows fetched, serialized and encoded at a time by streaming list responses (?stream=true)
+STREAMING_CHUNK_SIZE = 500
+
+# Serve the entry and author lists through compiled serializers (see utils/compiled_serializer.py)
+COMPILED_SERIALIZERS = os.getenv("COMPILED_SERIALIZERS", "True") == "True"
+
+# Dispatch the entry, blog and author reads to their async handlers (see utils/async_views.py).
+# Turned on by asgi.py, leave it off under WSGI where async views would run in a new event loop per request.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS") == "True"
+
+# Bulk entry writes (/api/entries/bulk/): maximum items per request and rows per INSERT/UPDATE batch.
+# The batch size can be lowered per request with ?batch_size=
+BULK_WRITE_MAX_ITEMS = 10000
+BULK_WRITE_BATCH_SIZE = 500
+
+# Seconds a cached GET response is kept (see utils/response_cache.py). Writes invalidate cached
+# responses right away, so this only bounds how long unreachable entries take up space. 0 disables the cache.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Authenticated users are cached per process for up to AUTH_USER_CACHE_TTL seconds (see api/auth/user_cache.py).
+# 0 disables the cache.
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 60))
+AUTH_USER_CACHE_SIZE = 10000
+
+# Seconds the resolved permissions of a user are kept in the cache (see api/auth/permission_cache.py).
+# Bounds how long a process that missed a permission change keeps using the old permissions. 0 disables the cache.
+AUTH_PERMISSION_CACHE_TTL = int(os.getenv("AUTH_PERMISSION_CACHE_TTL", 300))
+
+# Verified access token claims cached per process until the token expires (see api/auth/token_cache.py). 0 disables the cache.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+
+# Authenticate GET/HEAD/OPTIONS requests from the access token claims alone, without reading the user.
+# A role change then only applies to read requests once the tokens issued before it expire.
+AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY") == "True"
+
+# Membership filter of blacklisted refresh tokens (see api/auth/blacklist.py): seconds between rebuilds
+# of a stale filter, the age at which a filter is rebuilt even if no blacklisting was seen, and the share of
+# non blacklisted tokens that still query the blacklist table
+TOKEN_BLACKLIST_FILTER_INTERVAL = int(os.getenv("TOKEN_BLACKLIST_FILTER_INTERVAL", 60))
+TOKEN_BLACKLIST_FILTER_MAX_AGE = int(os.getenv("TOKEN_BLACKLIST_FILTER_MAX_AGE", 600))
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.01
+
+# Worker processes for CPU bound batch work such as hashing imported passwords (see utils/process_pool.py)
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 2))
+
+# Rows of an author import written per transaction (/api/authors/import/ and the import_authors command)
+AUTHOR_IMPORT_CHUNK_SIZE = 500
+
+# Password hashing runs on a pool of PASSWORD_HASHING_WORKERS threads (see utils/hashing.py).
+# Requests beyond the workers plus PASSWORD_HASHING_QUEUE waiting ones get 503 with Retry-After.
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", max((os.cpu_count() or 2) // 2, 1)))
+PASSWORD_HASHING_QUEUE = int(os.getenv("PASSWORD_HASHING_QUEUE", 16))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
         minutes=5
@@ -170,10 +329,37 @@ SIMPLE_JWT = {
 
 MEDIA_URL = "media/"
 
+# Resized copies of User.photo generated in the background on upload (see api/photos.py)
+PHOTO_DERIVATIVE_SIZES = [64, 256]
+PHOTO_DERIVATIVE_FORMATS = ["webp", "jpeg"]
+PHOTO_DERIVATIVE_QUALITY = 80
+
+# Files of deleted or replaced photos are deleted after the transaction commits, this many per
+# background task (see utils/deferred_delete.py). The sweep_media command removes the ones left over.
+MEDIA_DELETE_BATCH_SIZE = 500
+
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Who sends media files (see utils/media.py): "python" streams them from the worker, "x-accel-redirect" (nginx)
+# and "x-sendfile" (Apache, lighttpd) leave the transfer to the front proxy. nginx serves MEDIA_ACCEL_PREFIX
+# as an internal location aliased to MEDIA_ROOT.
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "python")
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Content-addressed names (see api/storage.py and api/photos.py), cached for a year. Others for MEDIA_CACHE_MAX_AGE seconds.
+MEDIA_IMMUTABLE_PREFIXES = ["photos/", "derivatives/"]
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
 STORAGES = {
     # Django’s default file storage is 'django.core.files.storage.FileSystemStorage'. If you don’t explicitly provide a storage system in the default key of the STORAGES setting, this is the one that will be used.
+    # Defining STORAGES replaces Django's default for it, so the default key has to be listed
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    # User.photo, stored by content hash under MEDIA_ROOT/photos/ (see api/storage.py)
+    "photos": {
+        "BACKEND": "api.storage.ContentAddressedStorage",
+        "OPTIONS": {"prefix": "photos"},
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
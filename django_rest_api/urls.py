@@ -16,12 +16,13 @@ Including another URLconf
 """
 
 from api.admin import admin_site
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.http import JsonResponse, HttpRequest
 from rest_framework import status
 from django.conf import settings
 from django.conf.urls.static import static
 from utils.common import failure_response
+from utils.media import serve_media
 
 """
 https://docs.djangoproject.com/en/5.0/topics/http/views/#customizing-error-views
@@ -34,6 +35,7 @@ ALLOWED_HOSTS = ['*'] for any host or a list of specific allowed hosts
 static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) and + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) can be used to serve media and static files in development where DEBUG is set to True. This is not suitable for production use!
 Common strageies for doing so includes using whitenoise or doing the following:
 https://docs.djangoproject.com/en/5.2/howto/static-files/deployment/
+Media files are served by utils/media.py in every mode instead, which can hand the transfer to the front proxy.
 """
 
 
@@ -56,7 +58,7 @@ urlpatterns = (
         path("admin/", admin_site.urls),
         # path("api-auth/", include("rest_framework.urls")),
         path("api/", include("api.urls")),
+        re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$", serve_media, name="media"),
     ]
-    + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 )
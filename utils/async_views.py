@@ -0,0 +1,117 @@
+import asyncio
+from functools import update_wrapper
+from typing import Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from rest_framework import exceptions, request
+
+# https://docs.djangoproject.com/en/5.0/topics/async/
+# https://docs.djangoproject.com/en/5.0/topics/db/queries/#asynchronous-queries
+# https://www.django-rest-framework.org/api-guide/views/#dispatch-methods
+
+
+class AsyncReadMixin:
+    """
+    Lets an APIView or viewset define async versions of its read handlers, named after the sync
+    handler with an "a" prefix (aget, alist, aretrieve). With settings.ASYNC_VIEWS on (the default
+    under ASGI, see asgi.py), as_view() returns a coroutine view: requests that have an async handler
+    are dispatched in the event loop and query the database through the async ORM, the others run the
+    regular sync dispatch through sync_to_async, like Django runs any sync view under ASGI.
+    Under WSGI the sync handlers are used, so both versions have to stay equivalent.
+
+    Authentication awaits the authenticators' aauthenticate method when they have one.
+    Nothing else in initial() may query the database, and QueryBudgetMixin does not apply,
+    since the queries run in other threads than the request.
+    """
+
+    async_dispatch = False  # Set through as_view() initkwargs
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        view = super().as_view(*args, **initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        async_dispatch_view = super().as_view(*args, async_dispatch=True, **initkwargs)
+        sync_view = sync_to_async(view)
+        actions = getattr(view, "actions", None)  # Viewsets map HTTP methods to actions
+
+        async def async_view(request, *args, **kwargs):
+            if cls.get_async_handler_name(request.method, actions):
+                # The view function only sets the instance up and returns dispatch()'s coroutine
+                return await async_dispatch_view(request, *args, **kwargs)
+            return await sync_view(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    @classmethod
+    def get_async_handler_name(cls, method: str, actions: Optional[dict] = None) -> Optional[str]:
+        method = method.lower()
+        if method == "head":
+            method = "get"
+        name = actions.get(method) if actions is not None else method
+        if name and asyncio.iscoroutinefunction(getattr(cls, f"a{name}", None)):
+            return f"a{name}"
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.async_dispatch:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        # Same steps as APIView.dispatch
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)  # Finds request.user already set
+            handler_name = self.get_async_handler_name(
+                request.method, getattr(self, "action_map", None)
+            )
+            response = await getattr(self, handler_name)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request: request.Request):
+        # Same as Request._authenticate, awaiting the async path of authenticators that have one
+        for authenticator in request.authenticators:
+            aauthenticate = getattr(authenticator, "aauthenticate", None) or sync_to_async(
+                authenticator.authenticate
+            )
+            try:
+                user_auth_tuple = await aauthenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def aget_object(self):
+        # Same as GenericAPIView.get_object
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
@@ -0,0 +1,36 @@
+import hashlib
+import math
+from typing import Iterable
+
+# https://en.wikipedia.org/wiki/Bloom_filter#Optimal_number_of_hash_functions
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed amount of memory: might_contain never misses an added item, but answers
+    True for other items with a probability of about error_rate once capacity items were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.might_contain(item)
@@ -1,12 +1,17 @@
 from enum import Enum
 from typing import Any, Optional
 
-def success_response(message: str, data: Any = None):
-    return {
+def success_response(
+    message: str, data: Any = None, pagination: Optional[dict[str, Optional[str]]] = None
+):
+    res = {
         "success": True,
         "message": message,
         "result": data,
     }
+    if pagination is not None:
+        res["pagination"] = pagination  # next/previous links of paginated list endpoints
+    return res
 
 
 def failure_response(message: str, errors: Optional[dict[str, list[str]]] = None):
@@ -0,0 +1,287 @@
+import json
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Optional
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import QuerySet
+from rest_framework import serializers
+from .query_plan import FieldTree
+
+# https://www.django-rest-framework.org/api-guide/serializers/#improving-performance
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#values-list
+
+"""
+Read-only fast path for list responses. A serializer (with its sparse fields and expansions) is
+compiled once into a generated function that maps a values_list() row straight to the output dict,
+instead of going through DRF's per-field dispatch on model instances for every row.
+Nested single relations are read from the same row through JOINs, nested many relations
+with one query per relation for the whole page, like prefetch_related.
+
+The serializer stays the reference implementation: it defines the output, handles writes, and is
+used whenever a field cannot be compiled. The bench_serializers command checks that both render
+the same bytes.
+"""
+
+# Fields that return database values of these model field types unchanged
+_IDENTITY_FIELDS = {
+    serializers.IntegerField: {
+        "AutoField",
+        "BigAutoField",
+        "SmallAutoField",
+        "IntegerField",
+        "BigIntegerField",
+        "SmallIntegerField",
+        "PositiveIntegerField",
+        "PositiveBigIntegerField",
+        "PositiveSmallIntegerField",
+    },
+    serializers.CharField: {"CharField", "TextField"},
+    serializers.EmailField: {"CharField"},
+    serializers.ChoiceField: {"CharField"},
+}
+
+
+class SerializerNotCompilable(Exception):
+    """The serializer uses a field the compiler does not support"""
+
+
+class CompiledSerializer:
+    def __init__(
+        self,
+        model: type[models.Model],
+        columns: list[str],
+        function: Callable[[tuple, list], Any],
+        prefetches: list[tuple[int, str, "CompiledSerializer"]],
+        source: str,
+    ):
+        self.model = model
+        self.columns = columns
+        self.function = function
+        self.prefetches = prefetches  # (index of the key column, lookup back to this model, compiled relation)
+        self.source = source  # The generated code, for debugging
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """
+        The rows to pass to to_representation_many. The ordering columns are added after the compiled ones,
+        so that KeysetPagination can read the cursor position of a row by name.
+        """
+        opts = self.model._meta
+        ordering = queryset.query.order_by or opts.ordering
+        extra = []
+        for name in [*ordering, opts.pk.name]:
+            name = name.lstrip("-") if isinstance(name, str) else None
+            name = opts.pk.name if name == "pk" else name
+            if name and name not in self.columns and name not in extra:
+                extra.append(name)
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def to_representation_many(self, rows: Iterable[tuple]) -> list:
+        rows = rows if isinstance(rows, list) else list(rows)
+        prefetched = [
+            self._group_related(related, list(self._related_rows(rows, key, lookup, related)))
+            for key, lookup, related in self.prefetches
+        ]
+        function = self.function
+        return [function(row, prefetched) for row in rows]
+
+    async def ato_representation_many(self, rows: list[tuple]) -> list:
+        prefetched = []
+        for key, lookup, related in self.prefetches:
+            related_rows = [row async for row in self._related_rows(rows, key, lookup, related)]
+            prefetched.append(await self._agroup_related(related, related_rows))
+        function = self.function
+        return [function(row, prefetched) for row in rows]
+
+    @staticmethod
+    def _related_rows(
+        rows: list[tuple], key: int, lookup: str, related: "CompiledSerializer"
+    ) -> QuerySet:
+        keys = {row[key] for row in rows if row[key] is not None}
+        # The first column of the related rows is the key of the row they belong to
+        return related.model._default_manager.filter(**{f"{lookup}__in": keys}).values_list(
+            *related.columns
+        )
+
+    @staticmethod
+    def _group_related(related: "CompiledSerializer", related_rows: list[tuple]) -> dict[Any, list]:
+        grouped: dict[Any, list] = {}
+        for row, data in zip(related_rows, related.to_representation_many(related_rows)):
+            grouped.setdefault(row[0], []).append(data)
+        return grouped
+
+    @staticmethod
+    async def _agroup_related(
+        related: "CompiledSerializer", related_rows: list[tuple]
+    ) -> dict[Any, list]:
+        grouped: dict[Any, list] = {}
+        for row, data in zip(related_rows, await related.ato_representation_many(related_rows)):
+            grouped.setdefault(row[0], []).append(data)
+        return grouped
+
+
+class _Compiler:
+    def __init__(self):
+        self.columns: list[str] = []
+        self.namespace: dict[str, Any] = {}
+        self.prefetches: list[tuple[int, str, CompiledSerializer]] = []
+
+    def column(self, lookup: str) -> str:
+        if lookup not in self.columns:
+            self.columns.append(lookup)
+        return f"row[{self.columns.index(lookup)}]"
+
+    def bind(self, value: Any) -> str:
+        name = f"_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def build(self, model: type[models.Model], expression: str, name: str) -> CompiledSerializer:
+        source = f"def to_representation(row, prefetched):\n    return {expression}\n"
+        exec(compile(source, f"<compiled {name}>", "exec"), self.namespace)
+        return CompiledSerializer(
+            model, self.columns, self.namespace["to_representation"], self.prefetches, source
+        )
+
+    def serializer(self, serializer: serializers.Serializer, prefix: str) -> str:
+        opts = serializer.Meta.model._meta
+        # Relations QueryPlanMixin renders as primary key fields and expands in to_representation
+        expanded = {
+            name: (serializer_class, many, kwargs)
+            for name, serializer_class, many, kwargs in getattr(serializer, "_expanded_relations", [])
+        }
+        items = []
+        for field in serializer._readable_fields:
+            if field.source == "*" or "." in field.source:
+                raise SerializerNotCompilable(f"{field.field_name} has a custom source")
+            if field.field_name in expanded:
+                serializer_class, many, kwargs = expanded[field.field_name]
+                value = self.relation(opts, field.source, serializer_class(**kwargs), many, prefix)
+            else:
+                value = self.field(opts, field, prefix)
+            items.append(f"{field.field_name!r}: {value}")
+        return "{" + ", ".join(items) + "}"
+
+    def field(self, opts: models.options.Options, field: serializers.Field, prefix: str) -> str:
+        if isinstance(field, serializers.ListSerializer):
+            return self.relation(opts, field.source, field.child, True, prefix)
+        if isinstance(field, serializers.BaseSerializer):
+            return self.relation(opts, field.source, field, False, prefix)
+        if isinstance(field, serializers.ManyRelatedField):
+            if not _is_plain_pk(field.child_relation):
+                raise SerializerNotCompilable(f"{field.field_name} is not a primary key relation")
+            return self.relation(opts, field.source, None, True, prefix)
+        if isinstance(field, serializers.RelatedField):
+            if not _is_plain_pk(field):
+                raise SerializerNotCompilable(f"{field.field_name} is not a primary key relation")
+            return self.column(prefix + field.source)  # The foreign key column
+
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            attr = getattr(opts.model, field.source, None)
+            if isinstance(attr, property):
+                return self.property(opts, attr, field, prefix)
+            raise SerializerNotCompilable(f"{field.field_name} is not a model field or property")
+        if model_field.is_relation or not model_field.concrete:
+            raise SerializerNotCompilable(f"{field.field_name} is not a concrete column")
+
+        value = self.column(prefix + model_field.name)
+        if model_field.get_internal_type() in _IDENTITY_FIELDS.get(type(field), ()):
+            return value
+        if isinstance(model_field, models.FileField):
+            # values() returns the file name, FileField/ImageField expect the model's FieldFile
+            def convert(name, field=field, model_field=model_field):
+                return field.to_representation(model_field.attr_class(None, model_field, name))
+        else:
+            convert = field.to_representation
+        return f"({self.bind(convert)}({value}) if {value} is not None else None)"
+
+    def property(
+        self, opts: models.options.Options, attr: property, field: serializers.Field, prefix: str
+    ) -> str:
+        # Properties are called on a stand-in object that has every concrete column of the model
+        attnames = [model_field.attname for model_field in opts.concrete_fields]
+        values = [self.column(prefix + model_field.name) for model_field in opts.concrete_fields]
+
+        def convert(*values, attnames=attnames, fget=attr.fget, field=field):
+            value = fget(SimpleNamespace(**dict(zip(attnames, values))))
+            return None if value is None else field.to_representation(value)
+
+        return f"{self.bind(convert)}({', '.join(values)})"
+
+    def relation(
+        self,
+        opts: models.options.Options,
+        name: str,
+        serializer: Optional[serializers.Serializer],
+        many: bool,
+        prefix: str,
+    ) -> str:
+        relation = opts.get_field(name)
+        if not many:
+            if serializer is None:
+                return self.column(prefix + name)
+            value = self.serializer(serializer, f"{prefix}{name}__")
+            if getattr(relation, "null", True):  # Nullable and reverse relations may have no row
+                return f"({value} if {self.column(f'{prefix}{name}__pk')} is not None else None)"
+            return value
+
+        related_model = relation.related_model
+        # The lookup from the related model back to this one, e.g. Author -> Entry is "entry"
+        lookup = relation.field.name if relation.auto_created else relation.related_query_name()
+        related = _Compiler()
+        related.column(lookup)
+        if serializer is None:
+            expression = related.column(related_model._meta.pk.name)  # Rendered as primary keys
+        else:
+            expression = related.serializer(serializer, "")
+        compiled = related.build(related_model, expression, f"{opts.model.__name__}.{name}")
+
+        key = self.column(prefix + opts.pk.name)
+        self.prefetches.append((self.columns.index(prefix + opts.pk.name), lookup, compiled))
+        return f"prefetched[{len(self.prefetches) - 1}].get({key}, [])"
+
+
+def _is_plain_pk(field: serializers.Field) -> bool:
+    return isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None
+
+
+def compile_serializer(
+    serializer_class: type[serializers.Serializer],
+    fields: FieldTree | None = None,
+    expand: FieldTree | None = None,
+) -> CompiledSerializer:
+    """Compiles the serializer for the given sparse fieldsets, raises SerializerNotCompilable"""
+    serializer = serializer_class(fields=fields, expand=expand)
+    compiler = _Compiler()
+    expression = compiler.serializer(serializer, "")
+    return compiler.build(serializer.Meta.model, expression, serializer_class.__name__)
+
+
+@lru_cache(maxsize=256)  # Bounded since the sparse fieldsets come from query parameters
+def _compile_cached(
+    serializer_class: type[serializers.Serializer], fields: str, expand: str
+) -> Optional[CompiledSerializer]:
+    try:
+        return compile_serializer(serializer_class, json.loads(fields), json.loads(expand))
+    except SerializerNotCompilable:
+        return None
+
+
+def get_compiled_serializer(
+    serializer_class: type[serializers.Serializer],
+    fields: FieldTree | None = None,
+    expand: FieldTree | None = None,
+) -> Optional[CompiledSerializer]:
+    """
+    The compiled serializer, compiled once per serializer class and sparse fieldsets.
+    None when settings.COMPILED_SERIALIZERS is off or the serializer cannot be compiled,
+    in which case the serializer itself has to be used.
+    """
+    if not settings.COMPILED_SERIALIZERS:
+        return None
+
+    # Classes hash by identity, which mypy cannot tell from the type of a serializer class
+    return _compile_cached(serializer_class, json.dumps(fields), json.dumps(expand))  # type: ignore[arg-type]
@@ -0,0 +1,89 @@
+import asyncio
+import datetime
+import hashlib
+from functools import wraps
+from typing import Any, Optional
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import request, status
+
+# https://docs.djangoproject.com/en/5.0/topics/conditional-view-processing/
+# https://www.rfc-editor.org/rfc/rfc9110#name-conditional-requests
+
+Validators = tuple[Any, Optional[datetime.datetime]]
+
+
+def compute_etag(request: request.Request, source: Any) -> str:
+    # The same data is represented differently per query (?fields=, cursor) and renderer (JSON, browsable API)
+    raw = repr(
+        (
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_renderer.format,
+            source,
+        )
+    )
+    return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+
+def conditional_response(get_validators: str):
+    """
+    Answers If-None-Match / If-Modified-Since with 304 Not Modified before the handler runs.
+
+    get_validators names a view method called with the handler's arguments that returns
+    (source, last_modified): source is any value that changes whenever the response would change
+    (hashed into a strong ETag) and last_modified a datetime. It may also return None to skip the check,
+    e.g. when the object does not exist. Validators should be much cheaper to get than the response itself.
+
+    @conditional_response("get_detail_validators")
+    def get(self, request, pk): ...
+    """
+
+    def decorator(handler):
+        def check(view, request: request.Request, validators: Optional[Validators]):
+            # Returns the 304 response, if any, and the headers to set on the response
+            if validators is None:
+                return None, {}
+            source, last_modified = validators
+            headers = {"ETag": compute_etag(request, source)}
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            if timestamp is not None:
+                headers["Last-Modified"] = http_date(timestamp)
+            response = get_conditional_response(
+                request, etag=headers["ETag"], last_modified=timestamp
+            )
+            return response, headers
+
+        def add_headers(response, headers: dict):
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                for header, value in headers.items():
+                    response.headers.setdefault(header, value)
+            return response
+
+        if asyncio.iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def async_wrapper(view, request: request.Request, *args, **kwargs):
+                # The validators are shared with the sync handler and run in a thread like any sync ORM code
+                validators = await sync_to_async(getattr(view, get_validators))(
+                    request, *args, **kwargs
+                )
+                response, headers = check(view, request, validators)
+                if response is None:
+                    response = await handler(view, request, *args, **kwargs)
+                return add_headers(response, headers)
+
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(view, request: request.Request, *args, **kwargs):
+            validators = getattr(view, get_validators)(request, *args, **kwargs)
+            response, headers = check(view, request, validators)
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+            return add_headers(response, headers)
+
+        return wrapper
+
+    return decorator
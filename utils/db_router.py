@@ -0,0 +1,220 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest
+from .response_cache import last_write
+
+# https://docs.djangoproject.com/en/5.0/topics/db/multi-db/#automatic-database-routing
+# https://docs.djangoproject.com/en/5.0/topics/db/instrumentation/
+# https://docs.djangoproject.com/en/5.0/topics/http/middleware/#asynchronous-support
+
+"""
+Primary/replica routing. Writes always go to the primary ("default"). Reads go to one of
+settings.DATABASE_REPLICAS only during a GET or HEAD request (set up by ReplicaRoutingMiddleware),
+so management commands, background threads and everything a write request reads stay on the primary.
+
+Replicas lag behind the primary by up to DATABASE_REPLICA_LAG seconds, so reads go to the primary:
+- for the rest of a request once it wrote (the router was asked for a write database),
+- inside a transaction on the primary,
+- for DATABASE_REPLICA_LAG seconds after a request of the same client wrote (a cookie set on its response),
+- for DATABASE_REPLICA_LAG seconds after any write to the model read, known from its response cache
+  generation (see utils/response_cache.py). Otherwise a response cached or tagged with the new generation
+  could be built from the rows before the write,
+- always for the models whose writes do not bump a generation (see track_writes), since nothing tells
+  when they were written.
+The generations have to be shared by all processes, so replicas require a cache shared by them
+(not CACHE_LOCAL, see CACHES in settings.py): ReplicaRoutingMiddleware refuses to start otherwise.
+
+DATABASE_REPLICA_SELECTION chooses the replica of each read: "round-robin", or "least-latency",
+the replica with the lowest moving average of query time in this process (with an occasional
+round-robin pick so that a slow replica is measured again once it recovers).
+"""
+
+PIN_COOKIE = "db_primary"
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+LATENCY_WEIGHT = 0.2  # Weight of the last query in the moving average
+EXPLORE_EVERY = 20  # Every nth least-latency pick is round-robin instead
+
+_stats_lock = threading.Lock()
+_alias_stats: dict[str, dict[str, float]] = {}
+_routing_stats = {"replica_reads": 0, "primary_reads": 0, "pinned_requests": 0}
+_round_robin = itertools.count()
+
+
+class RoutingState:
+    """Routing of the current request, mutated in place so that threads running its ORM calls share it"""
+
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar("db_routing_state", default=None)
+
+
+def _alias(connection) -> dict[str, float]:
+    stats = _alias_stats.get(connection.alias)
+    if stats is None:
+        stats = _alias_stats.setdefault(
+            connection.alias, {"queries": 0, "errors": 0, "time_ms": 0.0, "latency_ms": 0.0}
+        )
+    return stats
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting the queries of each alias and their time"""
+    start = time.perf_counter()
+    failed = True
+    try:
+        result = execute(sql, params, many, context)
+        failed = False
+        return result
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        with _stats_lock:
+            stats = _alias(context["connection"])
+            stats["queries"] += 1
+            stats["errors"] += failed
+            stats["time_ms"] += duration
+            if stats["queries"] == 1:
+                stats["latency_ms"] = duration
+            else:
+                stats["latency_ms"] += LATENCY_WEIGHT * (duration - stats["latency_ms"])
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # connection_created is sent again when the wrapper reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(instrument_connection, dispatch_uid="db_router_instrument_connection")
+
+
+def choose_replica(replicas: list[str]) -> str:
+    pick = next(_round_robin)
+    if settings.DATABASE_REPLICA_SELECTION == "least-latency" and pick % EXPLORE_EVERY:
+        with _stats_lock:
+            # Replicas without queries yet come first
+            return min(replicas, key=lambda alias: _alias_stats.get(alias, {}).get("latency_ms", 0.0))
+    return replicas[pick % len(replicas)]
+
+
+def written_recently(model) -> bool:
+    generation = last_write(model)  # The time of the last write in nanoseconds, None if not tracked
+    return generation is None or time.time_ns() - generation < settings.DATABASE_REPLICA_LAG * 1e9
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            state is None
+            or state.pinned
+            or not replicas
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or written_recently(model)
+        ):
+            alias = DEFAULT_DB_ALIAS
+        else:
+            alias = choose_replica(replicas)
+        if state is not None:
+            with _stats_lock:
+                _routing_stats["primary_reads" if alias == DEFAULT_DB_ALIAS else "replica_reads"] += 1
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema with the data from the primary
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Lets the reads of GET and HEAD requests go to the replicas, see PrimaryReplicaRouter"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+            raise ImproperlyConfigured(
+                "DATABASE_REPLICAS need a cache shared by the worker processes to know when a model was last "
+                "written, unset CACHE_LOCAL"
+            )
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request: HttpRequest):
+        # The reads of write requests stay on the primary
+        pinned = request.method not in ("GET", "HEAD")
+        if not pinned and PIN_COOKIE in request.COOKIES:
+            pinned = True
+            with _stats_lock:
+                _routing_stats["pinned_requests"] += 1
+        state = RoutingState(pinned)
+        return _state.set(state), state
+
+    def finish(self, state: RoutingState, response):
+        if state.wrote:
+            # Long enough for the replicas to catch up with the write
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_LAG,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, state = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        token, state = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+
+def db_router_stats() -> dict:
+    """Query counts and times per database alias and how reads were routed, in the current process"""
+    with _stats_lock:
+        return {
+            "routing": dict(_routing_stats),
+            "aliases": {
+                alias: {**stats, "time_ms": round(stats["time_ms"], 3), "latency_ms": round(stats["latency_ms"], 3)}
+                for alias, stats in sorted(_alias_stats.items())
+            },
+        }
@@ -0,0 +1,112 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Optional
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.db import connections
+
+# https://docs.djangoproject.com/en/5.0/topics/db/transactions/#performing-actions-after-commit
+# https://docs.djangoproject.com/en/5.0/ref/files/storage/#django.core.files.storage.Storage.delete
+
+"""
+File deletions that wait for the database write they belong to. Files deleted inside a transaction
+are collected into one batch per transaction (and savepoint), which is handed to a background thread
+once the transaction commits, and dropped if it rolls back. Deleting thousands of rows therefore
+costs one on_commit callback instead of a filesystem call per row inside the transaction, and a
+rollback no longer leaves rows pointing at files that are gone.
+"""
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_stats = {"queued": 0, "deleted": 0, "failed": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # A single thread: deletions are I/O bound and do not need to compete with requests
+            _executor = ThreadPoolExecutor(1, thread_name_prefix="file-cleanup")
+        return _executor
+
+
+def delete_files(storage: Storage, names: Iterable[str]) -> int:
+    """Deletes the files right away in the calling thread and returns how many could be deleted"""
+    deleted = failed = 0
+    for name in names:
+        try:
+            storage.delete(name)  # Missing files are ignored by FileSystemStorage
+            deleted += 1
+        except OSError:
+            failed += 1
+            logger.exception("Deleting %s failed", name)
+    with _lock:
+        _stats["deleted"] += deleted
+        _stats["failed"] += failed
+    return deleted
+
+
+def delete_in_background(storage: Storage, names: list[str]) -> list[Future]:
+    """Deletes the files on the cleanup thread, MEDIA_DELETE_BATCH_SIZE files per task"""
+    executor = _get_executor()
+    with _lock:
+        _stats["queued"] += len(names)
+    batches = iter(names)
+    futures = []
+    while batch := list(islice(batches, settings.MEDIA_DELETE_BATCH_SIZE)):
+        futures.append(executor.submit(delete_files, storage, batch))
+    return futures
+
+
+class _Batch:
+    """Names to delete after a transaction commits, registered as a single on_commit callback"""
+
+    def __init__(self, storage: Storage, hooks: list):
+        self.storage = storage
+        self.names: list[str] = []
+        self.hooks = hooks  # The connection's list of on_commit callbacks the batch was added to
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        delete_in_background(self.storage, self.names)
+
+    def pending(self, connection) -> bool:
+        # Commits and rollbacks (of the transaction or a savepoint) replace the list of callbacks
+        return not self.done and self.hooks is connection.run_on_commit
+
+
+def delete_on_commit(storage: Storage, name: str, using: str = "default"):
+    """
+    Deletes the file once the current transaction of the given database commits, or right away in
+    the background outside of a transaction. Nothing is deleted if the transaction rolls back.
+    """
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        delete_in_background(storage, [name])
+        return
+
+    if not hasattr(_local, "batches"):
+        _local.batches = {}
+    # One batch per savepoint, so that rolling back a savepoint drops the names added inside it only
+    key = (using, tuple(connection.savepoint_ids), id(storage))
+    batch = _local.batches.get(key)
+    # The id of a storage that was garbage collected can be reused by another one
+    if batch is None or batch.storage is not storage or not batch.pending(connection):
+        # Forget the batches that already ran or were dropped, one key per savepoint would pile up otherwise
+        _local.batches = {
+            key: batch for key, batch in _local.batches.items() if batch.pending(connections[key[0]])
+        }
+        batch = _local.batches[key] = _Batch(storage, connection.run_on_commit)
+        connection.on_commit(batch)
+    batch.names.append(name)
+
+
+def deferred_delete_stats() -> dict[str, int]:
+    with _lock:
+        return dict(_stats)
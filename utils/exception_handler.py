@@ -14,6 +14,11 @@ def custom_exception_handler(exc: Exception, context: dict = {}):
     if err_res is None:
         return err_res
 
+    # Keep the headers DRF set for the exception, e.g. WWW-Authenticate and Retry-After
+    headers = {
+        header: value for header, value in err_res.items() if header.lower() != "content-type"
+    }
+
     if isinstance(exc, (ValidationError, serializers.ValidationError)):
         return Response(
             failure_response(
@@ -21,6 +26,9 @@ def custom_exception_handler(exc: Exception, context: dict = {}):
                 message="The given data was invalid",
             ),
             status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            headers=headers,
         )
 
-    return Response(failure_response(message=str(exc)), status=err_res.status_code)
+    return Response(
+        failure_response(message=str(exc)), status=err_res.status_code, headers=headers
+    )
@@ -0,0 +1,131 @@
+import datetime
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import request, serializers
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+# https://www.django-rest-framework.org/api-guide/filtering/#custom-generic-filtering
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#field-lookups
+# https://www.sqlite.org/queryplanner.html
+
+
+def leading_index_columns(model: type[models.Model]) -> set[str]:
+    """Names of the fields that are the first column of at least one index of the model's table"""
+    opts = model._meta
+    columns = {opts.pk.name}
+    for index in opts.indexes:
+        columns.add(index.fields[0].lstrip("-"))
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+            columns.add(constraint.fields[0])
+    for fields in opts.unique_together:
+        columns.add(fields[0])
+    for field in opts.concrete_fields:
+        if field.db_index or field.unique:  # ForeignKey columns are indexed by default
+            columns.add(field.name)
+    for field in opts.many_to_many:
+        # Filtering on a many-to-many relation looks up the through table by the related id,
+        # which is indexed on automatically created through tables
+        columns.add(field.name)
+    return columns
+
+
+class IndexedFilterBackend(BaseFilterBackend):
+    """
+    Whitelisted filtering and ordering driven by the view:
+
+    filter_fields = {"rating": ["exact", "gte", "lte"], ...}  # ?rating__gte=5
+    ordering_fields = ["pub_date", "rating"]  # ?ordering=-rating,pub_date
+
+    Combinations that no index can serve are rejected instead of running a full table scan:
+    at least one filtered field must lead an index, or, without filters, the first ordering field must.
+    """
+
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request: request.Request, queryset: QuerySet, view):
+        filters = self.get_filters(request, queryset, view)
+        ordering = self.get_ordering(request, view)
+        self.check_index_usage(queryset, filters, ordering)
+
+        if filters:
+            queryset = queryset.filter(**filters)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_filters(self, request: request.Request, queryset: QuerySet, view) -> dict:
+        filters = {}
+        errors = {}
+        for name, lookups in getattr(view, "filter_fields", {}).items():
+            field = queryset.model._meta.get_field(name)
+            # Relations are filtered by the primary key of the related model
+            value_field = field.target_field if field.is_relation else field
+            for lookup in lookups:
+                param = name if lookup == "exact" else f"{name}__{lookup}"
+                if param not in request.query_params:
+                    continue
+                try:
+                    value = value_field.to_python(request.query_params[param])
+                except DjangoValidationError as e:
+                    errors[param] = e.messages
+                    continue
+                if isinstance(value, datetime.datetime) and timezone.is_naive(value):
+                    # ?mod_date__gte=2024-01-01 is read in the current time zone
+                    value = timezone.make_aware(value)
+                filters[param] = value
+        if errors:
+            raise serializers.ValidationError(errors)
+        return filters
+
+    def get_ordering(self, request: request.Request, view) -> list[str]:
+        param = request.query_params.get(self.ordering_param)
+        if not param:
+            return []
+
+        allowed = getattr(view, "ordering_fields", [])
+        ordering = [term.strip() for term in param.split(",") if term.strip()]
+        invalid = [term for term in ordering if term.lstrip("-") not in allowed]
+        if invalid:
+            raise serializers.ValidationError(
+                {
+                    self.ordering_param: [
+                        "Cannot order by {}. Allowed fields: {}.".format(
+                            ", ".join(invalid), ", ".join(allowed)
+                        )
+                    ]
+                }
+            )
+        return ordering
+
+    def check_index_usage(self, queryset: QuerySet, filters: dict, ordering: list[str]):
+        indexed = leading_index_columns(queryset.model)
+        filtered = {param.split("__")[0] for param in filters}
+
+        if filtered:
+            if filtered & indexed:
+                return
+            raise serializers.ValidationError(
+                {
+                    "filters": [
+                        "Filtering only by {} requires a full table scan. Combine it with a filter on one of: {}.".format(
+                            ", ".join(sorted(filtered)), ", ".join(sorted(indexed))
+                        )
+                    ]
+                }
+            )
+
+        ordering = ordering or list(queryset.query.order_by or queryset.model._meta.ordering)
+        if ordering and ordering[0].lstrip("-") not in indexed | {"pk"}:
+            raise serializers.ValidationError(
+                {
+                    self.ordering_param: [
+                        "Ordering by {} requires a full table scan. Filter by one of: {}.".format(
+                            ordering[0].lstrip("-"), ", ".join(sorted(indexed))
+                        )
+                    ]
+                }
+            )
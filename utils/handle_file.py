@@ -14,7 +14,7 @@ def change_filename(file: UploadedFile) -> str:
     file_name, file_extension = os.path.splitext(file.name)  # Unpacking tuple
     return "{time}_{extraInfo}{file}".format(
         time=str(round(time.time())),
-        extraInfo=uuid4().hex(),
+        extraInfo=uuid4().hex,
         file=file_name.replace("\\", "") + file_extension,
     )
 
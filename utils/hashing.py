@@ -0,0 +1,109 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import exceptions, status
+
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/#password-upgrading
+# https://docs.python.org/3/library/hashlib.html#hashlib.pbkdf2_hmac
+
+"""
+Password hashing and verification run on a small dedicated thread pool instead of the request threads.
+PBKDF2 releases the GIL, so the pool caps how many CPU cores a burst of logins or sign-ups can take,
+leaving the rest to the other endpoints. Requests wait for their hash in the pool's queue; once
+PASSWORD_HASHING_QUEUE requests wait already, new ones are turned away right away with 503 and Retry-After.
+"""
+
+
+class PasswordHashingBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password operations in progress, please retry shortly."
+    default_code = "password_hashing_busy"
+
+    def __init__(self, wait: int):
+        super().__init__()
+        self.wait = wait  # Sent as Retry-After by DRF's exception handler
+
+
+_lock = threading.Lock()
+# The executor and the semaphore bounding its queue, created together on first use
+_pool: Optional[tuple[ThreadPoolExecutor, threading.BoundedSemaphore]] = None
+_stats = {"completed": 0, "rejected": 0, "in_flight": 0, "total_ms": 0.0}
+
+
+def _get_executor() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _pool
+    with _lock:
+        if _pool is None:
+            workers = settings.PASSWORD_HASHING_WORKERS
+            _pool = (
+                ThreadPoolExecutor(workers, thread_name_prefix="password-hashing"),
+                threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_QUEUE),
+            )
+        return _pool
+
+
+def _retry_after() -> int:
+    # Time for the pool to work through its queue at the average hashing time so far
+    with _lock:
+        average = _stats["total_ms"] / _stats["completed"] / 1000 if _stats["completed"] else 0.1
+        queued = _stats["in_flight"]
+    return max(math.ceil(queued * average / settings.PASSWORD_HASHING_WORKERS), 1)
+
+
+def _run(function: Callable, *args):
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        with _lock:
+            _stats["rejected"] += 1
+        raise PasswordHashingBusy(wait=_retry_after())
+
+    def timed():
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            with _lock:
+                _stats["completed"] += 1
+                _stats["total_ms"] += (time.perf_counter() - start) * 1000
+
+    with _lock:
+        _stats["in_flight"] += 1
+    try:
+        return executor.submit(timed).result()
+    finally:
+        with _lock:
+            _stats["in_flight"] -= 1
+        slots.release()
+
+
+def hash_password(password: str) -> str:
+    """make_password on the hashing pool, raises PasswordHashingBusy"""
+    return _run(make_password, password)
+
+
+def verify_password(password: str, encoded: str) -> tuple[bool, bool]:
+    """
+    check_password on the hashing pool, raises PasswordHashingBusy. Also returns whether the hash
+    should be upgraded, i.e. it was made with another hasher or other parameters than the preferred ones.
+    """
+    must_update = False
+
+    def setter(raw_password: str):
+        # Only called for correct passwords
+        nonlocal must_update
+        must_update = True
+
+    return _run(check_password, password, encoded, setter), must_update
+
+
+def hashing_stats() -> dict[str, int | float]:
+    with _lock:
+        stats = dict(_stats)
+    stats["avg_ms"] = stats.pop("total_ms") / stats["completed"] if stats["completed"] else 0.0
+    stats["workers"] = settings.PASSWORD_HASHING_WORKERS
+    stats["queue"] = settings.PASSWORD_HASHING_QUEUE
+    return stats
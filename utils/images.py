@@ -0,0 +1,64 @@
+from io import BytesIO
+from typing import IO, Iterable
+from PIL import Image, ImageOps
+
+# https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.Image.draft
+# https://pillow.readthedocs.io/en/stable/reference/ImageOps.html#PIL.ImageOps.fit
+# https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html#webp
+
+"""
+Square resized copies (derivatives) of an uploaded image, encoded as WebP or JPEG.
+Only Pillow is used here, so the functions can run in worker processes without the database.
+"""
+
+# format: (Pillow format, file extension)
+FORMATS = {
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    # JPEG has no alpha channel: transparent areas become white rather than black
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def encode(image: Image.Image, format: str, quality: int) -> bytes:
+    pillow_format, _ = FORMATS[format]
+    if format == "jpeg":
+        image = _flatten(image)
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_derivatives(
+    source: IO[bytes], specs: Iterable[tuple[int, str]], quality: int
+) -> dict[tuple[int, str], bytes]:
+    """
+    Encodes the source image for every (size, format) in specs, cropped to a size x size square
+    around the center. Images smaller than a size are not scaled up.
+    """
+    specs = list(specs)
+    with Image.open(source) as image:
+        # JPEGs are decoded at a reduced scale that still covers the largest size, which is
+        # much faster than decoding a multi-megapixel photo in full
+        largest = max(size for size, _ in specs)
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+
+        derivatives = {}
+        resized = {}
+        for size, format in specs:
+            if size not in resized:
+                side = min(size, *image.size)
+                resized[size] = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+            derivatives[size, format] = encode(resized[size], format, quality)
+        return derivatives
@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import stat
+from typing import Iterator, Optional
+from urllib.parse import quote
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+# https://docs.djangoproject.com/en/5.0/ref/request-response/#fileresponse-objects
+# https://nginx.org/en/docs/http/ngx_http_core_module.html#internal
+# https://www.rfc-editor.org/rfc/rfc9110#name-range-requests
+# https://www.rfc-editor.org/rfc/rfc9111#name-cache-control
+
+"""
+Serves the files under MEDIA_ROOT in production, in place of django.conf.urls.static.static,
+which only works with DEBUG and keeps the worker busy for the whole transfer without cache headers.
+
+MEDIA_SERVE_MODE chooses who sends the file body:
+- "x-accel-redirect" (nginx) and "x-sendfile" (Apache mod_xsendfile, lighttpd): the view only checks the
+  path and sets the headers, and the front proxy sends the file, so the worker is free right away.
+  nginx needs an internal location at MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT.
+- "python": the worker streams the file itself and answers single byte range requests.
+
+Every mode sends ETag, Last-Modified and Cache-Control, and answers conditional requests with 304.
+Names under MEDIA_IMMUTABLE_PREFIXES are content-addressed and cached for a year as immutable.
+"""
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class MediaFileResponse(FileResponse):
+    block_size = CHUNK_SIZE  # FileResponse reads 4 KiB at a time by default
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    First and last byte of a single byte range. None for anything else (other units, several ranges,
+    syntax errors), which is answered with the whole file. Raises RangeNotSatisfiable when the range
+    starts after the end of the file, which every range of an empty file does.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first_text, separator, last_text = ranges.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if not first_text:  # bytes=-N: the last N bytes
+            length = int(last_text)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        first = int(first_text)
+        last = int(last_text) if last_text else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+def _if_range_matches(request: HttpRequest, etag: str, last_modified: int) -> bool:
+    # A Range request is only honored while the file still is the one the client has part of
+    if_range = request.headers.get("If-Range")
+    return if_range is None or if_range in (etag, http_date(last_modified))
+
+
+def _read_range(path: str, first: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(first)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def cache_control(path: str) -> str:
+    if path.startswith(tuple(settings.MEDIA_IMMUTABLE_PREFIXES)):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+
+
+def _send(request: HttpRequest, path: str, full_path: str, size: int, etag: str, last_modified: int):
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return response
+    if mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = full_path
+        return response
+
+    byte_range = None
+    if "Range" in request.headers and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        if request.method == "HEAD":
+            response = HttpResponse(content_type=content_type)
+            response["Content-Length"] = size
+            return response
+        return MediaFileResponse(open(full_path, "rb"), content_type=content_type)
+
+    first, last = byte_range
+    length = last - first + 1
+    response = StreamingHttpResponse(
+        _read_range(full_path, first, length) if request.method == "GET" else [],
+        status=status.HTTP_206_PARTIAL_CONTENT,
+        content_type=content_type,
+    )
+    response["Content-Length"] = length
+    response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    return response
+
+
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+
+    etag = quote_etag(f"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}")
+    last_modified = int(file_stat.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _send(request, path, full_path, file_stat.st_size, etag, last_modified)
+    if response.status_code != status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE:
+        for header, value in headers.items():
+            response.headers.setdefault(header, value)
+    return response
@@ -0,0 +1,35 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# https://docs.djangoproject.com/en/5.0/topics/http/middleware/#asynchronous-support
+# https://whitenoise.readthedocs.io/en/stable/django.html
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also supports async requests. The stock middleware is sync only, so under
+    ASGI Django would run every request through it, and all the middleware and views after it,
+    in a thread, which defeats async views. Static files are still served from a thread here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,172 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Optional
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework import request
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+# https://www.django-rest-framework.org/api-guide/pagination/#custom-pagination-styles
+# https://use-the-index-luke.com/no-offset
+
+
+def _encode_value(value: Any):
+    # Full precision is required here: a truncated datetime would seek to the wrong row
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination that seeks on the ordering columns, e.g.
+    WHERE pub_date > x OR (pub_date = x AND id > y), instead of skipping rows with OFFSET.
+    With an index on the ordering columns page N costs the same as page 1.
+
+    The ordering is taken from the queryset (or the model's Meta.ordering) and the primary key is
+    appended as a tie breaker, so the cursor always identifies a single row.
+    Ordering columns must be concrete, non-nullable model fields. Querysets of
+    values_list(named=True) rows must select them by their field names.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    ordering = ("id",)  # Used when neither the queryset nor the model defines an ordering
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request: request.Request, view=None):
+        queryset = self._get_page_queryset(queryset, request)
+        return self._get_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: request.Request, view=None):
+        queryset = self._get_page_queryset(queryset, request)
+        return self._get_page([row async for row in queryset])
+
+    def _get_page_queryset(self, queryset: QuerySet, request: request.Request) -> QuerySet:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_ordering(queryset)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        ordering = [
+            ("-" if descending != self.reverse else "") + name for name, descending in self.keys
+        ]
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._seek(self.position, self.reverse))
+
+        # Fetch one extra row to know whether there is another page in the same direction
+        return queryset[: self.page_size + 1]
+
+    def _get_page(self, rows: list) -> list:
+        position, reverse = self.position, self.reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = position is not None if not reverse else has_more
+        self.next_position = self._get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = self._get_position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def get_page_size(self, request: request.Request) -> int:
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset: QuerySet) -> list[tuple[str, bool]]:
+        opts = queryset.model._meta
+        ordering = list(queryset.query.order_by or opts.ordering or self.ordering)
+        keys: list[tuple[str, bool]] = []
+        for field in ordering:
+            if not isinstance(field, str) or field == "?":
+                raise ImproperlyConfigured(
+                    f"{self.__class__.__name__} only supports ordering by field names, got {field!r}"
+                )
+            name = field.lstrip("-")
+            keys.append((opts.pk.name if name == "pk" else name, field.startswith("-")))
+
+        if opts.pk.name not in (name for name, _ in keys):
+            # Follow the direction of the leading column so a composite index can be walked as is
+            keys.append((opts.pk.name, keys[0][1] if keys else False))
+
+        self.key_fields = [opts.get_field(name) for name, _ in keys]
+        self.attnames = [field.attname for field in self.key_fields]
+        return keys
+
+    def _seek(self, position: list, reverse: bool) -> Q:
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.keys, position):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _get_position(self, row) -> list:
+        if isinstance(row, tuple):  # values_list(named=True) rows are named after the fields
+            return [_encode_value(getattr(row, name)) for name, _ in self.keys]
+        return [_encode_value(getattr(row, attname)) for attname in self.attnames]
+
+    def decode_cursor(self, request: request.Request) -> tuple[Optional[list], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], bool(cursor.get("r"))
+            if not isinstance(position, list) or len(position) != len(self.keys):
+                raise ValueError
+            # The cursor comes from the client: its values are parsed by their fields before reaching the query
+            position = [field.to_python(value) for field, value in zip(self.key_fields, position)]
+            if None in position:  # The ordering columns are not nullable
+                raise ValueError
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position: list, reverse: bool = False) -> str:
+        cursor = {"p": position, "r": int(reverse)}
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode())
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_pagination(self) -> dict[str, Optional[str]]:
+        # Included in the success_response envelope next to the page results
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
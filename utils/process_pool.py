@@ -0,0 +1,36 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from django.conf import settings
+
+# https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+
+"""
+Process pool shared by CPU bound batch work (e.g. hashing the passwords of an author import), created on
+first use and kept for the lifetime of the process. Workers are spawned rather than forked, since forking
+a server process copies its threads' locks and open database connections, and set Django up on start,
+so they can run functions that use the settings. They must not use the database.
+"""
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _initialize_worker():
+    import django
+
+    django.setup()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.WORKER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+            )
+        return _pool
@@ -0,0 +1,263 @@
+from contextlib import ExitStack
+from typing import Any
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Prefetch, QuerySet
+from django.utils.functional import cached_property
+from rest_framework import request, serializers
+
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#select-related
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#prefetch-related
+# https://docs.djangoproject.com/en/5.0/topics/db/optimization/
+
+
+FieldTree = dict[str, "FieldTree"]
+
+
+def parse_field_tree(value: str) -> FieldTree:
+    """"headline,blog.name,authors.user" -> {"headline": {}, "blog": {"name": {}}, "authors": {"user": {}}}"""
+    tree: FieldTree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def get_sparse_fieldsets(request: request.Request) -> dict[str, FieldTree]:
+    """
+    Serializer and query plan kwargs built from the ?fields= and ?expand= query parameters.
+    Nested paths are dotted, e.g. ?fields=headline,blog.name&expand=blog,authors.user
+    """
+    return {
+        param: parse_field_tree(request.query_params[param])
+        for param in ("fields", "expand")
+        if param in request.query_params
+    }
+
+
+def _nested_kwargs(name: str, fields: FieldTree | None, expand: FieldTree | None) -> dict:
+    return {
+        # Requesting "blog" without sub fields means every field of the blog
+        "fields": (fields.get(name) or None) if fields is not None else None,
+        "expand": expand.get(name, {}) if expand is not None else None,
+    }
+
+
+class QueryPlanMixin:
+    """
+    Lets a serializer declare the relations it reads so that views can apply the matching
+    select_related/prefetch_related plan instead of lazily loading them row by row.
+    Relations are declared in Meta and map to the serializer used for the related object,
+    so the plans of nested serializers are followed as well:
+
+    class Meta:
+        select_related = {"blog": BlogSerializer}  # ForeignKey and OneToOne
+        prefetch_related = {"authors": AuthorSerializer}  # ManyToMany and reverse ForeignKey
+
+    Declared relations are rendered as nested objects. The optional fields and expand kwargs
+    (see get_sparse_fieldsets) restrict the output to the requested fields and relations:
+    relations that are not expanded are rendered as primary keys (or left out for reverse relations),
+    and neither they nor unrequested wide text columns are fetched by the matching query plan.
+    Without these kwargs every field is returned and every declared relation is expanded.
+    """
+
+    # Provided by the ModelSerializer the mixin is combined with
+    Meta: Any
+    fields: Any
+
+    def __init__(
+        self,
+        *args,
+        fields: FieldTree | None = None,
+        expand: FieldTree | None = None,
+        **kwargs,
+    ):
+        self.sparse_fields = fields
+        self.expand = expand
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def get_relations(cls) -> dict[str, type["QueryPlanMixin"]]:
+        meta = getattr(cls, "Meta", None)
+        return {
+            **getattr(meta, "select_related", {}),
+            **getattr(meta, "prefetch_related", {}),
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.sparse_fields is None and self.expand is None:
+            return fields
+
+        if self.sparse_fields is not None:
+            fields = {name: field for name, field in fields.items() if name in self.sparse_fields}
+
+        # Declared nested serializers are rebuilt with the requested sub fields, or replaced
+        # by their primary key when not expanded. Other relations are expanded in to_representation.
+        opts = self.Meta.model._meta
+        for name, serializer_class in self.get_relations().items():
+            field = fields.get(name)
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            if self.expand is None or name in self.expand:
+                fields[name] = serializer_class(
+                    many=many,
+                    read_only=True,
+                    **_nested_kwargs(name, self.sparse_fields, self.expand),
+                )
+            elif opts.get_field(name).concrete:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many)
+            else:
+                del fields[name]
+        return fields
+
+    @cached_property
+    def _expanded_relations(self) -> list[tuple[str, type["QueryPlanMixin"], bool, dict]]:
+        opts = self.Meta.model._meta
+        return [
+            (
+                name,
+                serializer_class,
+                opts.get_field(name).many_to_many or opts.get_field(name).one_to_many,
+                _nested_kwargs(name, self.sparse_fields, self.expand),
+            )
+            for name, serializer_class in self.get_relations().items()
+            if name in self.fields
+            and not isinstance(self.fields[name], serializers.BaseSerializer)
+            and (self.expand is None or name in self.expand)
+        ]
+
+    def to_representation(self, instance):
+        # Relations rendered as primary key fields (so they stay writable) are expanded for output
+        res = super().to_representation(instance)
+        for name, serializer_class, many, kwargs in self._expanded_relations:
+            res[name] = serializer_class(getattr(instance, name), many=many, **kwargs).data
+        return res
+
+    @classmethod
+    def get_query_plan(
+        cls,
+        prefix: str = "",
+        fields: FieldTree | None = None,
+        expand: FieldTree | None = None,
+    ) -> tuple[list[str], list[Prefetch], list[str]]:
+        meta = cls.Meta
+        opts = meta.model._meta
+        select_related: list[str] = []
+        prefetch_related: list[Prefetch] = []
+        defer: list[str] = []
+
+        if fields is not None:
+            # Only wide text columns are worth deferring, narrow ones may be needed for ordering
+            defer = [
+                prefix + field.name
+                for field in opts.concrete_fields
+                if isinstance(field, models.TextField) and field.name not in fields
+            ]
+
+        def wanted(name: str) -> bool:
+            return fields is None or name in fields
+
+        def expanded(name: str) -> bool:
+            return expand is None or name in expand
+
+        for name, serializer_class in getattr(meta, "select_related", {}).items():
+            if not wanted(name) or not expanded(name):
+                continue
+            select_related.append(prefix + name)
+            # Relations of a joined model can be followed through the same lookup path
+            nested_select, nested_prefetch, nested_defer = serializer_class.get_query_plan(
+                prefix=f"{prefix}{name}__", **_nested_kwargs(name, fields, expand)
+            )
+            select_related.extend(nested_select)
+            prefetch_related.extend(nested_prefetch)
+            defer.extend(nested_defer)
+
+        for name, serializer_class in getattr(meta, "prefetch_related", {}).items():
+            if not wanted(name):
+                continue
+            related_model = opts.get_field(name).related_model
+            if expanded(name):
+                queryset = serializer_class.setup_eager_loading(
+                    related_model._default_manager.all(),
+                    **_nested_kwargs(name, fields, expand),
+                )
+            else:
+                queryset = related_model._default_manager.only("pk")  # Rendered as primary keys
+            prefetch_related.append(Prefetch(prefix + name, queryset=queryset))
+
+        return select_related, prefetch_related, defer
+
+    @classmethod
+    def setup_eager_loading(
+        cls,
+        queryset: QuerySet,
+        fields: FieldTree | None = None,
+        expand: FieldTree | None = None,
+    ) -> QuerySet:
+        select_related, prefetch_related, defer = cls.get_query_plan(
+            fields=fields, expand=expand
+        )
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if defer:
+            queryset = queryset.defer(*defer)
+        return queryset
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudgetMixin:
+    """
+    Fails any request that runs more queries than the view declares when
+    settings.QUERY_BUDGET_ASSERT is enabled. Meant for development and CI, not production.
+
+    query_budget is either a number for every handler or a dict keyed by the handler name
+    (the viewset action such as "list", or the lowercase HTTP method for APIViews).
+    The count includes the queries made by authentication.
+    """
+
+    query_budget: int | dict[str, int] | None = None
+
+    def get_query_budget(self, request) -> int | None:
+        if isinstance(self.query_budget, dict):
+            handler = getattr(self, "action", None) or request.method.lower()
+            return self.query_budget.get(handler)
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.QUERY_BUDGET_ASSERT or self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Reads may go to the replicas (see utils/db_router.py)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(capture))
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget(request)
+        if budget is not None and len(queries) > budget:
+            raise QueryBudgetExceeded(
+                "{view} ran {count} queries for {method} {path}, the budget is {budget}:\n{sql}".format(
+                    view=self.__class__.__name__,
+                    count=len(queries),
+                    method=request.method,
+                    path=request.path,
+                    budget=budget,
+                    sql="\n".join(queries),
+                )
+            )
+        return response
@@ -0,0 +1,109 @@
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils import encoders
+
+# https://www.django-rest-framework.org/api-guide/renderers/#custom-renderers
+# https://www.django-rest-framework.org/api-guide/parsers/#custom-parsers
+# https://www.django-rest-framework.org/api-guide/content-negotiation/#custom-content-negotiation
+# https://github.com/ijl/orjson#option
+# https://github.com/msgpack/msgpack-python
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+"""
+Renderers and parsers backed by optional C extensions. orjson is used for JSON when installed,
+otherwise the stdlib json module. Both give the same values once parsed, though not always the same
+bytes (floats: 1e-06 from json, 1e-6 from orjson). Dates, times, Decimals, UUIDs and lazy strings are
+converted by DRF's JSONEncoder either way. MessagePack is offered through
+content negotiation (Accept: application/msgpack) only when msgpack is installed.
+"""
+
+_default = encoders.JSONEncoder().default
+
+if orjson:
+    # Datetimes are passed to DRF's encoder, which formats them differently from orjson
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    available = True  # Falls back to the stdlib json module
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # orjson only writes compact, non ASCII escaped JSON, other styles (e.g. ?indent) use json
+        if orjson is None or not self.compact or self.ensure_ascii or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Same escaping as JSONRenderer, so that the output is a strict JavaScript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        # orjson only reads UTF-8 and always rejects NaN and Infinity like strict mode does
+        if orjson is None or encoding.lower() not in ("utf-8", "utf8") or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Values msgpack has no type for are converted like in JSON responses
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+    available = msgpack is not None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
+
+
+class AvailableContentNegotiation(DefaultContentNegotiation):
+    """Leaves out the renderers and parsers whose optional dependency is not installed"""
+
+    def select_parser(self, request, parsers):
+        return super().select_parser(
+            request, [parser for parser in parsers if getattr(parser, "available", True)]
+        )
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return super().select_renderer(
+            request,
+            [renderer for renderer in renderers if getattr(renderer, "available", True)],
+            format_suffix,
+        )
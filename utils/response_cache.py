@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+import hashlib
+import threading
+import time
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from rest_framework import request, status
+from rest_framework.response import Response
+
+# https://docs.djangoproject.com/en/5.0/topics/cache/#the-low-level-cache-api
+# https://docs.djangoproject.com/en/5.0/topics/cache/#cache-versioning
+
+"""
+Response cache for read endpoints invalidated through per-model generations.
+Every cache key includes the current generation of each model the response is built from.
+Writes bump the generation of the written model, which makes all keys built with the previous
+generation unreachable at once (O(1) invalidation); the stale entries then expire on their own.
+Generations are the time of the last write in nanoseconds, so they double as a Last-Modified bound.
+They live in the default cache, which must be shared by the worker processes (see CACHES in settings.py)
+for a write handled by one process to invalidate the responses cached by the others.
+"""
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+# Models whose every write bumps a generation, mapped to the model the generation belongs to
+_tracked: dict[type[models.Model], type[models.Model]] = {}
+
+
+def _generation_key(model: type[models.Model]) -> str:
+    return f"generation:{model._meta.label_lower}"
+
+
+def get_generations(*models: type[models.Model]) -> list[int]:
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Start from a value no earlier generation used, in case the generation itself was evicted
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def track_writes(*models: type[models.Model], generation_of: type[models.Model] | None = None):
+    """
+    Declares that every write to the models bumps a generation: their own, or the one of generation_of.
+    Only then does last_write know when they were written.
+    """
+    for model in models:
+        _tracked[model] = generation_of or model
+
+
+def last_write(model: type[models.Model]) -> int | None:
+    """
+    Time of the last write to the model in nanoseconds, None if its writes are not tracked (see track_writes).
+    A generation missing from the cache, never bumped or evicted, starts at the current time.
+    """
+    generation_model = _tracked.get(model)
+    return None if generation_model is None else get_generations(generation_model)[0]
+
+
+def bump_generation(*models: type[models.Model]):
+    # Concurrent bumps may overwrite each other, but any of them moves the generation past the old value
+    cache.set_many({_generation_key(model): time.time_ns() for model in models}, timeout=None)
+
+
+def generation_time(generations: list[int]) -> datetime.datetime:
+    """Time of the latest write among the models the generations were read for"""
+    return datetime.datetime.fromtimestamp(max(generations) / 1e9, tz=datetime.timezone.utc)
+
+
+def _record(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def response_cache_stats() -> dict[str, int | float]:
+    """Hit/miss counters of the current process"""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def build_cache_key(request: request.Request, models: tuple[type[models.Model], ...]) -> str:
+    query = sorted(request.query_params.lists())
+    generations = get_generations(*models)
+    # The host is part of the key since pagination links are absolute URLs
+    raw = f"{request.get_host()}{request.path}?{query}|{generations}"
+    return "response:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def cache_response(*models: type[models.Model], timeout: int | None = None):
+    """
+    Caches the data of successful responses of a view handler, keyed by the route, the query parameters
+    and the generations of the given models. List every model whose rows end up in the response,
+    including nested ones. Only use it on responses that do not depend on the requesting user.
+    Works on async handlers too, where the cache calls run in a thread since the default cache reads files.
+
+    @cache_response(Entry, Blog, Author, User)
+    def list(self, request): ...
+    """
+
+    def decorator(handler):
+        def get_timeout() -> int:
+            return settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout
+
+        def get_cached(key: str) -> Response | None:
+            data = cache.get(key)
+            if data is None:
+                _record("misses")
+                return None
+            _record("hits")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        def store(key: str, response, cache_timeout: int):
+            # Streaming responses and errors are not cached
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, cache_timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        def lookup(request: request.Request) -> tuple[str, Response | None]:
+            key = build_cache_key(request, models)
+            return key, get_cached(key)
+
+        if asyncio.iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def async_wrapper(view, request: request.Request, *args, **kwargs):
+                cache_timeout = get_timeout()
+                if not cache_timeout:
+                    return await handler(view, request, *args, **kwargs)
+                key, cached = await sync_to_async(lookup)(request)
+                if cached is not None:
+                    return cached
+                response = await handler(view, request, *args, **kwargs)
+                return await sync_to_async(store)(key, response, cache_timeout)
+
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(view, request: request.Request, *args, **kwargs):
+            cache_timeout = get_timeout()
+            if not cache_timeout:
+                return handler(view, request, *args, **kwargs)
+            key, cached = lookup(request)
+            if cached is not None:
+                return cached
+            return store(key, handler(view, request, *args, **kwargs), cache_timeout)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1 @@
+# To mark a directory as a Python package
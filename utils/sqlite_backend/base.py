@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.sqlite3 import base
+
+# https://docs.djangoproject.com/en/5.0/ref/databases/#database-is-locked-errors
+# https://docs.djangoproject.com/en/5.0/ref/signals/#connection-created
+# https://www.sqlite.org/wal.html
+# https://www.sqlite.org/pragma.html
+# https://www.sqlite.org/lang_transaction.html#deferred_immediate_and_exclusive_transactions
+
+"""
+Django's SQLite backend with the two settings SQLite needs to serve concurrent requests:
+
+- OPTIONS["transaction_mode"] ("DEFERRED", "IMMEDIATE" or "EXCLUSIVE") is the mode atomic() blocks
+  begin their transaction with, as in Django 5.1. A DEFERRED transaction only asks for the write lock
+  at its first write; if another connection writes in the meantime the upgrade fails right away with
+  "database is locked", busy_timeout notwithstanding. IMMEDIATE takes the write lock at BEGIN, where
+  a busy connection waits for it instead.
+- The PRAGMAs of settings.SQLITE_PRAGMAS are run on every new connection (connection_created),
+  e.g. WAL journaling so that readers are not blocked by the writer.
+"""
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.transaction_mode = (params.pop("transaction_mode", None) or "DEFERRED").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES is improperly configured. transaction_mode must be one of "
+                f"{', '.join(TRANSACTION_MODES)}."
+            )
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
+
+
+@contextmanager
+def immediate_atomic(using: str = DEFAULT_DB_ALIAS):
+    """
+    atomic() that begins with the write lock whatever the transaction_mode, for transactions that
+    write based on what they read: under DEFERRED another connection could commit in between.
+    Inside an atomic block, or on other backends, this is a plain atomic().
+    """
+    connection = connections[using]
+    connection.ensure_connection()  # transaction_mode is set when connecting
+    mode = getattr(connection, "transaction_mode", None)
+    if mode is None or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+connection_created.connect(apply_pragmas, dispatch_uid="sqlite_backend_pragmas")
@@ -0,0 +1,84 @@
+from typing import AsyncIterator, Iterator
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import request, serializers
+from .renderers import FastJSONRenderer
+
+# https://docs.djangoproject.com/en/5.0/ref/request-response/#streaminghttpresponse-objects
+# https://docs.djangoproject.com/en/5.0/ref/models/querysets/#iterator
+
+
+def wants_streaming(request: request.Request) -> bool:
+    # Streaming is opt-in through ?stream=true since it skips pagination and returns every row
+    return request.query_params.get("stream", "").lower() in ("1", "true")
+
+
+def _chunks(queryset: QuerySet, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _achunks(queryset: QuerySet, chunk_size: int) -> AsyncIterator[list]:
+    chunk = []
+    async for obj in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_success_response(
+    queryset: QuerySet,
+    serializer_class: type[serializers.BaseSerializer],
+    message: str,
+    chunk_size: int | None = None,
+    serializer_kwargs: dict | None = None,
+    asynchronous: bool = False,
+) -> StreamingHttpResponse:
+    """
+    Streams the same {"success", "message", "result"} envelope as success_response, serializing
+    and encoding the queryset one chunk at a time. Only a single chunk of model instances and
+    its JSON is held in memory at once, and the first bytes are sent before the last row is read.
+    prefetch_related lookups are applied per chunk by QuerySet.iterator().
+    Async views pass asynchronous=True to read the rows with QuerySet.aiterator(): under ASGI,
+    Django would otherwise consume a sync iterator in full before sending anything.
+    """
+    chunk_size = chunk_size or settings.STREAMING_CHUNK_SIZE
+    renderer = FastJSONRenderer()
+
+    # Render the envelope without its result and leave it open: {"success":true,"message":"..."
+    envelope = renderer.render({"success": True, "message": message})
+    start = envelope[:-1] + b',"result":['
+
+    def render_chunk(chunk: list) -> bytes:
+        serializer = serializer_class(chunk, many=True, **(serializer_kwargs or {}))
+        return renderer.render(serializer.data)[1:-1]  # strip the list brackets of the chunk
+
+    def generate() -> Iterator[bytes]:
+        yield start
+        separator = b""
+        for chunk in _chunks(queryset, chunk_size):
+            yield separator + render_chunk(chunk)
+            separator = b","
+        yield b"]}"
+
+    async def agenerate() -> AsyncIterator[bytes]:
+        yield start
+        separator = b""
+        async for chunk in _achunks(queryset, chunk_size):
+            yield separator + render_chunk(chunk)
+            separator = b","
+        yield b"]}"
+
+    return StreamingHttpResponse(
+        agenerate() if asynchronous else generate(), content_type=renderer.media_type
+    )
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+"""
+Small in-process cache for values that are read on most requests and rarely change.
+Entries expire after ttl seconds and the least recently used entry is evicted once maxsize is reached.
+The cache is per process: every worker holds its own copy, so invalidation through signals only reaches
+the worker that made the write, and the ttl bounds how long the others can serve the old value.
+"""
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= self.timer():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        # ttl overrides the default for this entry, it is still capped by the default
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self.timer() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }